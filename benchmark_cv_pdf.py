@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Benchmark the CV PDF pipeline (parse, escape, generate, compile) on synthetic CVs
+Usage: python benchmark_cv_pdf.py --experiences 50 --bullets 8 --output bench.json
+"""
+
+import os
+import re
+import json
+import time
+import random
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+
+import generate_cv_pdf as cvgen
+
+SPECIAL_CHARS = '&%$#_{}^~'
+WORDS = ['model', 'pipeline', 'data', 'latency', 'React', 'Python', 'training', 'API',
+         'deployment', 'evaluation', 'dashboard', 'matching', 'search', 'cache', 'users']
+
+def _sentence(rng, words, special_density):
+    """Random sentence where roughly special_density of the words carry a LaTeX special char"""
+    out = []
+    for _ in range(words):
+        word = rng.choice(WORDS)
+        if rng.random() < special_density:
+            word += rng.choice(SPECIAL_CHARS) + rng.choice(WORDS)
+        out.append(word)
+    return ' '.join(out).capitalize()
+
+def generate_synthetic_cv(experiences=10, bullets=5, skill_categories=6, skills_per_category=20,
+                          projects=5, special_density=0.1, seed=0):
+    """Return CV_DATA.txt-format text of the requested size"""
+    rng = random.Random(seed)
+    rule = '-' * 80
+    lines = [
+        'Synthetic Person',
+        '0500000000 synthetic@example.com',
+        'https://www.linkedin.com/in/synthetic',
+        'https://github.com/synthetic',
+        '',
+        _sentence(rng, 20, special_density),
+        '',
+        'EXPERIENCE',
+        rule,
+    ]
+    for i in range(experiences):
+        lines += [f'Engineer {i}', f'Company {i} & Co', f'Jan {2000 + i % 25} - Present', '',
+                  _sentence(rng, 25, special_density), '']
+        lines += ['• ' + _sentence(rng, 30, special_density) for _ in range(bullets)]
+        lines += ['', f'Skills: {_sentence(rng, 5, 0)}', '']
+    lines += ['', 'EDUCATION', rule, 'Synthetic University', 'BSc. in Things', 'Somewhere', '2010 - 2014', '']
+    lines += ['', 'SKILLS', rule]
+    for i in range(skill_categories):
+        items = [_sentence(rng, 2, special_density) for _ in range(skills_per_category)]
+        lines.append(f'Category {i}: ' + ', '.join(items))
+    lines += ['', '', 'PROJECTS', rule]
+    for i in range(projects):
+        lines += [f'Project {i}', _sentence(rng, 20, special_density),
+                  f'GitHub: https://github.com/synthetic/project{i} | Demo available upon request', '']
+        lines += ['• ' + _sentence(rng, 25, special_density) for _ in range(bullets)]
+        lines += ['', 'Technologies: Python, React', '']
+    return '\n'.join(lines) + '\n'
+
+def reference_escape_latex(text):
+    """escape_latex as it was before the single-pass rewrite, kept to compare against"""
+    if '\\' in text and any(cmd in text for cmd in ['\\href', '\\&', '\\%', '\\$', '\\#']):
+        text = re.sub(r'(?<!\\)&(?!\w)', r'\\&', text)
+        text = re.sub(r'(?<!\\)%(?!\w)', r'\\%', text)
+        text = re.sub(r'(?<!\\)\$', r'\\$', text)
+        text = re.sub(r'(?<!\\)#', r'\\#', text)
+        text = re.sub(r'(?<!\\)_', r'\\_', text)
+        text = re.sub(r'(?<!\\)\{', r'\\{', text)
+        text = re.sub(r'(?<!\\)\}', r'\\}', text)
+        text = re.sub(r'(?<!\\)\^', r'\\textasciicircum{}', text)
+        text = re.sub(r'(?<!\\)~', r'\\textasciitilde{}', text)
+    else:
+        special_chars = {
+            '&': r'\&',
+            '%': r'\%',
+            '$': r'\$',
+            '#': r'\#',
+            '^': r'\textasciicircum{}',
+            '_': r'\_',
+            '{': r'\{',
+            '}': r'\}',
+            '~': r'\textasciitilde{}',
+        }
+        for char, replacement in special_chars.items():
+            text = text.replace(char, replacement)
+    return text
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100.0 * (len(ordered) - 1))))
+    return ordered[index]
+
+def time_stage(func, warmup=2, repeat=10, setup=None):
+    """Time func() after warmup runs; returns timing stats and tracemalloc peak"""
+    for _ in range(warmup):
+        if setup:
+            setup()
+        func()
+
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    # Separate run for memory so tracemalloc overhead doesn't skew the timings
+    if setup:
+        setup()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'runs': repeat,
+        'min_ms': min(times) * 1000,
+        'p50_ms': _percentile(times, 50) * 1000,
+        'p95_ms': _percentile(times, 95) * 1000,
+        'mean_ms': sum(times) / len(times) * 1000,
+        'peak_memory_kb': peak / 1024,
+    }
+
+def run_benchmarks(data_file, warmup=2, repeat=10, compile_repeat=3, skip_compile=False):
+    """Benchmark every pipeline stage on data_file; returns a dict of stage results"""
+    results = {}
+
+    results['parse'] = time_stage(lambda: cvgen.parse_cv_data(data_file), warmup, repeat)
+    cv = cvgen.parse_cv_data(data_file)
+
+    # All strings escape_latex sees during generation
+    texts = []
+    for entry in cv.experience or []:
+        texts += [entry.position, entry.company, entry.dates, entry.intro] + list(entry.description)
+    for skill in cv.skills or []:
+        texts += [skill.category] + list(skill.items)
+    for project in cv.projects or []:
+        texts += [project.title, project.description] + list(project.highlights)
+    results['escape'] = time_stage(lambda: [cvgen.escape_latex(t) for t in texts], warmup, repeat)
+    results['escape']['strings'] = len(texts)
+    results['escape_reference'] = time_stage(lambda: [reference_escape_latex(t) for t in texts], warmup, repeat)
+    # The same strings with LaTeX already in them, which takes the careful path
+    careful = ['\\& ' + t for t in texts]
+    results['escape_careful'] = time_stage(lambda: [cvgen.escape_latex(t) for t in careful], warmup, repeat)
+    results['escape_careful_ref'] = time_stage(lambda: [reference_escape_latex(t) for t in careful], warmup, repeat)
+
+    # Cold generation: fragment cache cleared before every run
+    results['generate'] = time_stage(lambda: cvgen.generate_latex(cv), warmup, repeat,
+                                     setup=cvgen.clear_fragment_cache)
+    # Warm generation: every section served from the fragment cache
+    cvgen.generate_latex(cv)
+    results['generate_cached'] = time_stage(lambda: cvgen.generate_latex(cv), warmup, repeat)
+
+    latex_code = cvgen.generate_latex(cv)
+    results['generate']['output_bytes'] = len(latex_code.encode('utf-8'))
+
+    if skip_compile or not cvgen.find_pdflatex():
+        results['compile'] = {'skipped': True}
+        return results
+
+    with tempfile.TemporaryDirectory(prefix='cv-bench-') as tmp:
+        tex_file = os.path.join(tmp, 'cv.tex')
+        with open(tex_file, 'w', encoding='utf-8') as f:
+            f.write(latex_code)
+        output_file = os.path.join(tmp, 'out.pdf')
+        build_dir = os.path.join(tmp, 'build')
+        def compile_quietly():
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                cvgen.compile_latex_to_pdf(tex_file, output_file, build_dir=build_dir)
+        results['compile'] = time_stage(compile_quietly, warmup=1, repeat=compile_repeat)
+    return results
+
+def print_report(results, baseline=None):
+    """Print a stage table, with the change against a baseline result file if given"""
+    print(f"\n{'stage':<18} {'p50':>10} {'p95':>10} {'peak mem':>11}" + ("   vs baseline" if baseline else ""))
+    for stage, r in results['stages'].items():
+        if r.get('skipped'):
+            print(f"{stage:<18} {'skipped (pdflatex not found)':>33}")
+            continue
+        line = f"{stage:<18} {r['p50_ms']:>8.2f}ms {r['p95_ms']:>8.2f}ms {r['peak_memory_kb']:>8.0f} KB"
+        base = (baseline or {}).get('stages', {}).get(stage)
+        if base and not base.get('skipped') and base['p50_ms']:
+            line += f"   {(r['p50_ms'] / base['p50_ms'] - 1) * 100:+6.1f}%"
+        print(line)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the CV PDF pipeline')
+    parser.add_argument('--data', help='Benchmark this CV data file instead of a synthetic one')
+    parser.add_argument('--experiences', type=int, default=10, help='Synthetic experience entries (default: 10)')
+    parser.add_argument('--bullets', type=int, default=5, help='Bullets per experience/project (default: 5)')
+    parser.add_argument('--skill-categories', type=int, default=6, help='Synthetic skill categories (default: 6)')
+    parser.add_argument('--skills', type=int, default=20, help='Items per skill category (default: 20)')
+    parser.add_argument('--projects', type=int, default=5, help='Synthetic projects (default: 5)')
+    parser.add_argument('--special-density', type=float, default=0.1,
+                        help='Fraction of words containing LaTeX special characters (default: 0.1)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed for the synthetic CV')
+    parser.add_argument('--warmup', type=int, default=2, help='Warmup runs per stage (default: 2)')
+    parser.add_argument('--repeat', type=int, default=20, help='Timed runs per stage (default: 20)')
+    parser.add_argument('--compile-repeat', type=int, default=3, help='Timed pdflatex runs (default: 3)')
+    parser.add_argument('--skip-compile', action='store_true', help='Skip the pdflatex stage')
+    parser.add_argument('--output', help='Write results as JSON to this file')
+    parser.add_argument('--compare', help='Previous JSON results to compare against')
+    args = parser.parse_args()
+
+    params = {k: getattr(args, k) for k in ['experiences', 'bullets', 'skill_categories', 'skills',
+                                            'projects', 'special_density', 'seed']}
+    with tempfile.TemporaryDirectory(prefix='cv-bench-data-') as tmp:
+        data_file = args.data
+        if not data_file:
+            data_file = os.path.join(tmp, 'CV_DATA.txt')
+            with open(data_file, 'w', encoding='utf-8') as f:
+                f.write(generate_synthetic_cv(args.experiences, args.bullets, args.skill_categories,
+                                              args.skills, args.projects, args.special_density, args.seed))
+        input_bytes = os.path.getsize(data_file)
+        stages = run_benchmarks(data_file, args.warmup, args.repeat, args.compile_repeat, args.skip_compile)
+
+    results = {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'input': args.data or 'synthetic',
+        'input_bytes': input_bytes,
+        'params': params if not args.data else {},
+        'stages': stages,
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print(f"Input: {results['input']} ({input_bytes / 1024:.1f} KB)")
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Resized, content-addressed image variants for the site and the CV PDF
+Every image under public/images is converted to WebP and AVIF at the
+widths in WEB_WIDTHS (never upscaled); the CV photo also gets a flattened
+JPEG that pdflatex can embed. Variant filenames carry a hash of the source
+bytes and the variant settings, so a published file never changes and
+unchanged sources are skipped. public/assets/manifest.json maps the URLs
+the site already uses (/images/profile.jpeg) to their variants.
+Needs Pillow (pip install Pillow); AVIF needs Pillow 11.3+ or pillow-avif-plugin.
+"""
+
+import os
+import re
+import json
+import hashlib
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from cv_common import publish_pdf, profile_stage, scratch_file, write_if_changed
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError, features
+except ImportError:
+    Image = None
+
+# Bump when the resize/encode code changes, so every variant is regenerated
+PIPELINE_VERSION = 1
+
+PUBLIC_DIR = 'public'
+SOURCE_DIRS = ['images']
+ASSET_DIR = 'assets'
+MANIFEST_NAME = 'manifest.json'
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.avif', '.gif')
+
+WEB_WIDTHS = (480, 960, 1600)
+WEB_FORMATS = {
+    'webp': {'quality': 80, 'method': 6},
+    'avif': {'quality': 60, 'speed': 6},
+}
+PDF_PHOTO_WIDTH = 600
+PDF_JPEG_QUALITY = 88
+
+# <stem>-<12 hex digits>-<width>w.<ext> or <stem>-<12 hex digits>-pdf.jpg
+VARIANT_NAME_RE = re.compile(r'^.+-[0-9a-f]{12}-(?:\d+w|pdf)\.(?:webp|avif|jpg)$')
+
+def pillow_available():
+    return Image is not None
+
+def available_formats():
+    """The WEB_FORMATS this Pillow can encode"""
+    if Image is None:
+        return []
+    return [fmt for fmt in WEB_FORMATS if features.check(fmt)]
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def source_url(public_dir, path):
+    """/images/profile.jpeg for public/images/profile.jpeg"""
+    return '/' + os.path.relpath(path, public_dir).replace(os.sep, '/')
+
+def find_sources(public_dir=PUBLIC_DIR):
+    """Image files under the SOURCE_DIRS of public_dir, as {url: path}"""
+    sources = {}
+    for source_dir in SOURCE_DIRS:
+        root = os.path.join(public_dir, source_dir)
+        for dirpath, _, filenames in os.walk(root):
+            for name in sorted(filenames):
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    path = os.path.join(dirpath, name)
+                    sources[source_url(public_dir, path)] = path
+    return dict(sorted(sources.items()))
+
+def variant_specs(width, formats, pdf_photo):
+    """(kind, format, target width, encoder options) for one source of the given width"""
+    specs = []
+    widths = sorted({w for w in WEB_WIDTHS if w < width} | {min(width, max(WEB_WIDTHS))})
+    for fmt in formats:
+        for target in widths:
+            specs.append(('web', fmt, target, WEB_FORMATS[fmt]))
+    if pdf_photo:
+        specs.append(('pdf', 'jpeg', min(width, PDF_PHOTO_WIDTH), {'quality': PDF_JPEG_QUALITY, 'optimize': True}))
+    return specs
+
+def variant_name(stem, source_sha, spec):
+    kind, fmt, width, options = spec
+    key = json.dumps([PIPELINE_VERSION, source_sha, kind, fmt, width, options], sort_keys=True)
+    digest = hashlib.sha256(key.encode('utf-8')).hexdigest()[:12]
+    return f"{stem}-{digest}-pdf.jpg" if kind == 'pdf' else f"{stem}-{digest}-{width}w.{fmt}"
+
+def _save_atomic(image, path, fmt, options):
+    fd, tmp_path = scratch_file(prefix='asset-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            image.save(f, format=fmt.upper(), **options)
+        publish_pdf(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def process_image(url, path, source_sha, out_dir, public_dir, formats, pdf_photo):
+    """Worker: write every missing variant of one source; returns its manifest entry
+
+    Variants that already exist are not re-encoded: their names are content
+    hashes, so an existing file is already the right one.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    try:
+        with Image.open(path) as opened:
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+    except (UnidentifiedImageError, OSError) as e:
+        return {'error': f"{type(e).__name__}: {e}"}
+
+    has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+    image = image.convert('RGBA' if has_alpha else 'RGB')
+    entry = {'width': image.width, 'height': image.height, 'variants': [], 'pdf': None}
+    resized = {}
+    for spec in variant_specs(image.width, formats, pdf_photo):
+        kind, fmt, width, options = spec
+        name = variant_name(stem, source_sha, spec)
+        target = os.path.join(out_dir, name)
+        if width not in resized:
+            height = max(1, round(image.height * width / image.width))
+            resized[width] = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        variant = resized[width]
+        if not os.path.exists(target):
+            if kind == 'pdf' and has_alpha:
+                # JPEG has no alpha channel: flatten onto the white page
+                flattened = Image.new('RGB', variant.size, 'white')
+                flattened.paste(variant, mask=variant.getchannel('A'))
+                variant = flattened
+            _save_atomic(variant, target, fmt, options)
+        record = {'format': fmt, 'width': variant.width, 'height': variant.height,
+                  'path': source_url(public_dir, target), 'bytes': os.path.getsize(target)}
+        if kind == 'pdf':
+            entry['pdf'] = record
+        else:
+            entry['variants'].append(record)
+    return entry
+
+def load_manifest(public_dir=PUBLIC_DIR):
+    """The manifest written by build_assets, or an empty one"""
+    path = os.path.join(public_dir, ASSET_DIR, MANIFEST_NAME)
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {'version': PIPELINE_VERSION, 'images': {}}
+    if manifest.get('version') != PIPELINE_VERSION:
+        return {'version': PIPELINE_VERSION, 'images': {}}
+    return manifest
+
+def _entry_files(entry):
+    records = entry.get('variants', []) + ([entry['pdf']] if entry.get('pdf') else [])
+    return [record['path'] for record in records]
+
+def _entry_current(entry, formats, pdf_photo, public_dir):
+    """True when a previous manifest entry has every variant now requested
+
+    Entries for unreadable sources stay current until the source changes.
+    """
+    if entry.get('formats') != formats:
+        return False
+    if entry.get('error'):
+        return True
+    if pdf_photo and not entry.get('pdf'):
+        return False
+    return all(os.path.exists(os.path.join(public_dir, path.lstrip('/'))) for path in _entry_files(entry))
+
+def build_assets(public_dir=PUBLIC_DIR, jobs=None, pdf_photos=(), only=None):
+    """Bring public/assets up to date with the source images; returns (manifest, stats)
+
+    pdf_photos are source URLs that also get a JPEG for the CV PDF. only
+    limits the run to those URLs (other manifest entries are kept as they
+    are). Sources whose size and mtime match the manifest are not even
+    hashed; changed sources are processed in a process pool, and variants
+    no longer referenced by the manifest are deleted.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is not installed (pip install Pillow)")
+    out_dir = os.path.join(public_dir, ASSET_DIR)
+    os.makedirs(out_dir, exist_ok=True)
+    formats = available_formats()
+    previous = load_manifest(public_dir)['images']
+    sources = find_sources(public_dir)
+    if only is not None:
+        sources = {url: path for url, path in sources.items() if url in only}
+
+    images = {url: entry for url, entry in previous.items() if only is not None and url not in sources}
+    stats = {'reused': 0, 'processed': 0, 'failed': [], 'removed': 0}
+
+    def reuse(url, entry):
+        images[url] = entry
+        if entry.get('error'):
+            stats['failed'].append((url, entry['error']))
+        else:
+            stats['reused'] += 1
+
+    def record(item, entry):
+        url, _, source_sha, st, _ = item
+        images[url] = dict(entry, sha256=source_sha, size=st.st_size, mtime_ns=st.st_mtime_ns, formats=formats)
+        if entry.get('error'):
+            stats['failed'].append((url, entry['error']))
+        else:
+            stats['processed'] += 1
+
+    todo = []
+    with profile_stage('asset scan') as stage:
+        for url, path in sources.items():
+            st = os.stat(path)
+            pdf_photo = url in pdf_photos
+            entry = previous.get(url)
+            if entry and _entry_current(entry, formats, pdf_photo, public_dir):
+                if (entry['size'], entry['mtime_ns']) == (st.st_size, st.st_mtime_ns):
+                    reuse(url, entry)
+                    continue
+                source_sha = file_sha256(path)
+                if entry['sha256'] == source_sha:
+                    # Touched but not changed
+                    reuse(url, dict(entry, size=st.st_size, mtime_ns=st.st_mtime_ns))
+                    continue
+            else:
+                source_sha = file_sha256(path)
+            todo.append((url, path, source_sha, st, pdf_photo))
+        stage['sources'] = len(sources)
+        stage['changed'] = len(todo)
+
+    with profile_stage('asset encode') as stage:
+        workers = min(len(todo), jobs or os.cpu_count() or 1)
+        if workers <= 1:
+            for item in todo:
+                url, path, source_sha, _, pdf_photo = item
+                record(item, process_image(url, path, source_sha, out_dir, public_dir, formats, pdf_photo))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {}
+                for item in todo:
+                    url, path, source_sha, _, pdf_photo = item
+                    futures[pool.submit(process_image, url, path, source_sha, out_dir, public_dir,
+                                        formats, pdf_photo)] = item
+                for future in as_completed(futures):
+                    item = futures[future]
+                    try:
+                        entry = future.result()
+                    except Exception as e:
+                        entry = {'error': f"{type(e).__name__}: {e}"}
+                    record(item, entry)
+        stage['processed'] = stats['processed']
+
+    # Variants of changed or deleted sources are no longer referenced
+    referenced = {os.path.basename(path) for entry in images.values() for path in _entry_files(entry)}
+    for name in os.listdir(out_dir):
+        if VARIANT_NAME_RE.match(name) and name not in referenced:
+            os.remove(os.path.join(out_dir, name))
+            stats['removed'] += 1
+
+    manifest = {'version': PIPELINE_VERSION, 'images': dict(sorted(images.items()))}
+    stats['manifest_changed'] = write_if_changed(os.path.join(out_dir, MANIFEST_NAME),
+                                                 json.dumps(manifest, indent=2) + '\n')
+    return manifest, stats
+
+def pdf_photo_path(manifest, url, public_dir=PUBLIC_DIR):
+    """Filesystem path (forward slashes, for \\includegraphics) of url's PDF JPEG, or None"""
+    entry = manifest['images'].get(url) or {}
+    if not entry.get('pdf'):
+        return None
+    return os.path.join(public_dir, entry['pdf']['path'].lstrip('/')).replace(os.sep, '/')
+
+def print_asset_report(stats):
+    print(f"Assets: {stats['processed']} processed, {stats['reused']} unchanged, "
+          f"{stats['removed']} stale variant(s) removed"
+          + ("" if stats['manifest_changed'] else ", manifest unchanged"))
+    for url, error in stats['failed']:
+        print(f"  skipped {url}: {error}")
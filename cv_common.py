@@ -0,0 +1,336 @@
+#!/usr/bin/env python3
+"""
+Helpers shared by the CV generator and its companion modules
+LaTeX escaping, project-link splitting, build profiling and atomic output
+publishing live here so every module imports them at top level. When
+generate_cv_pdf.py runs as a script it is __main__, and importing it again
+from cv_assets or cv_exporters would load a second copy with its own
+profiler; importing from here shares a single one.
+"""
+
+import os
+import re
+import json
+import time
+import shutil
+import filecmp
+import platform
+import tempfile
+import contextlib
+
+# ==============================================
+# LATEX TEXT
+# ==============================================
+# Markers meaning "this text already contains LaTeX", switching escape_latex
+# into the careful mode that leaves already-escaped characters alone
+LATEX_COMMAND_MARKERS = ('\\href', '\\&', '\\%', '\\$', '\\#')
+
+# Simple mode: every special character is escaped. Applied as a chain of
+# str.replace calls rather than one pass: each is a C-level scan skipped
+# entirely when the character is absent, and on CV-like text the chain ran
+# about 1.5x faster than a single regex with a dict callback and 2.5x faster
+# than str.translate (which builds its output one character at a time once a
+# replacement is longer than one character). Order matters: the braces of
+# \textasciicircum{} get escaped by the later steps, exactly as before.
+_SIMPLE_ESCAPES = (
+    ('&', r'\&'),
+    ('%', r'\%'),
+    ('$', r'\$'),
+    ('#', r'\#'),
+    ('^', r'\textasciicircum{}'),
+    ('_', r'\_'),
+    ('{', r'\{'),
+    ('}', r'\}'),
+    ('~', r'\textasciitilde{}'),
+)
+
+# Careful mode: only characters not already preceded by a backslash; & and %
+# are also left alone when directly followed by a word character
+_CAREFUL_ESCAPE_RE = re.compile(r'(?<!\\)(?:[&%](?!\w)|[$#_{}^~])')
+_CAREFUL_ESCAPES = {
+    '&': r'\&',
+    '%': r'\%',
+    '$': r'\$',
+    '#': r'\#',
+    '_': r'\_',
+    '{': r'\{',
+    '}': r'\}',
+    '^': r'\textasciicircum{}',
+    '~': r'\textasciitilde{}',
+}
+
+def _careful_escape(match):
+    return _CAREFUL_ESCAPES[match.group()]
+
+def escape_latex(text):
+    """Escape special LaTeX characters (but preserve existing LaTeX commands)
+
+    When the text already contains LaTeX, a single precompiled regex pass
+    escapes only the characters that are not escaped yet.
+    """
+    # Don't escape if text already contains LaTeX commands (like \href, \&, etc.)
+    if '\\' in text and any(cmd in text for cmd in LATEX_COMMAND_MARKERS):
+        # Text already has some LaTeX - only escape unescaped special chars
+        return _CAREFUL_ESCAPE_RE.sub(_careful_escape, text)
+    # Simple case - escape all special chars
+    for char, replacement in _SIMPLE_ESCAPES:
+        if char in text:
+            text = text.replace(char, replacement)
+    return text
+
+PROJECT_LINK_RE = re.compile(r'GitHub:\s*(https?://[^\s|]+)')
+
+def split_project_links(links_line):
+    """Split "GitHub: <url> | <status>" into (github_url, status)"""
+    github_match = PROJECT_LINK_RE.search(links_line)
+    status = links_line.split('|', 1)[1].strip() if '|' in links_line else ""
+    return (github_match.group(1) if github_match else ""), status
+
+# ==============================================
+# BUILD INSTRUMENTATION
+# ==============================================
+# Pipeline stages are wrapped in profile_stage(...). When no profiler is
+# active this is a cheap no-op; with one installed via set_profiler() every
+# stage records wall time, CPU time (ours and pdflatex's), pdflatex peak RSS
+# and bytes written, and is passed to any registered hooks.
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+def _child_usage():
+    """(CPU seconds, peak RSS in KB) of finished child processes, or (None, None)"""
+    if resource is None:
+        return None, None
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    # ru_maxrss is KB on Linux and bytes on macOS
+    rss_kb = usage.ru_maxrss / 1024 if platform.system() == 'Darwin' else usage.ru_maxrss
+    return usage.ru_utime + usage.ru_stime, rss_kb
+
+class BuildProfiler:
+    """Collects one event per pipeline stage and forwards it to hooks
+
+    Each event is a dict with name, start (seconds since the profiler was
+    created), wall_ms, cpu_ms, child_cpu_ms, child_peak_rss_kb,
+    bytes_written and any extra args the stage attached. child_peak_rss_kb
+    is the largest RSS of any pdflatex run so far (the OS only reports a
+    running maximum for children).
+    """
+
+    def __init__(self, hooks=None):
+        self.events = []
+        self.hooks = list(hooks or [])
+        self._origin = time.perf_counter()
+        self._depth = 0
+
+    def add_hook(self, callback):
+        """Call callback(event) whenever a stage finishes"""
+        self.hooks.append(callback)
+
+    @contextlib.contextmanager
+    def stage(self, name, **args):
+        info = dict(args)
+        child_cpu_before, _ = _child_usage()
+        cpu_before = time.process_time()
+        start = time.perf_counter()
+        self._depth += 1
+        try:
+            yield info
+        finally:
+            self._depth -= 1
+            end = time.perf_counter()
+            child_cpu_after, child_rss = _child_usage()
+            event = {
+                'name': name,
+                'depth': self._depth,
+                'start': start - self._origin,
+                'wall_ms': (end - start) * 1000,
+                'cpu_ms': (time.process_time() - cpu_before) * 1000,
+                'child_cpu_ms': (child_cpu_after - child_cpu_before) * 1000 if child_cpu_after is not None else None,
+                'child_peak_rss_kb': child_rss if child_cpu_after != child_cpu_before else None,
+                'bytes_written': info.pop('bytes_written', 0),
+                'args': info,
+            }
+            self.events.append(event)
+            for hook in self.hooks:
+                hook(event)
+
+    def report(self):
+        """Breakdown table of all recorded stages, in start order"""
+        lines = [f"{'stage':<28} {'wall':>10} {'cpu':>9} {'tex cpu':>9} {'tex rss':>9} {'written':>10}"]
+        for e in sorted(self.events, key=lambda e: e['start']):
+            child_cpu = f"{e['child_cpu_ms']:.1f}ms" if e['child_cpu_ms'] else '-'
+            rss = f"{e['child_peak_rss_kb'] / 1024:.1f}MB" if e['child_peak_rss_kb'] else '-'
+            written = f"{e['bytes_written'] / 1024:.1f}KB" if e['bytes_written'] else '-'
+            name = '  ' * e['depth'] + e['name']
+            lines.append(f"{name:<28} {e['wall_ms']:>8.1f}ms {e['cpu_ms']:>7.1f}ms {child_cpu:>9} {rss:>9} {written:>10}")
+        top_level = sum(e['wall_ms'] for e in self.events if e['depth'] == 0)
+        lines.append(f"{'total':<28} {top_level:>8.1f}ms")
+        return '\n'.join(lines)
+
+    def chrome_trace(self):
+        """Events in Chrome trace-event format (load in chrome://tracing or Perfetto)"""
+        trace_events = []
+        for e in self.events:
+            args = dict(e['args'])
+            for key in ('cpu_ms', 'child_cpu_ms', 'child_peak_rss_kb', 'bytes_written'):
+                if e[key] is not None:
+                    args[key] = e[key]
+            trace_events.append({
+                'name': e['name'],
+                'cat': 'cv-build',
+                'ph': 'X',
+                'ts': e['start'] * 1e6,
+                'dur': e['wall_ms'] * 1e3,
+                'pid': os.getpid(),
+                'tid': 0,
+                'args': args,
+            })
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f, indent=1)
+
+_profiler = None
+
+def set_profiler(profiler):
+    """Install (or with None, remove) the profiler used by profile_stage"""
+    global _profiler
+    _profiler = profiler
+
+@contextlib.contextmanager
+def profile_stage(name, **args):
+    """Record a pipeline stage on the active profiler; yields a dict for extra data"""
+    if _profiler is None:
+        yield {}
+    else:
+        with _profiler.stage(name, **args) as info:
+            yield info
+
+# ==============================================
+# OUTPUT PUBLISHING
+# ==============================================
+# public/CV.pdf is served straight from the site, so it is only ever swapped
+# atomically with os.replace (readers see the old or the new file, never a
+# missing or half-written one), and left untouched when the bytes are the same
+# so CDN caches and ETags stay valid. Work in progress never lives in an output
+# directory: public/ is served as static files, so build directories and
+# half-written outputs go to SCRATCH_DIR, under the (hidden, git-ignored)
+# .cv_build/ and normally on the same filesystem, so publishing is a rename.
+SCRATCH_DIR = os.path.join('.cv_build', 'tmp')
+
+def scratch_dir(prefix):
+    """New private directory under SCRATCH_DIR; the caller removes it"""
+    os.makedirs(SCRATCH_DIR, exist_ok=True)
+    return os.path.abspath(tempfile.mkdtemp(prefix=prefix, dir=SCRATCH_DIR))
+
+def scratch_file(prefix, suffix=''):
+    """New (fd, path) temp file under SCRATCH_DIR; the caller removes it"""
+    os.makedirs(SCRATCH_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix=prefix, suffix=suffix, dir=SCRATCH_DIR)
+    return fd, os.path.abspath(path)
+
+def files_identical(a, b):
+    """True if both files exist and have the same bytes"""
+    try:
+        if os.path.samefile(a, b):
+            return True
+        if os.path.getsize(a) != os.path.getsize(b):
+            return False
+    except OSError:
+        return False
+    return filecmp.cmp(a, b, shallow=False)
+
+def _fsync_dir(path):
+    """Persist a rename by syncing its directory (no-op where unsupported)"""
+    if platform.system() == 'Windows':
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _default_file_mode(output_file):
+    """Mode for a newly published file: the existing file's, else 0666 minus umask
+
+    Temp files from mkstemp are 0600, which the web server may not be able
+    to read.
+    """
+    try:
+        return os.stat(output_file).st_mode & 0o777
+    except OSError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+def publish_pdf(pdf_file, output_file, keep_source=False):
+    """Atomically put pdf_file at output_file; returns False if it was already identical
+
+    When pdf_file is on the same filesystem as output_file it is fsynced
+    and renamed into place (no copy). Otherwise it is copied to a temp file
+    next to output_file first. With keep_source=True the source is
+    hardlinked (or copied) instead of moved, e.g. when publishing from the
+    build cache.
+    """
+    output_dir = os.path.dirname(os.path.abspath(output_file))
+    os.makedirs(output_dir, exist_ok=True)
+    
+    if files_identical(pdf_file, output_file):
+        if not keep_source and not os.path.samefile(pdf_file, output_file):
+            os.remove(pdf_file)
+        return False
+    
+    mode = _default_file_mode(output_file)
+    same_device = os.stat(pdf_file).st_dev == os.stat(output_dir).st_dev
+    if same_device and not keep_source:
+        with open(pdf_file, 'rb') as f:
+            os.fsync(f.fileno())
+        os.chmod(pdf_file, mode)
+        os.replace(pdf_file, output_file)
+    else:
+        fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(output_file) + '.', dir=output_dir)
+        os.close(fd)
+        try:
+            linked = False
+            if same_device:
+                try:
+                    os.remove(tmp_path)
+                    os.link(pdf_file, tmp_path)
+                    linked = True
+                except OSError:
+                    pass
+            if not linked:
+                with open(pdf_file, 'rb') as src, open(tmp_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.chmod(tmp_path, mode)
+            os.replace(tmp_path, output_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        if not keep_source:
+            os.remove(pdf_file)
+    _fsync_dir(output_dir)
+    return True
+
+def write_if_changed(path, content):
+    """Write text to path only when it differs from what is already there"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
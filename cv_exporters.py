@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Export a parsed CV as HTML, Markdown or ATS-friendly plain text
+Each renderer streams straight into a file-like object as it walks the
+CVDocument, so no LaTeX, subprocess or whole-document string is involved.
+All formats are written from a single parse by export_cv.
+"""
+
+import os
+import re
+import html
+from urllib.parse import quote
+
+from cv_common import publish_pdf, scratch_file, split_project_links
+
+# Body sections in document order, with the headings generate_latex uses
+SECTIONS = [
+    ('experience', 'Professional Experience'),
+    ('education', 'Education'),
+    ('skills', 'Technical Skills'),
+    ('projects', 'Projects'),
+]
+
+class CVRenderer:
+    """Base renderer: walks a CVDocument and calls one hook per part
+
+    Subclasses write each part to self.out as soon as it is reached.
+    """
+    extension = ''
+
+    def __init__(self, out):
+        self.out = out
+        self.write = out.write
+
+    def render(self, cv):
+        self.begin(cv)
+        if cv.header:
+            self.header(cv.header)
+        for attr, title in SECTIONS:
+            entries = getattr(cv, attr)
+            if entries is not None:
+                self.section_start(title)
+                for entry in entries:
+                    getattr(self, attr)(entry)
+                self.section_end(title)
+        self.end(cv)
+
+    def begin(self, cv):
+        pass
+
+    def end(self, cv):
+        pass
+
+    def section_start(self, title):
+        pass
+
+    def section_end(self, title):
+        pass
+
+class HTMLRenderer(CVRenderer):
+    """Standalone semantic HTML page"""
+    extension = 'html'
+
+    STYLE = ("body{font-family:'Times New Roman',Times,serif;max-width:52em;margin:2em auto;padding:0 1em;"
+             "line-height:1.35}h1{text-align:center;margin-bottom:.2em}.contact{text-align:center}"
+             "h2{border-bottom:1px solid #000;margin-top:1.2em}.entry-head{display:flex;"
+             "justify-content:space-between;font-weight:bold}ul{margin:.3em 0}")
+
+    def begin(self, cv):
+        title = html.escape(cv.header.name if cv.header else 'CV')
+        self.write('<!DOCTYPE html>\n<html lang="en">\n<head>\n<meta charset="utf-8">\n'
+                   f'<title>{title}</title>\n<style>{self.STYLE}</style>\n</head>\n<body>\n')
+
+    def end(self, cv):
+        self.write('</body>\n</html>\n')
+
+    def _link(self, url, label):
+        return f'<a href="{html.escape(url)}">{html.escape(label)}</a>'
+
+    def _list(self, items):
+        if items:
+            self.write('<ul>\n')
+            for item in items:
+                self.write(f'<li>{html.escape(item)}</li>\n')
+            self.write('</ul>\n')
+
+    def _technologies(self, technologies):
+        if technologies:
+            self.write(f'<p class="technologies"><strong>Technologies:</strong> '
+                       f'{html.escape(", ".join(technologies))}</p>\n')
+
+    def header(self, header):
+        self.write(f'<header>\n<h1>{html.escape(header.name)}</h1>\n')
+        if header.contact:
+            self.write(f'<p class="contact">{html.escape(header.contact)}</p>\n')
+        if header.links:
+            links = ' | '.join(self._link(url, label) for label, url in header.links)
+            self.write(f'<p class="contact">{links}</p>\n')
+        self.write('</header>\n')
+        if header.bio:
+            self.write(f'<section>\n<h2>Summary</h2>\n<p>{html.escape(" ".join(header.bio))}</p>\n</section>\n')
+
+    def section_start(self, title):
+        self.write(f'<section>\n<h2>{html.escape(title)}</h2>\n')
+        if title == 'Technical Skills':
+            self.write('<ul>\n')
+
+    def section_end(self, title):
+        if title == 'Technical Skills':
+            self.write('</ul>\n')
+        self.write('</section>\n')
+
+    def experience(self, entry):
+        role = f"{entry.position}, {entry.company}" if entry.company else entry.position
+        self.write(f'<article>\n<div class="entry-head"><span>{html.escape(role)}</span>'
+                   f'<span>{html.escape(entry.dates)}</span></div>\n')
+        if entry.intro:
+            self.write(f'<p>{html.escape(entry.intro)}</p>\n')
+        self._list(entry.description)
+        self._technologies(entry.technologies)
+        self.write('</article>\n')
+
+    def education(self, entry):
+        self.write(f'<article>\n<div class="entry-head"><span>{html.escape(entry.degree)}</span>'
+                   f'<span>{html.escape(entry.dates)}</span></div>\n'
+                   f'<p>{html.escape(entry.institution)}, {html.escape(entry.location)}</p>\n</article>\n')
+
+    def skills(self, skill):
+        self.write(f'<li><strong>{html.escape(skill.category)}:</strong> '
+                   f'{html.escape(", ".join(skill.items))}</li>\n')
+
+    def projects(self, project):
+        self.write(f'<article>\n<div class="entry-head"><span>{html.escape(project.title)}</span></div>\n')
+        if project.description:
+            self.write(f'<p>{html.escape(project.description)}</p>\n')
+        if project.links_line:
+            github_url, status = split_project_links(project.links_line)
+            if github_url:
+                line = self._link(github_url, 'GitHub')
+                if status:
+                    line += f' | {html.escape(status)}'
+            else:
+                line = html.escape(project.links_line)
+            self.write(f'<p>{line}</p>\n')
+        self._list(project.highlights)
+        self._technologies(project.technologies)
+        self.write('</article>\n')
+
+MARKDOWN_SPECIAL_RE = re.compile(r'([\\`*_\[\]<>|])')
+MARKDOWN_BLOCK_START_RE = re.compile(r'^([#>+-])')
+# "2019. Foo" would start an ordered list; CommonMark only honours the escape on the delimiter
+MARKDOWN_ORDERED_LIST_RE = re.compile(r'^(\d{1,9})([.)])')
+# Characters that may stay unencoded inside a <...> link destination
+MARKDOWN_URL_SAFE = "/:?#[]@!$&'()*+,;=%~"
+
+def escape_markdown(text):
+    """Escape characters Markdown would treat as inline or block syntax"""
+    text = MARKDOWN_SPECIAL_RE.sub(r'\\\1', text)
+    text = MARKDOWN_BLOCK_START_RE.sub(r'\\\1', text)
+    return MARKDOWN_ORDERED_LIST_RE.sub(r'\1\\\2', text)
+
+def markdown_url(url):
+    """url percent-encoded so it can't end a <...> link destination (>, <, spaces, newlines)"""
+    return quote(url, safe=MARKDOWN_URL_SAFE)
+
+class MarkdownRenderer(CVRenderer):
+    """GitHub-flavoured Markdown"""
+    extension = 'md'
+
+    def _list(self, items):
+        if items:
+            for item in items:
+                self.write(f'- {escape_markdown(item)}\n')
+            self.write('\n')
+
+    def _technologies(self, technologies):
+        if technologies:
+            self.write(f'*Technologies:* {escape_markdown(", ".join(technologies))}\n\n')
+
+    def header(self, header):
+        self.write(f'# {escape_markdown(header.name)}\n\n')
+        if header.contact:
+            self.write(f'{escape_markdown(header.contact)}\n\n')
+        if header.links:
+            self.write(' | '.join(f'[{escape_markdown(label)}](<{markdown_url(url)}>)'
+                                  for label, url in header.links) + '\n\n')
+        if header.bio:
+            self.write(f'## Summary\n\n{escape_markdown(" ".join(header.bio))}\n\n')
+
+    def section_start(self, title):
+        self.write(f'## {title}\n\n')
+
+    def section_end(self, title):
+        if title == 'Technical Skills':
+            self.write('\n')
+
+    def experience(self, entry):
+        role = f"{entry.position}, {entry.company}" if entry.company else entry.position
+        dates = f' — {escape_markdown(entry.dates)}' if entry.dates else ''
+        self.write(f'### {escape_markdown(role)}{dates}\n\n')
+        if entry.intro:
+            self.write(f'{escape_markdown(entry.intro)}\n\n')
+        self._list(entry.description)
+        self._technologies(entry.technologies)
+
+    def education(self, entry):
+        dates = f' — {escape_markdown(entry.dates)}' if entry.dates else ''
+        self.write(f'### {escape_markdown(entry.degree)}{dates}\n\n'
+                   f'{escape_markdown(entry.institution)}, {escape_markdown(entry.location)}\n\n')
+
+    def skills(self, skill):
+        self.write(f'- **{escape_markdown(skill.category)}:** {escape_markdown(", ".join(skill.items))}\n')
+
+    def projects(self, project):
+        self.write(f'### {escape_markdown(project.title)}\n\n')
+        if project.description:
+            self.write(f'{escape_markdown(project.description)}\n\n')
+        if project.links_line:
+            github_url, status = split_project_links(project.links_line)
+            if github_url:
+                line = f'[GitHub](<{markdown_url(github_url)}>)'
+                if status:
+                    line += f' \\| {escape_markdown(status)}'
+            else:
+                line = escape_markdown(project.links_line)
+            self.write(f'{line}\n\n')
+        self._list(project.highlights)
+        self._technologies(project.technologies)
+
+class PlainTextRenderer(CVRenderer):
+    """Plain text for applicant tracking systems
+
+    One fact per line, upper-case section headings, ASCII bullets and full
+    URLs, since ATS parsers drop formatting and link targets.
+    """
+    extension = 'txt'
+
+    def _list(self, items):
+        for item in items:
+            self.write(f'- {item}\n')
+
+    def _technologies(self, technologies):
+        if technologies:
+            self.write(f'Technologies: {", ".join(technologies)}\n')
+
+    def header(self, header):
+        self.write(f'{header.name}\n')
+        if header.contact:
+            self.write(f'{header.contact}\n')
+        for label, url in header.links:
+            self.write(f'{label}: {url}\n')
+        if header.bio:
+            self.write(f'\nSUMMARY\n{" ".join(header.bio)}\n')
+
+    def section_start(self, title):
+        self.write(f'\n{title.upper()}\n')
+
+    def experience(self, entry):
+        self.write(f'\n{entry.position}\n')
+        if entry.company:
+            self.write(f'{entry.company}\n')
+        if entry.dates:
+            self.write(f'{entry.dates}\n')
+        if entry.intro:
+            self.write(f'{entry.intro}\n')
+        self._list(entry.description)
+        self._technologies(entry.technologies)
+
+    def education(self, entry):
+        self.write(f'\n{entry.degree}\n{entry.institution}, {entry.location}\n')
+        if entry.dates:
+            self.write(f'{entry.dates}\n')
+
+    def skills(self, skill):
+        self.write(f'{skill.category}: {", ".join(skill.items)}\n')
+
+    def projects(self, project):
+        self.write(f'\n{project.title}\n')
+        if project.description:
+            self.write(f'{project.description}\n')
+        if project.links_line:
+            github_url, status = split_project_links(project.links_line)
+            if github_url:
+                self.write(f'GitHub: {github_url}\n')
+                if status:
+                    self.write(f'{status}\n')
+            else:
+                self.write(f'{project.links_line}\n')
+        self._list(project.highlights)
+        self._technologies(project.technologies)
+
+RENDERERS = {renderer.extension: renderer for renderer in (HTMLRenderer, MarkdownRenderer, PlainTextRenderer)}
+
+def render_cv(cv, fmt, out):
+    """Stream cv in format fmt ('html', 'md' or 'txt') into the text file out"""
+    try:
+        renderer = RENDERERS[fmt]
+    except KeyError:
+        raise ValueError(f"unknown export format {fmt!r} (expected one of {', '.join(RENDERERS)})") from None
+    renderer(out).render(cv)
+
+def export_cv(cv, formats, output_dir, basename='CV'):
+    """Write output_dir/<basename>.<fmt> for each format; returns {fmt: (path, changed)}
+
+    Each file is streamed into a scratch file and published atomically,
+    leaving unchanged outputs untouched.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = {}
+    for fmt in formats:
+        path = os.path.join(output_dir, f"{basename}.{fmt}")
+        fd, tmp_path = scratch_file(prefix=f'{basename}-', suffix='.' + fmt)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as out:
+                render_cv(cv, fmt, out)
+            written[fmt] = (path, publish_pdf(tmp_path, path))
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    return written
@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+"""
+Render a parsed CV straight to PDF without LaTeX (fast preview backend)
+Lays out the same structure generate_latex produces - centered header,
+\\cvsection headings with rules, \\hfill-aligned dates and itemize bullets -
+using the standard Times fonts, so no TeX installation or subprocess is needed.
+pdflatex remains the high-fidelity path.
+"""
+
+import zlib
+from functools import lru_cache
+
+from cv_common import split_project_links
+
+# Page geometry, matching the LaTeX preamble (letter paper, 10pt article)
+PAGE_WIDTH = 612.0
+PAGE_HEIGHT = 792.0
+INCH = 72.0
+MARGIN_X = 0.45 * INCH
+MARGIN_TOP = 0.4 * INCH
+MARGIN_BOTTOM = 0.4 * INCH
+TEXT_WIDTH = PAGE_WIDTH - 2 * MARGIN_X
+
+BODY_SIZE = 10.0
+LARGE_SIZE = 12.0
+HUGE_SIZE = 20.74
+LEADING = 1.2
+PARSKIP = 3.0
+ITEM_INDENT = 15.0     # leftmargin=1.5em
+LABEL_SEP = 5.0
+ITEM_SEP = 3.0 + 1.0   # itemsep + parsep
+LIST_TOPSEP = 3.0
+RULE_WIDTH = 0.4
+
+REGULAR = 'F1'
+BOLD = 'F2'
+FONT_NAMES = {REGULAR: 'Times-Roman', BOLD: 'Times-Bold'}
+
+BLACK = (0, 0, 0)
+BLUE = (0, 0, 1)
+
+# Glyph widths (1/1000 em) of the standard Times fonts for WinAnsi codes 32-255
+TIMES_ROMAN_WIDTHS = (
+    250, 333, 408, 500, 500, 833, 778, 180, 333, 333, 500, 564, 250, 333, 250, 278,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 278, 278, 564, 564, 564, 444,
+    921, 722, 667, 667, 722, 611, 556, 722, 722, 333, 389, 722, 611, 889, 722, 722,
+    556, 722, 667, 556, 611, 722, 722, 944, 722, 722, 611, 333, 278, 333, 469, 500,
+    333, 444, 500, 444, 500, 444, 333, 500, 500, 278, 278, 500, 278, 778, 500, 500,
+    500, 500, 333, 389, 278, 500, 500, 722, 500, 500, 444, 480, 200, 480, 541, 350,
+    500, 350, 333, 500, 444, 1000, 500, 500, 333, 1000, 556, 333, 889, 350, 611, 350,
+    350, 333, 333, 444, 444, 350, 500, 1000, 333, 980, 389, 333, 722, 350, 444, 722,
+    250, 333, 500, 500, 500, 500, 200, 500, 333, 760, 276, 500, 564, 333, 760, 333,
+    400, 564, 300, 300, 333, 500, 453, 250, 333, 300, 310, 500, 750, 750, 750, 444,
+    722, 722, 722, 722, 722, 722, 889, 667, 611, 611, 611, 611, 333, 333, 333, 333,
+    722, 722, 722, 722, 722, 722, 722, 564, 722, 722, 722, 722, 722, 722, 556, 500,
+    444, 444, 444, 444, 444, 444, 667, 444, 444, 444, 444, 444, 278, 278, 278, 278,
+    500, 500, 500, 500, 500, 500, 500, 564, 500, 500, 500, 500, 500, 500, 500, 500,
+)
+
+TIMES_BOLD_WIDTHS = (
+    250, 333, 555, 500, 500, 1000, 833, 278, 333, 333, 500, 570, 250, 333, 250, 278,
+    500, 500, 500, 500, 500, 500, 500, 500, 500, 500, 333, 333, 570, 570, 570, 500,
+    930, 722, 667, 722, 722, 667, 611, 778, 778, 389, 500, 778, 667, 944, 722, 778,
+    611, 778, 722, 556, 667, 722, 722, 1000, 722, 722, 667, 333, 278, 333, 581, 500,
+    333, 500, 556, 444, 556, 444, 333, 500, 556, 278, 333, 556, 278, 833, 556, 500,
+    556, 556, 444, 389, 333, 556, 500, 722, 500, 500, 444, 394, 220, 394, 520, 350,
+    500, 350, 333, 500, 500, 1000, 500, 500, 333, 1000, 556, 333, 1000, 350, 667, 350,
+    350, 333, 333, 500, 500, 350, 500, 1000, 333, 1000, 389, 333, 722, 350, 444, 722,
+    250, 333, 500, 500, 500, 500, 220, 500, 333, 747, 300, 500, 570, 333, 747, 333,
+    400, 570, 300, 300, 333, 556, 540, 250, 333, 300, 330, 500, 750, 750, 750, 500,
+    722, 722, 722, 722, 722, 722, 1000, 722, 667, 667, 667, 667, 389, 389, 389, 389,
+    722, 722, 778, 778, 778, 778, 778, 570, 778, 722, 722, 722, 722, 722, 611, 556,
+    500, 500, 500, 500, 500, 500, 722, 444, 444, 444, 444, 444, 278, 278, 278, 278,
+    500, 556, 500, 500, 500, 500, 500, 570, 500, 556, 556, 556, 556, 500, 556, 500,
+)
+
+FONT_WIDTHS = {REGULAR: TIMES_ROMAN_WIDTHS, BOLD: TIMES_BOLD_WIDTHS}
+
+def encode_text(text):
+    """Encode text as WinAnsi (cp1252) bytes, replacing unsupported characters"""
+    return text.encode('cp1252', errors='replace')
+
+@lru_cache(maxsize=4096)
+def text_width(text, font, size):
+    """Width of text in points (memoized - words repeat a lot in a CV)"""
+    widths = FONT_WIDTHS[font]
+    return sum(widths[b - 32] if b >= 32 else 0 for b in encode_text(text)) * size / 1000.0
+
+def _pdf_string(data):
+    return b'(' + data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+def _num(value):
+    return f"{value:.2f}".rstrip('0').rstrip('.')
+
+class _Layout:
+    """Top-down layout cursor that emits PDF content operators page by page"""
+
+    def __init__(self):
+        self.pages = []
+        self._new_page()
+
+    def _new_page(self):
+        self.ops = []
+        self.annots = []
+        self.pages.append((self.ops, self.annots))
+        self.y = PAGE_HEIGHT - MARGIN_TOP
+
+    def space(self, height):
+        self.y -= height
+
+    def _take_line(self, size):
+        """Reserve one line of text; returns its baseline"""
+        height = size * LEADING
+        if self.y - height < MARGIN_BOTTOM:
+            self._new_page()
+        baseline = self.y - size
+        self.y -= height
+        return baseline
+
+    def _draw_words(self, words, baseline, size):
+        """words: (x, text, font, color, url) tuples on one baseline"""
+        ops = self.ops
+        ops.append('BT')
+        current_font = current_color = None
+        for x, text, font, color, url in words:
+            if font != current_font:
+                ops.append(f"/{font} {_num(size)} Tf")
+                current_font = font
+            if color != current_color:
+                ops.append(f"{color[0]} {color[1]} {color[2]} rg")
+                current_color = color
+            ops.append(f"1 0 0 1 {_num(x)} {_num(baseline)} Tm")
+            ops.append(_pdf_string(encode_text(text)).decode('latin-1') + ' Tj')
+            if url:
+                width = text_width(text, font, size)
+                self.annots.append((x, baseline - size * 0.22, x + width, baseline + size * 0.78, url))
+        ops.append('ET')
+
+    def line(self, left=(), right=(), size=BODY_SIZE, center=False):
+        """One line: left runs flush left (or centered), right runs flush right (\\hfill)"""
+        baseline = self._take_line(size)
+        words = []
+        total = sum(text_width(t, f, size) for t, f, *_ in left)
+        x = MARGIN_X + (TEXT_WIDTH - total) / 2 if center else MARGIN_X
+        for text, font, *rest in left:
+            color, url = (rest + [BLACK, None])[:2] if rest else (BLACK, None)
+            words.append((x, text, font, color, url))
+            x += text_width(text, font, size)
+        right_total = sum(text_width(t, f, size) for t, f, *_ in right)
+        x = MARGIN_X + TEXT_WIDTH - right_total
+        for text, font, *rest in right:
+            color, url = (rest + [BLACK, None])[:2] if rest else (BLACK, None)
+            words.append((x, text, font, color, url))
+            x += text_width(text, font, size)
+        self._draw_words(words, baseline, size)
+
+    def paragraph(self, runs, indent=0.0, size=BODY_SIZE, justify=True, label=None):
+        """Word-wrap runs of (text, font[, color, url]) into justified lines"""
+        tokens = []
+        for run in runs:
+            text, font = run[0], run[1]
+            color = run[2] if len(run) > 2 else BLACK
+            url = run[3] if len(run) > 3 else None
+            pieces = text.split(' ')
+            for i, piece in enumerate(pieces):
+                # glue: a space precedes this token, so the line may break here
+                if piece:
+                    tokens.append((piece, font, color, url, i > 0 or text[:1] == ' '))
+        if not tokens:
+            return
+        
+        x0 = MARGIN_X + indent
+        width = TEXT_WIDTH - indent
+        lines = []
+        current = []
+        current_width = 0.0
+        for token in tokens:
+            piece, font = token[0], token[1]
+            w = text_width(piece, font, size)
+            gap = text_width(' ', font, size) if (current and token[4]) else 0.0
+            if current and token[4] and current_width + gap + w > width:
+                lines.append(current)
+                current, current_width, gap = [], 0.0, 0.0
+            current.append((token, w, gap))
+            current_width += gap + w
+        if current:
+            lines.append(current)
+        
+        for index, line_tokens in enumerate(lines):
+            baseline = self._take_line(size)
+            natural = sum(w + gap for _, w, gap in line_tokens)
+            gaps = sum(1 for _, _, gap in line_tokens if gap)
+            last = index == len(lines) - 1
+            stretch = (width - natural) / gaps if (justify and not last and gaps) else 0.0
+            words = []
+            x = x0
+            for token, w, gap in line_tokens:
+                if gap:
+                    x += gap + stretch
+                words.append((x, token[0], token[1], token[2], token[3]))
+                x += w
+            if label is not None and index == 0:
+                label_width = text_width(label, REGULAR, size)
+                words.insert(0, (x0 - LABEL_SEP - label_width, label, REGULAR, BLACK, None))
+            self._draw_words(words, baseline, size)
+
+    def rule(self):
+        if self.y - RULE_WIDTH < MARGIN_BOTTOM:
+            self._new_page()
+        y = self.y - RULE_WIDTH / 2
+        self.ops.append(f"{_num(RULE_WIDTH)} w 0 G {_num(MARGIN_X)} {_num(y)} m "
+                        f"{_num(MARGIN_X + TEXT_WIDTH)} {_num(y)} l S")
+        self.y -= RULE_WIDTH
+
+    def itemize(self, items, topsep=LIST_TOPSEP, itemsep=ITEM_SEP):
+        """Bulleted list; each item is a list of runs"""
+        self.space(topsep)
+        for i, runs in enumerate(items):
+            if i:
+                self.space(itemsep)
+            self.paragraph(runs, indent=ITEM_INDENT, label='•')
+        self.space(topsep)
+
+def _section(layout, title):
+    """\\cvsection: gap, large bold title, rule, gap"""
+    layout.space(0.1 * INCH + PARSKIP)
+    layout.line([(title, BOLD)], size=LARGE_SIZE)
+    layout.space(0.03 * INCH)
+    layout.rule()
+    layout.space(0.06 * INCH)
+
+def _links_line(links):
+    runs = []
+    for i, (label, url) in enumerate(links):
+        if i:
+            runs.append((' | ', REGULAR))
+        runs.append((label, REGULAR, BLUE, url))
+    return runs
+
+def layout_cv(cv):
+    """Lay out a CVDocument and return the _Layout with its pages"""
+    layout = _Layout()
+    
+    header = cv.header
+    if header:
+        layout.line([(header.name, BOLD)], size=HUGE_SIZE, center=True)
+        layout.space(0.08 * INCH)
+        if header.contact:
+            layout.line([(header.contact, REGULAR)], center=True)
+        if header.links:
+            layout.space(0.03 * INCH)
+            layout.line(_links_line(header.links), center=True)
+        layout.space(0.05 * INCH)
+        
+        if header.bio:
+            layout.space(0.08 * INCH + PARSKIP)
+            layout.line([('Summary', BOLD)], size=LARGE_SIZE)
+            layout.space(0.06 * INCH + PARSKIP)
+            layout.paragraph([(' '.join(header.bio), REGULAR)])
+    
+    if cv.experience is not None:
+        _section(layout, 'Professional Experience')
+        for entry in cv.experience:
+            role = f"{entry.position}, {entry.company}" if entry.company else entry.position
+            layout.line([(role, BOLD)], [(entry.dates, REGULAR)])
+            if entry.intro:
+                layout.paragraph([(entry.intro, REGULAR)])
+            if entry.description:
+                layout.itemize([[(d, REGULAR)] for d in entry.description])
+            layout.space(PARSKIP)
+    
+    if cv.education is not None:
+        _section(layout, 'Education')
+        for entry in cv.education:
+            layout.line([(entry.degree, BOLD)], [(entry.dates, REGULAR)])
+            layout.paragraph([(f"{entry.institution}, {entry.location}", REGULAR)])
+            layout.space(PARSKIP)
+    
+    if cv.skills is not None:
+        _section(layout, 'Technical Skills')
+        layout.itemize([[(f"{s.category}:", BOLD), (' ' + ', '.join(s.items), REGULAR)] for s in cv.skills])
+    
+    if cv.projects is not None:
+        _section(layout, 'Projects')
+        for project in cv.projects:
+            layout.line([(project.title, BOLD)])
+            if project.description:
+                layout.paragraph([(project.description, REGULAR)])
+            if project.links_line:
+                github_url, status = split_project_links(project.links_line)
+                if github_url:
+                    runs = [('GitHub', REGULAR, BLUE, github_url)]
+                    if status:
+                        runs.append((' | ' + status, REGULAR))
+                    layout.paragraph(runs, justify=False)
+                else:
+                    layout.paragraph([(project.links_line, REGULAR)], justify=False)
+            if project.highlights:
+                layout.space(0.5 * BODY_SIZE)
+                layout.itemize([[(d, REGULAR)] for d in project.highlights], topsep=0.0, itemsep=3.0)
+            layout.space(BODY_SIZE)
+    return layout
+
+def build_pdf(layout, title=''):
+    """Serialize laid-out pages into PDF bytes"""
+    objects = []
+    
+    def add(body):
+        objects.append(body)
+        return len(objects)
+    
+    catalog_id = add(None)
+    pages_id = add(None)
+    font_ids = {}
+    for key, name in FONT_NAMES.items():
+        font_ids[key] = add(f"<< /Type /Font /Subtype /Type1 /BaseFont /{name} "
+                            f"/Encoding /WinAnsiEncoding >>".encode('ascii'))
+    fonts = ' '.join(f"/{key} {obj} 0 R" for key, obj in font_ids.items())
+    
+    page_ids = []
+    for ops, annots in layout.pages:
+        stream = zlib.compress('\n'.join(ops).encode('latin-1'), 9)
+        content_id = add(b"<< /Length " + str(len(stream)).encode() + b" /Filter /FlateDecode >>\nstream\n"
+                         + stream + b"\nendstream")
+        annot_ids = []
+        for x0, y0, x1, y1, url in annots:
+            uri = _pdf_string(url.encode('latin-1', errors='replace')).decode('latin-1')
+            annot_ids.append(add(
+                f"<< /Type /Annot /Subtype /Link /Rect [{_num(x0)} {_num(y0)} {_num(x1)} {_num(y1)}] "
+                f"/Border [0 0 0] /A << /S /URI /URI {uri} >> >>".encode('latin-1')))
+        annots_entry = (" /Annots [" + ' '.join(f"{a} 0 R" for a in annot_ids) + "]") if annot_ids else ""
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_id} 0 R /MediaBox [0 0 {_num(PAGE_WIDTH)} {_num(PAGE_HEIGHT)}] "
+            f"/Resources << /Font << {fonts} >> >> /Contents {content_id} 0 R{annots_entry} >>".encode('latin-1')))
+    
+    objects[catalog_id - 1] = f"<< /Type /Catalog /Pages {pages_id} 0 R >>".encode('ascii')
+    objects[pages_id - 1] = (f"<< /Type /Pages /Kids [{' '.join(f'{p} 0 R' for p in page_ids)}] "
+                             f"/Count {len(page_ids)} >>").encode('ascii')
+    info_id = add(b"<< /Title " + _pdf_string(encode_text(title)) + b" /Producer (cv_pdf_writer) >>")
+    
+    out = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode('ascii') + body + b"\nendobj\n"
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('ascii')
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode('ascii')
+    out += (f"trailer\n<< /Size {len(objects) + 1} /Root {catalog_id} 0 R /Info {info_id} 0 R >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n").encode('ascii')
+    return bytes(out)
+
+def render_cv_pdf(cv, output_file):
+    """Render a CVDocument to output_file; returns the number of pages"""
+    layout = layout_cv(cv)
+    data = build_pdf(layout, title=cv.header.name if cv.header else '')
+    with open(output_file, 'wb') as f:
+        f.write(data)
+    return len(layout.pages)
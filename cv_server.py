@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+HTTP server that renders CV PDFs on demand
+POST CV_DATA.txt text to /render and the PDF comes back. Each render runs in
+its own scratch directory (nothing touches cv.tex or public/CV.pdf) on a
+bounded worker pool behind a bounded queue, and every request has a
+deadline. Requests whose generated LaTeX is identical share one compile
+while it is in flight, and recent PDFs are answered from an in-memory LRU.
+Usage: python cv_server.py --port 8800 --workers 2 --timeout 60
+    curl --data-binary @CV_DATA.txt -o CV.pdf 'http://127.0.0.1:8800/render?layout=compact'
+"""
+
+import os
+import json
+import shutil
+import argparse
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs
+
+import generate_cv_pdf as cvgen
+
+MAX_BODY_BYTES = 1 << 20
+BACKENDS = ('pdflatex', 'python')
+
+class RenderError(Exception):
+    """A request that can't be rendered, with the HTTP status to answer it with"""
+
+    def __init__(self, status, message, retry_after=None):
+        self.status = status
+        self.retry_after = retry_after
+        super().__init__(message)
+
+class PdfLRU:
+    """Rendered PDFs by content key, least recently used evicted first
+
+    Bounded both by entry count and by total bytes; safe to share between
+    request threads.
+    """
+
+    def __init__(self, max_entries=64, max_bytes=64 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            data = self.entries.get(key)
+            if data is not None:
+                self.entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes or self.max_entries <= 0:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.bytes -= len(old)
+            self.entries[key] = data
+            self.bytes += len(data)
+            while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.bytes -= len(evicted)
+
+    def __len__(self):
+        return len(self.entries)
+
+class RenderService:
+    """parse -> lint -> generate -> compile, shared by every request thread
+
+    At most `workers` compiles run at once and at most `max_queue` more wait
+    for a worker; beyond that requests are refused (503) rather than piling
+    up. A request waits at most `timeout` seconds, queueing included (504);
+    its compile keeps running so that later identical requests can use it.
+    """
+
+    def __init__(self, workers=2, max_queue=16, timeout=60, max_passes=4,
+                 cache_entries=64, cache_bytes=64 << 20, backend='pdflatex'):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self.max_passes = max_passes
+        self.backend = backend
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cv-render')
+        self.cache = PdfLRU(cache_entries, cache_bytes)
+        self.lock = threading.Lock()
+        self.inflight = {}  # content key -> Future of the compile producing it
+        self.stats = {'requests': 0, 'hits': 0, 'coalesced': 0, 'compiles': 0,
+                      'failures': 0, 'timeouts': 0, 'rejected': 0}
+        self.engines = {}   # engine name -> version line, for the content key
+
+    def _count(self, name):
+        with self.lock:
+            self.stats[name] += 1
+
+    def engine_id(self, backend, engine):
+        if backend == 'python':
+            return 'cv_pdf_writer'
+        with self.lock:
+            known = self.engines.get(engine)
+        if known is None:
+            path = cvgen.find_tex_engine(engine)
+            if not path:
+                raise RenderError(503, f"{engine} not found on the server")
+            known = cvgen.get_pdflatex_version(path)
+            with self.lock:
+                self.engines[engine] = known
+        return f"{engine}:{known}"
+
+    def prepare(self, body, layout=cvgen.DEFAULT_LAYOUT, backend=None):
+        """Parse, lint and generate; returns (content key, LaTeX, CVDocument, backend)"""
+        backend = backend or self.backend
+        if backend not in BACKENDS:
+            raise RenderError(400, f"unknown backend {backend!r} (expected one of {', '.join(BACKENDS)})")
+        # Templates are executable: never let a request name one outside templates/latex
+        layouts = cvgen.list_layouts()
+        if layout not in layouts:
+            raise RenderError(400, f"unknown layout {layout!r} (available: {', '.join(layouts)})")
+        try:
+            cv = cvgen.parse_cv_bytes(body, source='<request>')
+            issues = cvgen.lint_cv(cv)
+            if issues:
+                raise RenderError(422, '\n'.join(str(issue) for issue in issues))
+            latex_code = cvgen.generate_latex(cv, layout=layout)
+        except (cvgen.CVDataError, cvgen.TemplateError, ValueError) as e:
+            raise RenderError(400, str(e)) from None
+        issues = cvgen.lint_latex(latex_code)
+        if issues:
+            raise RenderError(500, '\n'.join(str(issue) for issue in issues))
+        key = cvgen.content_key(latex_code, self.engine_id(backend, 'pdflatex'))
+        return key, latex_code, cv, backend
+
+    def render(self, body, layout=cvgen.DEFAULT_LAYOUT, backend=None):
+        """PDF bytes for a CV_DATA body; returns (pdf, key, how) with how 'hit', 'miss' or 'coalesced'"""
+        self._count('requests')
+        key, latex_code, cv, backend = self.prepare(body, layout, backend)
+        data = self.cache.get(key)
+        if data is not None:
+            self._count('hits')
+            return data, key, 'hit'
+
+        with self.lock:
+            future = self.inflight.get(key)
+            if future is not None:
+                how = 'coalesced'
+                self.stats['coalesced'] += 1
+            else:
+                if len(self.inflight) >= self.workers + self.max_queue:
+                    self.stats['rejected'] += 1
+                    raise RenderError(503, "render queue is full", retry_after=max(1, int(self.timeout) // 4))
+                how = 'miss'
+                self.stats['compiles'] += 1
+                future = self.pool.submit(self._compile, latex_code, cv, backend)
+                self.inflight[key] = future
+        if how == 'miss':
+            # Outside the lock: on a future that is already done the callback runs right here
+            future.add_done_callback(lambda done: self._finish(key, done))
+
+        try:
+            return future.result(timeout=self.timeout), key, how
+        except FutureTimeout:
+            self._count('timeouts')
+            raise RenderError(504, f"render did not finish within {self.timeout:g}s") from None
+
+    def _finish(self, key, future):
+        # Cache before leaving inflight, so an identical request always finds one of the two
+        with self.lock:
+            if future.exception() is None:
+                self.cache.put(key, future.result())
+            else:
+                self.stats['failures'] += 1
+            self.inflight.pop(key, None)
+
+    def _compile(self, latex_code, cv, backend):
+        """Worker: compile in a private scratch directory and return the PDF bytes"""
+        work_dir = tempfile.mkdtemp(prefix='cv-serve-')
+        try:
+            output_file = os.path.join(work_dir, 'out', 'CV.pdf')
+            os.makedirs(os.path.dirname(output_file))
+            if backend == 'python':
+                from cv_pdf_writer import render_cv_pdf
+                render_cv_pdf(cv, output_file)
+            else:
+                tex_file = os.path.join(work_dir, 'cv.tex')
+                with open(tex_file, 'w', encoding='utf-8') as f:
+                    f.write(latex_code)
+                report = cvgen.compile_latex_to_pdf(tex_file, output_file, build_dir=os.path.join(work_dir, 'build'),
+                                                    max_passes=self.max_passes, on_event=None)
+                if not report:
+                    raise RenderError(500, report.summary())
+            with open(output_file, 'rb') as f:
+                return f.read()
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def health(self):
+        with self.lock:
+            return dict(self.stats, inflight=len(self.inflight), cached=len(self.cache),
+                        cached_bytes=self.cache.bytes, workers=self.workers, max_queue=self.max_queue)
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+class RenderHandler(BaseHTTPRequestHandler):
+    """POST /render (CV_DATA.txt body, ?layout=&backend=) and GET /health"""
+    server_version = 'cv-server/1'
+    protocol_version = 'HTTP/1.1'
+
+    def _send(self, status, body, content_type, headers=()):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status, payload, headers=()):
+        self._send(status, (json.dumps(payload, indent=2) + '\n').encode('utf-8'), 'application/json', headers)
+
+    def do_GET(self):
+        if urlsplit(self.path).path != '/health':
+            self._send_json(404, {'error': 'not found'})
+            return
+        self._send_json(200, self.server.service.health())
+
+    def do_POST(self):
+        url = urlsplit(self.path)
+        if url.path != '/render':
+            self._send_json(404, {'error': 'not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            self._send_json(411, {'error': 'Content-Length required'})
+            return
+        if length < 0:
+            # rfile.read(-1) would block until the client closes the connection
+            self.close_connection = True
+            self._send_json(400, {'error': 'invalid Content-Length'})
+            return
+        if length > MAX_BODY_BYTES:
+            self.close_connection = True
+            self._send_json(413, {'error': f"body larger than {MAX_BODY_BYTES} bytes"})
+            return
+        body = self.rfile.read(length)
+        query = parse_qs(url.query)
+        layout = query.get('layout', [cvgen.DEFAULT_LAYOUT])[0]
+        backend = query.get('backend', [None])[0]
+
+        try:
+            pdf, key, how = self.server.service.render(body, layout=layout, backend=backend)
+        except RenderError as e:
+            headers = [('Retry-After', str(e.retry_after))] if e.retry_after else []
+            self._send_json(e.status, {'error': str(e)}, headers)
+            return
+        except Exception as e:
+            self._send_json(500, {'error': f"{type(e).__name__}: {e}"})
+            return
+
+        etag = f'"{key[:32]}"'
+        if self.headers.get('If-None-Match') == etag:
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self._send(200, pdf, 'application/pdf', [('ETag', etag), ('X-Cache', how),
+                                                  ('Content-Disposition', 'inline; filename="CV.pdf"')])
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+class RenderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, service, quiet=False):
+        super().__init__(address, RenderHandler)
+        self.service = service
+        self.quiet = quiet
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8800)
+    parser.add_argument('--workers', type=int, default=2, help='concurrent compiles (default: 2)')
+    parser.add_argument('--queue', type=int, default=16, help='renders allowed to wait for a worker (default: 16)')
+    parser.add_argument('--timeout', type=float, default=60, help='seconds a request may take (default: 60)')
+    parser.add_argument('--max-passes', type=int, default=4)
+    parser.add_argument('--cache-entries', type=int, default=64, help='PDFs kept in memory (default: 64)')
+    parser.add_argument('--cache-mb', type=int, default=64, help='memory for cached PDFs in MB (default: 64)')
+    parser.add_argument('--backend', choices=BACKENDS, default='pdflatex',
+                        help='default renderer when a request does not choose one')
+    parser.add_argument('--quiet', action='store_true', help='no per-request access log')
+    args = parser.parse_args()
+
+    service = RenderService(workers=max(1, args.workers), max_queue=max(0, args.queue), timeout=args.timeout,
+                            max_passes=args.max_passes, cache_entries=args.cache_entries,
+                            cache_bytes=args.cache_mb << 20, backend=args.backend)
+    server = RenderServer((args.host, args.port), service, quiet=args.quiet)
+    print(f"Serving CV renders on http://{args.host}:{server.server_address[1]}/render "
+          f"({service.workers} worker(s), queue {service.max_queue}, timeout {args.timeout:g}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down")
+    finally:
+        server.server_close()
+        service.close()
+
+if __name__ == '__main__':
+    main()
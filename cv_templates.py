@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Small template engine for the CV layouts
+Templates are compiled once into Python functions and cached, so rendering
+is just variable substitution. Output is escaped automatically according to
+the template's file type (.tex -> escape_latex, .html -> html.escape).
+
+Syntax:
+    << expr >>                    value of a Python expression, escaped
+    << expr|raw >>                unescaped (URLs, pre-rendered markup)
+    << items|join(', ') >>        escapes each item, then joins
+    <% if expr %> <% elif expr %> <% else %> <% endif %>
+    <% for a, b in expr %> ... <% endfor %>    (loop.first / loop.last / loop.index0)
+    <% set name = expr %>
+A line holding only <% ... %> tags produces no output of its own.
+"""
+
+import os
+import re
+import ast
+import html
+import builtins
+
+from cv_common import escape_latex
+
+class TemplateError(ValueError):
+    """Problem compiling or rendering a template, reported as file:line"""
+
+    def __init__(self, message, name="", line=0):
+        self.name = name
+        self.line = line
+        location = f"{name}:{line}: " if line else (f"{name}: " if name else "")
+        super().__init__(location + message)
+
+class Markup(str):
+    """Text that is already escaped for the template's output format"""
+    __slots__ = ()
+
+class LoopInfo:
+    """The `loop` variable inside <% for %> blocks"""
+    __slots__ = ('index0', 'length')
+
+    def __init__(self, index0, length):
+        self.index0 = index0
+        self.length = length
+
+    @property
+    def first(self):
+        return self.index0 == 0
+
+    @property
+    def last(self):
+        return self.index0 == self.length - 1
+
+def _loop(iterable):
+    items = list(iterable)
+    length = len(items)
+    for index0, item in enumerate(items):
+        yield LoopInfo(index0, length), item
+
+def _html_escape(value):
+    return html.escape(value, quote=True)
+
+def escape_for(path):
+    """Autoescape function for a template file, chosen by its extension (None = no escaping)"""
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.tex':
+        return escape_latex
+    if ext in ('.html', '.htm'):
+        return _html_escape
+    return None
+
+def _join(escape, value, separator=''):
+    return Markup(separator.join(escape(item) for item in value))
+
+def _upper(escape, value):
+    return value.upper()
+
+def _lower(escape, value):
+    return value.lower()
+
+# Filters receive the template's escape function first; 'raw' is handled by the compiler
+FILTERS = {
+    'join': _join,
+    'upper': _upper,
+    'lower': _lower,
+}
+
+TAG_RE = re.compile(r'<<(.*?)>>|<%(.*?)%>', re.S)
+BLOCK_ONLY_LINE_RE = re.compile(r'^[ \t]*(?:<%(?:(?!%>).)*%>[ \t]*)+$')
+FILTER_CALL_RE = re.compile(r'^([A-Za-z_]\w*)\s*(?:\((.*)\))?$', re.S)
+
+def _split_filters(expr):
+    """Split 'value|f1|f2(x)' on the top-level pipes"""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(expr):
+        if quote:
+            if ch == quote and expr[i - 1] != '\\':
+                quote = None
+        elif ch in '\'"':
+            quote = ch
+        elif ch in '([{':
+            depth += 1
+        elif ch in ')]}':
+            depth -= 1
+        elif ch == '|' and depth == 0:
+            parts.append(expr[start:i])
+            start = i + 1
+    parts.append(expr[start:])
+    return [p.strip() for p in parts]
+
+def _tokenize(source):
+    """Yield (kind, text, line) with kind 'text', 'var' or 'block'
+
+    Lines holding nothing but block tags are reduced to their tags, so
+    control flow doesn't leave blank lines behind.
+    """
+    lines = source.splitlines(keepends=True)
+    chunks = []
+    for lineno, line in enumerate(lines, 1):
+        body = line.rstrip('\r\n')
+        if BLOCK_ONLY_LINE_RE.match(body):
+            body = body.strip()
+            chunks.append((re.sub(r'%>\s+<%', '%><%', body), lineno))
+        else:
+            chunks.append((line, lineno))
+
+    for chunk, lineno in chunks:
+        pos = 0
+        for match in TAG_RE.finditer(chunk):
+            if match.start() > pos:
+                yield 'text', chunk[pos:match.start()], lineno
+            if match.group(1) is not None:
+                yield 'var', match.group(1).strip(), lineno
+            else:
+                yield 'block', match.group(2).strip(), lineno
+            pos = match.end()
+        if pos < len(chunk):
+            yield 'text', chunk[pos:], lineno
+
+class _Compiler:
+    """Turns a token stream into the source of a Python render function"""
+
+    def __init__(self, name):
+        self.name = name
+        self.code = []
+        self.indent = 1
+        self.stack = []       # (keyword, line) of open blocks
+        self.loops = 0
+        self.expressions = []  # every Python expression, for free-name analysis
+        self.bound = set()     # names bound by for/set
+        self.lineno = 0
+        self.pending = []      # output expressions not yet emitted as one _write()
+
+    def error(self, message, line=None):
+        return TemplateError(message, self.name, line or self.lineno)
+
+    def emit(self, line):
+        self.flush()
+        self.code.append('    ' * self.indent + line)
+
+    def flush(self):
+        # Adjacent text and values go out in a single _write call
+        if self.pending:
+            pieces, self.pending = self.pending, []
+            self.code.append('    ' * self.indent + f"_write({' + '.join(pieces)})")
+
+    def open_block(self, line):
+        # 'pass' keeps empty bodies (<% if x %><% endif %>) valid Python
+        self.emit(line)
+        self.indent += 1
+        self.emit("pass")
+
+    def expression(self, expr, mode='eval'):
+        try:
+            tree = ast.parse(expr, mode=mode)
+        except SyntaxError as e:
+            raise self.error(f"invalid expression {expr!r}: {e.msg}") from None
+        self.expressions.append(tree)
+        return expr
+
+    def bind_target(self, target):
+        try:
+            tree = ast.parse(f"{target} = None")
+        except SyntaxError:
+            raise self.error(f"invalid assignment target {target!r}") from None
+        for node in ast.walk(tree.body[0].targets[0]):
+            if isinstance(node, ast.Name):
+                self.bound.add(node.id)
+
+    def var(self, expr):
+        parts = _split_filters(expr)
+        value = f"({self.expression(parts[0])})"
+        escape = True
+        for part in parts[1:]:
+            match = FILTER_CALL_RE.match(part)
+            if not match:
+                raise self.error(f"invalid filter {part!r}")
+            filter_name, args = match.groups()
+            if filter_name == 'raw':
+                escape = False
+                continue
+            if filter_name not in FILTERS:
+                raise self.error(f"unknown filter {filter_name!r}")
+            if args:
+                self.expression(f"({args},)")
+            value = f"_filters[{filter_name!r}](_escape, {value}{', ' + args if args else ''})"
+        self.pending.append(f"_escape({value})" if escape else f"_str({value})")
+
+    def block(self, tag):
+        self.flush()
+        keyword, _, rest = tag.partition(' ')
+        rest = rest.strip()
+        if keyword == 'if':
+            self.open_block(f"if {self.expression(rest)}:")
+            self.stack.append(('if', self.lineno))
+        elif keyword in ('elif', 'else'):
+            if not self.stack or self.stack[-1][0] not in ('if', 'elif'):
+                raise self.error(f"'{keyword}' without 'if'")
+            self.indent -= 1
+            self.open_block(f"elif {self.expression(rest)}:" if keyword == 'elif' else "else:")
+            self.stack[-1] = ('elif' if keyword == 'elif' else 'else', self.stack[-1][1])
+        elif keyword == 'endif':
+            if not self.stack or self.stack[-1][0] not in ('if', 'elif', 'else'):
+                raise self.error("'endif' without 'if'")
+            self.stack.pop()
+            self.indent -= 1
+        elif keyword == 'for':
+            target, sep, iterable = rest.partition(' in ')
+            if not sep:
+                raise self.error(f"expected 'for <name> in <expr>', got {tag!r}")
+            self.bind_target(target)
+            self.loops += 1
+            loop_var = f"_loop{self.loops}"
+            self.open_block(f"for {loop_var}, ({target.strip()}) in _loop({self.expression(iterable)}):")
+            self.emit(f"loop = {loop_var}")
+            self.stack.append(('for', self.lineno, loop_var))
+        elif keyword == 'endfor':
+            if not self.stack or self.stack[-1][0] != 'for':
+                raise self.error("'endfor' without 'for'")
+            self.stack.pop()
+            self.indent -= 1
+            # Restore the enclosing loop's `loop` after a nested loop
+            outer = [entry for entry in self.stack if entry[0] == 'for']
+            if outer:
+                self.emit(f"loop = {outer[-1][2]}")
+        elif keyword == 'set':
+            target, sep, value = rest.partition('=')
+            if not sep:
+                raise self.error(f"expected 'set <name> = <expr>', got {tag!r}")
+            self.bind_target(target)
+            self.emit(f"{target.strip()} = {self.expression(value.strip())}")
+        else:
+            raise self.error(f"unknown tag {keyword!r}")
+
+    def compile(self, source):
+        for kind, text, lineno in _tokenize(source):
+            self.lineno = lineno
+            if kind == 'text':
+                self.pending.append(repr(text))
+            elif kind == 'var':
+                self.var(text)
+            else:
+                self.block(text)
+        self.flush()
+        if self.stack:
+            keyword, line = self.stack[-1][:2]
+            raise self.error(f"unclosed '{keyword}'", line)
+
+        # Free names are looked up in the render context once, up front
+        names, local = set(), set()
+        for tree in self.expressions:
+            for node in ast.walk(tree):
+                if isinstance(node, ast.Name):
+                    (names if isinstance(node.ctx, ast.Load) else local).add(node.id)
+                elif isinstance(node, ast.arg):
+                    # lambda arguments
+                    local.add(node.arg)
+        names -= self.bound | local | {'loop'}
+        prologue = [f"    {name} = _lookup(_context, {name!r})" for name in sorted(names)]
+        return '\n'.join(["def _render(_context, _write):"] + prologue + self.code + ["    return None"])
+
+class Template:
+    """A compiled template; render() returns a string, stream() writes to a file"""
+
+    def __init__(self, source, name='<template>', escape=None, globals=None):
+        self.name = name
+        self.globals = dict(globals or {})
+        escape = escape or str
+
+        def escape_value(value):
+            if value.__class__ is str:
+                return escape(value)
+            if value is None:
+                return ''
+            if isinstance(value, Markup):
+                return value
+            return escape(value if isinstance(value, str) else str(value))
+
+        def lookup(context, key):
+            if key in context:
+                return context[key]
+            if key in self.globals:
+                return self.globals[key]
+            if hasattr(builtins, key):
+                return getattr(builtins, key)
+            raise TemplateError(f"undefined variable {key!r}", self.name)
+
+        code = _Compiler(name).compile(source)
+        namespace = {
+            '_escape': escape_value,
+            '_str': lambda value: '' if value is None else str(value),
+            '_filters': FILTERS,
+            '_loop': _loop,
+            '_lookup': lookup,
+        }
+        exec(compile(code, name, 'exec'), namespace)
+        self._render = namespace['_render']
+
+    def stream(self, out, **context):
+        """Render straight into the text file-like object out"""
+        self._render(context, out.write)
+
+    def render(self, **context):
+        parts = []
+        self._render(context, parts.append)
+        return ''.join(parts)
+
+# Compiled templates by absolute path, recompiled when the file changes
+_TEMPLATE_CACHE = {}
+
+def load_template(path, globals=None, escape=None):
+    """Compile (or fetch the cached) template at path
+
+    escape defaults to escape_for(path). The template is recompiled when
+    the file's mtime changes.
+    """
+    path = os.path.abspath(path)
+    try:
+        stamp = os.stat(path).st_mtime_ns
+    except OSError:
+        raise TemplateError("template not found", path) from None
+    cached = _TEMPLATE_CACHE.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        source = f.read()
+    escape = escape or escape_for(path)
+    template = Template(source, name=path, escape=escape, globals=globals)
+    _TEMPLATE_CACHE[path] = (stamp, template)
+    return template
+
+def clear_template_cache():
+    """Forget all compiled templates"""
+    _TEMPLATE_CACHE.clear()
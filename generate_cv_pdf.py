@@ -2,405 +2,1106 @@
 """
 Generate CV PDF from CV_DATA.txt using LaTeX (academic style)
 Requires: pdflatex (LaTeX distribution like MiKTeX or TeX Live)
+Localized builds may use xelatex instead (see locales/)
 """
 
 import re
 import os
+import io
 import subprocess
 import platform
 import shutil
+import hashlib
+import json
+import time
+import glob
+import atexit
+import asyncio
+import threading
+import collections
+import multiprocessing.util
+from functools import lru_cache
+from dataclasses import dataclass, field, replace
+import tempfile
+from cv_common import (escape_latex, split_project_links, write_if_changed, BuildProfiler, set_profiler,
+                       profile_stage, publish_pdf, scratch_dir, scratch_file)
+from cv_templates import TemplateError, Markup, load_template
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def escape_latex(text):
-    """Escape special LaTeX characters (but preserve existing LaTeX commands)"""
-    # Don't escape if text already contains LaTeX commands (like \href, \&, etc.)
-    if '\\' in text and any(cmd in text for cmd in ['\\href', '\\&', '\\%', '\\$', '\\#']):
-        # Text already has some LaTeX - be more careful
-        # Only escape unescaped special chars
-        import re
-        # Escape & only if not already escaped
-        text = re.sub(r'(?<!\\)&(?!\w)', r'\\&', text)
-        # Escape % only if not already escaped
-        text = re.sub(r'(?<!\\)%(?!\w)', r'\\%', text)
-        # Escape $ only if not already escaped
-        text = re.sub(r'(?<!\\)\$', r'\\$', text)
-        # Escape # only if not already escaped
-        text = re.sub(r'(?<!\\)#', r'\\#', text)
-        # Escape _ only if not already escaped
-        text = re.sub(r'(?<!\\)_', r'\\_', text)
-        # Escape { and } only if not already escaped
-        text = re.sub(r'(?<!\\)\{', r'\\{', text)
-        text = re.sub(r'(?<!\\)\}', r'\\}', text)
-        # Escape ^ only if not already escaped
-        text = re.sub(r'(?<!\\)\^', r'\\textasciicircum{}', text)
-        # Escape ~ only if not already escaped
-        text = re.sub(r'(?<!\\)~', r'\\textasciitilde{}', text)
-    else:
-        # Simple case - escape all special chars
-        special_chars = {
-            '&': r'\&',
-            '%': r'\%',
-            '$': r'\$',
-            '#': r'\#',
-            '^': r'\textasciicircum{}',
-            '_': r'\_',
-            '{': r'\{',
-            '}': r'\}',
-            '~': r'\textasciitilde{}',
-        }
-        for char, replacement in special_chars.items():
-            text = text.replace(char, replacement)
-    return text
+# ==============================================
+# CV DATA MODEL
+# ==============================================
+# Typed records produced by the parser, mirroring lib/types.ts. They are
+# frozen (and therefore hashable) so the section renderers can memoize on
+# them; the source line number is kept for error messages but excluded from
+# equality so moving an unchanged entry does not invalidate its fragment.
 
-def parse_cv_data(filename):
-    """Parse CV_DATA.txt and return structured data"""
-    with open(filename, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    lines = content.split('\n')
-    
-    # Extract header info
-    header = []
-    body_sections = {}
-    current_section = None
-    current_content = []
-    
-    i = 0
-    # Get header (everything before first section)
-    while i < len(lines):
-        line = lines[i].rstrip('\n')
-        if line.strip() and line.strip().isupper() and not line.startswith('---'):
-            break
-        if line.strip():
-            header.append(line)
-        i += 1
+@dataclass(frozen=True, slots=True)
+class Header:
+    name: str
+    contact: str = ""
+    links: tuple = ()   # (label, url) pairs in first-seen order
+    bio: tuple = ()
+    line: int = field(default=0, compare=False)
+
+@dataclass(frozen=True, slots=True)
+class Experience:
+    position: str
+    company: str = ""
+    dates: str = ""
+    intro: str = ""
+    description: tuple = ()
+    technologies: tuple = ()
+    line: int = field(default=0, compare=False)
+
+@dataclass(frozen=True, slots=True)
+class Education:
+    institution: str = ""
+    degree: str = ""
+    location: str = ""
+    dates: str = ""
+    line: int = field(default=0, compare=False)
+
+@dataclass(frozen=True, slots=True)
+class Skill:
+    category: str
+    items: tuple = ()
+    line: int = field(default=0, compare=False)
+
+@dataclass(frozen=True, slots=True)
+class Project:
+    title: str
+    description: str = ""
+    links_line: str = ""   # raw "GitHub: ... | Demo available upon request" line
+    highlights: tuple = ()
+    technologies: tuple = ()
+    line: int = field(default=0, compare=False)
+
+@dataclass(frozen=True, slots=True)
+class SectionStart:
+    """Marks a section heading (e.g. EXPERIENCE) in the record stream"""
+    name: str
+    line: int = field(default=0, compare=False)
+
+@dataclass(slots=True)
+class CVDocument:
+    """Everything parse_cv_data found in a CV data file
+
+    A section list is None when the section heading is absent, and empty
+    when the heading is present but has no entries.
+    """
+    source: str = ""
+    header: Header = None
+    experience: list = None
+    education: list = None
+    skills: list = None
+    projects: list = None
+
+class CVDataError(ValueError):
+    """Problem with the CV data, reported as file:line"""
+
+    def __init__(self, message, source="", line=0):
+        self.source = source
+        self.line = line
+        location = f"{source}:{line}: " if line else (f"{source}: " if source else "")
+        super().__init__(location + message)
+
+DATES_RE = re.compile(r'\d{4}|\d+\s*mos|Present')
+EDUCATION_DATES_RE = re.compile(r'^\d{4}\s*-\s*\d{4}|^\d{4}$')
+PROJECT_DESCRIPTION_STOPWORDS = ('Technologies', 'GitHub', 'Live', 'Status')
+
+def _split_items(text):
+    return tuple(item.strip() for item in text.split(',') if item.strip())
+
+def _parse_header(lines):
+    """Build the Header record from the (line number, text) pairs before the first section"""
+    name = lines[0][1].strip()
+    contact = ""
+    links = {}
+    bio = []
+    for _, line in lines[1:]:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('http'):
+            if 'linkedin' in line.lower():
+                links['LinkedIn'] = line
+            elif 'github' in line.lower():
+                links['GitHub'] = line
+            elif 'natanel-richey.space' in line or 'portfolio' in line.lower() or 'website' in line.lower():
+                links['Portfolio'] = line
+        elif 'Interactive CV' in line or 'interactive cv' in line.lower():
+            url_match = re.search(r'(https?://[^\s]+)', line)
+            if url_match:
+                links['Portfolio'] = url_match.group(1)
+        elif '@' in line or line[0].isdigit():
+            # Contact info (phone/email)
+            contact = line
+        else:
+            # Bio/summary lines
+            bio.append(line)
+    return Header(name, contact, tuple(links.items()), tuple(bio), line=lines[0][0])
+
+class _ExperienceParser:
+    """Line-fed state machine: position, company, optional dates, then intro/bullets"""
+
+    def __init__(self):
+        self.state = 'seek'
+        self.entry = None
+
+    def feed(self, lineno, line):
+        stripped = line.strip()
+        if self.state == 'seek':
+            # Skip blank lines and stray "Skills:" metadata lines
+            if stripped and not stripped.startswith('Skills:'):
+                self.entry = {'position': stripped, 'company': "", 'dates': "", 'intro': "",
+                              'description': [], 'technologies': (), 'line': lineno}
+                self.state = 'company'
+            return None
+        if self.state == 'company':
+            self.entry['company'] = stripped
+            self.state = 'dates'
+            return None
+        if self.state == 'dates':
+            self.state = 'body'
+            if DATES_RE.search(stripped):
+                self.entry['dates'] = stripped
+                return None
+        # body: intro paragraph and bullet points until the next entry
+        if not stripped:
+            return None
+        if stripped.startswith('Skills:'):
+            self.entry['technologies'] = _split_items(stripped[len('Skills:'):])
+            return self.finish()
+        if stripped.isupper():
+            record = self.finish()
+            self.feed(lineno, line)
+            return record
+        if stripped.startswith('•'):
+            self.entry['description'].append(stripped.replace('•', '').strip())
+        elif not self.entry['description']:
+            # Non-bullet text before the bullets is the intro paragraph
+            self.entry['intro'] = stripped
+        return None
+
+    def finish(self):
+        entry, self.entry, self.state = self.entry, None, 'seek'
+        if entry is None:
+            return None
+        entry['description'] = tuple(entry['description'])
+        return Experience(**entry)
+
+class _ProjectParser:
+    """Line-fed state machine: title, description, links line, then bullets/technologies"""
+
+    def __init__(self):
+        self.state = 'seek'
+        self.entry = None
+
+    def feed(self, lineno, line):
+        stripped = line.strip()
+        if self.state == 'seek':
+            if stripped and not stripped.startswith('•'):
+                self.entry = {'title': stripped, 'description': "", 'links_line': "",
+                              'highlights': [], 'technologies': (), 'line': lineno}
+                self.state = 'description'
+            return None
+        if not stripped:
+            return None
+        if self.state == 'description':
+            self.state = 'links'
+            if not stripped.startswith('•') and not any(w in line for w in PROJECT_DESCRIPTION_STOPWORDS):
+                self.entry['description'] = stripped
+                return None
+        if self.state == 'links':
+            self.state = 'details'
+            if 'GitHub' in line and 'Demo available' in line:
+                self.entry['links_line'] = stripped
+                return None
+        # details: bullets and the Technologies line, anything else starts a new project
+        if stripped.startswith('•'):
+            self.entry['highlights'].append(stripped.replace('•', '').strip())
+        elif stripped.startswith('Technologies:'):
+            self.entry['technologies'] = _split_items(stripped.replace('Technologies:', ''))
+        else:
+            record = self.finish()
+            self.feed(lineno, line)
+            return record
+        return None
+
+    def finish(self):
+        entry, self.entry, self.state = self.entry, None, 'seek'
+        if entry is None:
+            return None
+        entry['highlights'] = tuple(entry['highlights'])
+        return Project(**entry)
+
+class _EducationParser:
+    """Institution, degree and location are the first three lines; dates anywhere"""
+
+    def __init__(self):
+        self.lines = []
+        self.dates = ""
+        self.first_line = 0
+
+    def feed(self, lineno, line):
+        stripped = line.strip()
+        if not stripped:
+            return None
+        if not self.lines:
+            self.first_line = lineno
+        if len(self.lines) < 3:
+            self.lines.append(stripped)
+        if not self.dates and EDUCATION_DATES_RE.search(stripped):
+            self.dates = stripped
+        return None
+
+    def finish(self):
+        if not self.lines:
+            return None
+        fields = self.lines + [""] * (3 - len(self.lines))
+        return Education(fields[0], fields[1], fields[2], self.dates, line=self.first_line)
+
+class _SkillParser:
+    """One "Category: item, item" line per Skill record"""
+
+    def feed(self, lineno, line):
+        stripped = line.strip()
+        if stripped and ':' in stripped:
+            category, items = stripped.split(':', 1)
+            return Skill(category.strip(), _split_items(items), line=lineno)
+        return None
+
+    def finish(self):
+        return None
+
+SECTION_PARSERS = {
+    'EXPERIENCE': _ExperienceParser,
+    'EDUCATION': _EducationParser,
+    'SKILLS': _SkillParser,
+    'PROJECTS': _ProjectParser,
+}
+
+def _is_section_heading(stripped):
+    return (stripped and stripped.isupper() and not stripped.startswith('---')
+            and not stripped.startswith('•'))
+
+def iter_cv_records(lines):
+    """Stream typed records from an iterable of CV data lines
+
+    Yields a Header, then a SectionStart for every section heading followed
+    by that section's Experience/Education/Skill/Project records. Only the
+    current entry is held in memory, so arbitrarily large inputs stream.
+    """
+    header_lines = []
+    in_header = True
+    section_parser = None
     
-    # Parse sections
-    while i < len(lines):
-        line = lines[i].rstrip('\n')
-        line_stripped = line.strip()
+    for lineno, line in enumerate(lines, 1):
+        line = line.rstrip('\r\n')
+        stripped = line.strip()
         
-        if line_stripped and line_stripped.isupper() and not line_stripped.startswith('---') and not line_stripped.startswith('•'):
-            if current_section:
-                body_sections[current_section] = '\n'.join(current_content)
-            current_section = line_stripped
-            current_content = []
-        elif line_stripped.startswith('---'):
-            pass
+        if in_header:
+            # Header is everything before the first section heading
+            if stripped and stripped.isupper() and not line.startswith('---'):
+                in_header = False
+                if header_lines:
+                    yield _parse_header(header_lines)
+            else:
+                if stripped:
+                    header_lines.append((lineno, line))
+                continue
+        
+        if _is_section_heading(stripped):
+            if section_parser:
+                record = section_parser.finish()
+                if record:
+                    yield record
+            parser_class = SECTION_PARSERS.get(stripped)
+            section_parser = parser_class() if parser_class else None
+            yield SectionStart(stripped, line=lineno)
+        elif stripped.startswith('---'):
+            continue
+        elif section_parser:
+            record = section_parser.feed(lineno, line)
+            if record:
+                yield record
+    
+    if in_header and header_lines:
+        yield _parse_header(header_lines)
+    if section_parser:
+        record = section_parser.finish()
+        if record:
+            yield record
+
+SECTION_RECORD_TYPES = {
+    'EXPERIENCE': Experience,
+    'EDUCATION': Education,
+    'SKILLS': Skill,
+    'PROJECTS': Project,
+}
+
+_RECORD_SECTIONS = {
+    Experience: 'experience',
+    Education: 'education',
+    Skill: 'skills',
+    Project: 'projects',
+}
+
+def build_cv_document(records, source=""):
+    """Collect a record stream into a CVDocument"""
+    cv = CVDocument(source=source)
+    for record in records:
+        if isinstance(record, Header):
+            cv.header = record
+        elif isinstance(record, SectionStart):
+            attr = _RECORD_SECTIONS.get(SECTION_RECORD_TYPES.get(record.name))
+            if attr:
+                # A repeated heading replaces the earlier section
+                setattr(cv, attr, [])
         else:
-            if current_section:
-                current_content.append(line)
-        i += 1
+            getattr(cv, _RECORD_SECTIONS[type(record)]).append(record)
+    return cv
+
+def _read_lines(f, filename):
+    """Decode a binary file line by line, reporting bad bytes with their line number"""
+    for lineno, raw in enumerate(f, 1):
+        try:
+            yield raw.decode('utf-8')
+        except UnicodeDecodeError as e:
+            raise CVDataError(f"not valid UTF-8 ({e.reason})", filename, lineno) from e
+
+def parse_cv_data(filename):
+    """Parse a CV data file into a CVDocument in a single streaming pass"""
+    with open(filename, 'rb') as f:
+        return build_cv_document(iter_cv_records(_read_lines(f, filename)), source=filename)
+
+def parse_cv_bytes(data, source='<input>'):
+    """Parse CV data held in memory (e.g. an HTTP request body); source names it in errors"""
+    return build_cv_document(iter_cv_records(_read_lines(io.BytesIO(data), source)), source=source)
+
+# ==============================================
+# LATEX LAYOUTS
+# ==============================================
+# A layout is a directory under templates/latex with preamble.tex,
+# header.tex, one template per body section and footer.tex (see
+# cv_templates for the syntax). Parts a layout doesn't provide come from the
+# default layout, so a variant only contains the files it changes.
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'templates', 'latex')
+DEFAULT_LAYOUT = 'default'
+
+# Prepended for web builds: PDF 1.5 object streams at maximum compression and
+# no pdfTeX banner. pdfTeX already subsets the Type 1 fonts from pdftex.map.
+LATEX_WEB_SETTINGS = """\\pdfminorversion=5
+\\pdfcompresslevel=9
+\\pdfobjcompresslevel=2
+\\pdfsuppressptexinfo=-1
+"""
+
+# Added right after \begin{document} in every build: no creation date and no
+# trailer ID (which pdfTeX derives from the time and the output path), so an
+# unchanged source compiles to unchanged bytes and publish_pdf leaves the
+# output alone. It sits in the body because warm builds skip the dumped
+# preamble. XeTeX has neither primitive and is left as is.
+LATEX_REPRODUCIBLE_SETTINGS = "\\ifdefined\\pdftrailerid \\pdfinfoomitdate=1 \\pdftrailerid{}\\fi\n"
+
+# Latin-script runs in right-to-left text, for english(). A run may start with
+# a backslash (a LaTeX command) and ends on a letter, digit or closing
+# character (including a URL's trailing slash), so spaces and punctuation between a Latin and a Hebrew run stay
+# with the surrounding Hebrew paragraph.
+LATIN_RUN_RE = re.compile(r'\\?[A-Za-z0-9](?:[^\u0590-\u05FF]*[A-Za-z0-9.%#&$+/})])?')
+UNESCAPED_BRACE_RE = re.compile(r'(?<!\\)[{}]')
+TRAILING_COMMAND_RE = re.compile(r'\\[A-Za-z]+$')
+
+def _english_run(match):
+    run, tail = match.group(), ''
+    # A closing parenthesis belongs to the run only if the run opened it
+    while run.endswith(')') and run.count(')') > run.count('('):
+        trimmed = run[:-1].rstrip()
+        tail = run[len(trimmed):] + tail
+        run = trimmed
+    braces = UNESCAPED_BRACE_RE.findall(run)
+    if braces.count('{') != braces.count('}') or TRAILING_COMMAND_RE.search(run):
+        # Wrapping would split a command from its argument
+        return run + tail
+    return f"\\textenglish{{{run}}}{tail}"
+
+def english(text):
+    """Escape text for a right-to-left layout, wrapping each Latin-script run in \\textenglish
+
+    Without the wrapper bidi reorders multi-word English runs and their
+    punctuation inside Hebrew paragraphs. Fields that are entirely English
+    become one run.
+    """
+    if text is None:
+        return Markup('')
+    return Markup(LATIN_RUN_RE.sub(_english_run, escape_latex(str(text))))
+
+# Helpers available to every LaTeX template
+TEMPLATE_GLOBALS = {'split_project_links': split_project_links, 'english': english}
+
+# Body sections in document order (experience deliberately before education)
+SECTION_TEMPLATES = ['experience', 'education', 'skills', 'projects']
+LAYOUT_PARTS = ['preamble', 'header'] + SECTION_TEMPLATES + ['footer']
+
+def list_layouts():
+    """Names of the available LaTeX layouts"""
+    return sorted(name for name in os.listdir(TEMPLATE_DIR) if os.path.isdir(os.path.join(TEMPLATE_DIR, name)))
+
+@lru_cache(maxsize=64)
+def layout_part_path(layout, part):
+    """Template file for one part of a layout, falling back to the default layout"""
+    layout_dir = os.path.join(TEMPLATE_DIR, layout)
+    # Only plain names of directories under TEMPLATE_DIR: never an absolute or relative path
+    if layout in (os.curdir, os.pardir) or os.path.basename(layout) != layout or not os.path.isdir(layout_dir):
+        raise ValueError(f"unknown layout {layout!r} (available: {', '.join(list_layouts())})")
+    path = os.path.join(layout_dir, part + '.tex')
+    if not os.path.exists(path):
+        path = os.path.join(TEMPLATE_DIR, DEFAULT_LAYOUT, part + '.tex')
+    return path
+
+def layout_template(layout, part):
+    """Compiled template for one part of a layout (recompiled if its file changed)"""
+    return load_template(layout_part_path(layout, part), TEMPLATE_GLOBALS, escape=escape_latex)
+
+@dataclass(frozen=True)
+class PageFit:
+    """Spacing and font knobs the layout templates read as `fit`
+
+    tightness 0 is the layout's normal spacing and 1 its tightest; each
+    template length interpolates between the two. font_size (pt) overrides
+    the body font when non-zero. See fit_to_pages.
+    """
+    tightness: float = 0.0
+    font_size: float = 0.0
+
+    def length(self, loose, tight, unit):
+        value = loose + (tight - loose) * self.tightness
+        return f"{round(value, 3):g}{unit}"
+
+    @property
+    def font(self):
+        return f"{self.font_size:g}pt"
+
+    @property
+    def baselineskip(self):
+        return f"{round(self.font_size * 1.2, 2):g}pt"
+
+    def describe(self):
+        font = f", {self.font_size:g}pt font" if self.font_size else ""
+        return f"tightness {self.tightness:.3g}{font}"
+
+DEFAULT_FIT = PageFit()
+
+@dataclass(frozen=True)
+class Labels:
+    """Fixed document wording the layout templates read as `labels` (overridden per locale)"""
+    summary: str = "Summary"
+    experience: str = "Professional Experience"
+    education: str = "Education"
+    skills: str = "Technical Skills"
+    projects: str = "Projects"
+    github: str = "GitHub"
+
+DEFAULT_LABELS = Labels()
+
+# Rendered fragments are memoized on the compiled template and the (hashable)
+# records, so regenerating a document only re-renders the sections that
+# changed. Editing a template file compiles a new Template, which misses here.
+FRAGMENT_CACHE_SIZE = 128
+
+@lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+def render_fragment(template, **context):
+    """Render one layout part"""
+    return template.render(**context)
+
+@lru_cache(maxsize=16)
+def web_preamble(preamble):
+    """Preamble with LATEX_WEB_SETTINGS and without hyperref's Creator/Producer entries"""
+    return LATEX_WEB_SETTINGS + preamble.replace(
+        "\\begin{document}", "\\hypersetup{pdfcreator={}, pdfproducer={}}\n\n\\begin{document}")
+
+def generate_latex(cv, web=False, layout=DEFAULT_LAYOUT, fit=DEFAULT_FIT, photo=None, labels=DEFAULT_LABELS):
+    """Generate LaTeX code from a parsed CVDocument using a template layout
+
+    Each part is rendered from its compiled template (memoized per section)
+    and the fragments are joined once at the end. web=True adds
+    LATEX_WEB_SETTINGS to the preamble; fit sets the spacing knobs. photo
+    is an image path for the header (see cv_assets.pdf_photo_path), labels
+    the headings (see Locale).
+    """
+    preamble = render_fragment(layout_template(layout, 'preamble'), fit=fit, photo=photo)
+    fragments = [web_preamble(preamble) if web else preamble, LATEX_REPRODUCIBLE_SETTINGS]
     
-    if current_section:
-        body_sections[current_section] = '\n'.join(current_content)
+    # HEADER
+    if cv.header:
+        fragments.append(render_fragment(layout_template(layout, 'header'), fit=fit, header=cv.header,
+                                         photo=photo, labels=labels))
     
-    return header, body_sections
-
-def generate_latex(header, sections):
-    """Generate LaTeX code from parsed CV data"""
+    for attr in SECTION_TEMPLATES:
+        entries = getattr(cv, attr)
+        if entries is not None:
+            template = layout_template(layout, attr)
+            try:
+                fragments.append(render_fragment(template, fit=fit, entries=tuple(entries), labels=labels))
+            except TemplateError:
+                raise
+            except Exception as e:
+                line = entries[0].line if entries else 0
+                raise CVDataError(f"could not render {attr}: {e}", cv.source, line) from e
     
-    latex = """\\documentclass[10.5pt]{article}
-\\usepackage[margin=0.45in, top=0.4in, bottom=0.4in]{geometry}
-\\usepackage{enumitem}
-\\usepackage{hyperref}
-\\usepackage{url}
-\\usepackage{tabularx}
+    fragments.append(render_fragment(layout_template(layout, 'footer'), fit=fit))
+    return ''.join(fragments)
+
+def clear_fragment_cache():
+    """Drop all memoized fragments (compiled templates are kept)"""
+    render_fragment.cache_clear()
 
-% Balanced spacing
-\\setlength{\\parskip}{3pt}
-\\setlength{\\parindent}{0pt}
+# ==============================================
+# LOCALIZATION
+# ==============================================
+# A locale other than the default is locales/<code>.json: the TeX engine and
+# layout to build with, translated labels, and translations keyed by record
+# that are overlaid on the parsed (English) CVDocument, so every locale is
+# built from one parse. Records are matched by RECORD_KEYS; anything a
+# locale doesn't translate stays as in CV_DATA.txt.
 
-% List spacing with proper gaps between items
-\\setlist{leftmargin=1.5em, topsep=3pt, itemsep=3pt, parsep=1pt}
+LOCALE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'locales')
+DEFAULT_LOCALE = 'en'
 
-% Custom commands for formatting
-\\newcommand{\\cvsection}[1]{
-    \\vspace{0.1in}
-    \\noindent{\\large \\textbf{#1}}
-    \\vspace{0.03in}
-    \\hrule
-    \\vspace{0.06in}
+# The field that identifies a record of each section in an overlay
+RECORD_KEYS = {
+    'experience': lambda entry: entry.company or entry.position,
+    'education': lambda entry: entry.institution,
+    'skills': lambda skill: skill.category,
+    'projects': lambda project: project.title,
+}
+# Fields an overlay may replace (links and source lines are never translated)
+OVERLAY_FIELDS = {
+    'header': {'name', 'contact', 'bio'},
+    'experience': {'position', 'company', 'dates', 'intro', 'description', 'technologies'},
+    'education': {'institution', 'degree', 'location', 'dates'},
+    'skills': {'category', 'items'},
+    'projects': {'title', 'description', 'links_line', 'highlights', 'technologies'},
 }
 
-% Hyperlink setup
-\\hypersetup{
-    colorlinks=true,
-    linkcolor=black,
-    urlcolor=blue,
-    citecolor=black
+@dataclass(frozen=True)
+class Locale:
+    """How to build one language of the CV; see load_locale"""
+    code: str
+    engine: str = 'pdflatex'
+    layout: str = ""        # empty: the layout chosen for the build
+    labels: Labels = DEFAULT_LABELS
+    overlay: dict = field(default_factory=dict, compare=False, hash=False)
+    source: str = ""
+
+    @property
+    def supports_web(self):
+        # LATEX_WEB_SETTINGS are pdfTeX primitives
+        return self.engine == 'pdflatex'
+
+def list_locales():
+    """The default locale plus one per locales/*.json"""
+    codes = {DEFAULT_LOCALE}
+    if os.path.isdir(LOCALE_DIR):
+        codes.update(os.path.splitext(name)[0] for name in os.listdir(LOCALE_DIR) if name.endswith('.json'))
+    return sorted(codes)
+
+def load_locale(code):
+    """Read locales/<code>.json; the default locale needs no file"""
+    path = os.path.join(LOCALE_DIR, code + '.json')
+    if not os.path.exists(path):
+        if code == DEFAULT_LOCALE:
+            return Locale(code)
+        raise ValueError(f"unknown locale {code!r} (available: {', '.join(list_locales())})")
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    unknown = set(data) - {'engine', 'layout', 'labels'} - set(OVERLAY_FIELDS)
+    if unknown:
+        raise ValueError(f"{path}: unknown key(s) {', '.join(sorted(unknown))}")
+    engine = data.get('engine', 'pdflatex')
+    if engine not in TEX_ENGINES:
+        raise ValueError(f"{path}: engine must be one of {', '.join(TEX_ENGINES)}, got {engine!r}")
+    layout = data.get('layout', "")
+    if layout and layout not in list_layouts():
+        raise ValueError(f"{path}: unknown layout {layout!r} (available: {', '.join(list_layouts())})")
+    try:
+        labels = Labels(**data.get('labels', {}))
+    except TypeError as e:
+        raise ValueError(f"{path}: bad labels ({e})") from None
+    overlay = {section: data[section] for section in OVERLAY_FIELDS if section in data}
+    return Locale(code, engine, layout, labels, overlay, path)
+
+def _overlay_record(record, values, where):
+    unknown = set(values) - OVERLAY_FIELDS[where[0]]
+    if unknown:
+        raise ValueError(f"{where[0]} {where[1]!r}: unknown field(s) {', '.join(sorted(unknown))}")
+    changes = {}
+    for name, value in values.items():
+        # List fields (bullets, items, bio) are tuples on the frozen records
+        changes[name] = tuple(value) if isinstance(getattr(record, name), tuple) else value
+    return replace(record, **changes)
+
+def apply_overlay(cv, locale):
+    """The CVDocument translated by locale's overlay; returns (document, unmatched keys)
+
+    The parsed records are shared, not copied, where nothing is translated,
+    so untouched sections still hit the fragment cache. Unmatched keys are
+    translations whose record no longer exists in CV_DATA.txt.
+    """
+    overlay = locale.overlay
+    if not overlay:
+        return cv, []
+    unmatched = []
+    try:
+        header = cv.header
+        if header and 'header' in overlay:
+            header = _overlay_record(header, overlay['header'], ('header', 'header'))
+        sections = {}
+        for section, key_of in RECORD_KEYS.items():
+            entries = getattr(cv, section)
+            translations = overlay.get(section, {})
+            if entries is None or not translations:
+                sections[section] = entries
+                continue
+            keys = {key_of(entry) for entry in entries}
+            unmatched.extend(f"{section}: {key}" for key in translations if key not in keys)
+            sections[section] = [_overlay_record(entry, translations[key_of(entry)], (section, key_of(entry)))
+                                 if key_of(entry) in translations else entry for entry in entries]
+    except ValueError as e:
+        raise ValueError(f"{locale.source}: {e}") from None
+    return CVDocument(source=cv.source, header=header, **sections), unmatched
+
+def locale_output_path(output_file, code):
+    """public/CV.pdf for the default locale, public/CV.<code>.pdf for the others"""
+    if code == DEFAULT_LOCALE:
+        return output_file
+    root, ext = os.path.splitext(output_file)
+    return f"{root}.{code}{ext}"
+
+# ==============================================
+# PRE-COMPILE LINT
+# ==============================================
+# Checks every CV field the way it will appear in the document (after
+# escape_latex, or raw for link labels and URLs) for things that make
+# pdflatex fail: unbalanced braces, unknown control sequences, specials the
+# escaper left alone and malformed \href URLs. Issues point at CV_DATA.txt
+# lines, and a full run takes about a millisecond, so doomed compiles are
+# never started.
+
+@dataclass(frozen=True, slots=True)
+class LintIssue:
+    source: str
+    line: int
+    field: str
+    message: str
+
+    def __str__(self):
+        location = f"{self.source}:{self.line}: " if self.line else (f"{self.source}: " if self.source else "")
+        return f"{location}{self.message} (in {self.field})"
+
+# Commands CV text may legitimately contain
+LINT_KNOWN_COMMANDS = frozenset({
+    'href', 'url', 'textbf', 'textit', 'emph', 'underline', 'textasciicircum', 'textasciitilde',
+    'textbackslash', 'textbar', 'ldots', 'LaTeX', 'TeX', 'newline',
+})
+LINT_SPECIAL_MESSAGES = {
+    '&': "unescaped '&' (pdflatex: Misplaced alignment tab character)",
+    '%': "unescaped '%' comments out the rest of the line",
+    '$': "unescaped '$' switches to math mode",
+    '#': "unescaped '#' (pdflatex: Illegal parameter number)",
+    '_': "unescaped '_' is only allowed in math mode",
+    '^': "unescaped '^' is only allowed in math mode",
 }
+CONTROL_WORD_RE = re.compile(r'[A-Za-z]+')
+HREF_ARGS_RE = re.compile(r'\s*\{([^{}]*)\}\s*\{')
+URL_RE = re.compile(r'^(?:https?://[^\s/{}\\]+(?:/[^\s{}\\]*)?|mailto:[^\s{}\\@]+@[^\s{}\\]+)$')
 
-\\begin{document}
+def lint_url(url):
+    """Problem with a URL placed raw into \\href, or None"""
+    if not URL_RE.match(url):
+        return f"malformed URL {url!r}"
+    return None
 
-"""
-    
-    # HEADER
-    if header:
-        name = escape_latex(header[0].strip()) if len(header) > 0 else "Name"
-        latex += "\\begin{center}\n"
-        latex += f"    {{\\huge \\textbf{{{name}}}}}\\\\\n"
-        latex += "    \\vspace{0.08in}\n"
-        
-        # Contact info - only phone/email line
-        contact_info = ""
-        links = {}
-        bio_lines = []
-        
-        for line in header[1:]:
-            line = line.strip()
-            if not line:
+def lint_latex_text(text):
+    """Problems pdflatex would hit in one piece of body text"""
+    problems = []
+    depth = 0
+    i, n = 0, len(text)
+    while i < n:
+        ch = text[i]
+        if ch == '\\':
+            match = CONTROL_WORD_RE.match(text, i + 1)
+            if not match:
+                if i + 1 == n:
+                    problems.append("trailing backslash")
+                i += 2
                 continue
-            
-            if line.startswith('http'):
-                if 'linkedin' in line.lower():
-                    links['LinkedIn'] = line
-                elif 'github' in line.lower():
-                    links['GitHub'] = line
-                elif 'natanel-richey.space' in line or 'portfolio' in line.lower() or 'website' in line.lower():
-                    links['Portfolio'] = line
-            elif 'Interactive CV' in line or 'interactive cv' in line.lower():
-                url_match = re.search(r'(https?://[^\s]+)', line)
-                if url_match:
-                    links['Portfolio'] = url_match.group(1)
-            elif '@' in line or line[0].isdigit():
-                # Contact info (phone/email)
-                contact_info = escape_latex(line)
+            name = match.group()
+            i = match.end()
+            if name not in LINT_KNOWN_COMMANDS:
+                problems.append(f"unknown control sequence \\{name}")
+            elif name == 'href':
+                args = HREF_ARGS_RE.match(text, i)
+                if not args:
+                    problems.append("malformed \\href (expected \\href{url}{text})")
+                    continue
+                url_problem = lint_url(args.group(1))
+                if url_problem:
+                    problems.append(url_problem)
+                # Continue at the link text's opening brace
+                i = args.end() - 1
+            continue
+        if ch == '{':
+            depth += 1
+        elif ch == '}':
+            depth -= 1
+            if depth < 0:
+                problems.append("unmatched '}'")
+                depth = 0
+        elif ch in LINT_SPECIAL_MESSAGES:
+            problems.append(LINT_SPECIAL_MESSAGES[ch])
+        i += 1
+    if depth:
+        problems.append(f"{depth} unclosed '{{'")
+    return problems
+
+def _cv_fields(cv):
+    """(record line, field name, text, kind) for every field that reaches the LaTeX
+
+    kind is 'text' (escaped), 'raw' (inserted as is) or 'url'.
+    """
+    header = cv.header
+    if header:
+        yield header.line, 'name', header.name, 'text'
+        yield header.line, 'contact', header.contact, 'text'
+        for label, url in header.links:
+            yield header.line, 'link label', label, 'raw'
+            yield header.line, 'link', url, 'url'
+        for bio_line in header.bio:
+            yield header.line, 'summary', bio_line, 'text'
+    for entry in cv.experience or ():
+        for name in ('position', 'company', 'dates', 'intro'):
+            yield entry.line, f"experience {name}", getattr(entry, name), 'text'
+        for bullet in entry.description:
+            yield entry.line, 'experience bullet', bullet, 'text'
+    for entry in cv.education or ():
+        for name in ('degree', 'dates', 'institution', 'location'):
+            yield entry.line, f"education {name}", getattr(entry, name), 'text'
+    for skill in cv.skills or ():
+        yield skill.line, 'skill category', skill.category, 'text'
+        for item in skill.items:
+            yield skill.line, 'skill', item, 'text'
+    for project in cv.projects or ():
+        yield project.line, 'project title', project.title, 'text'
+        yield project.line, 'project description', project.description, 'text'
+        if project.links_line:
+            github_url, status = split_project_links(project.links_line)
+            if github_url:
+                yield project.line, 'project link', github_url, 'url'
+                yield project.line, 'project status', status, 'text'
             else:
-                # Bio/summary lines
-                bio_lines.append(line)
-        
-        if contact_info:
-            latex += f"    {contact_info}\\\\\n"
-        
-        if links:
-            link_items = []
-            for label, url in links.items():
-                link_items.append(f"\\href{{{url}}}{{{label}}}")
-            latex += "    \\vspace{0.03in}\n"
-            latex += "    " + " $|$ ".join(link_items) + "\n"
-        
-        latex += "    \\vspace{0.05in}\n"
-        latex += "\\end{center}\n\n"
-        
-        # SUMMARY SECTION - use bio_lines collected from header (no line)
-        if bio_lines:
-            latex += "\\vspace{0.08in}\n"
-            latex += "\\noindent{\\large \\textbf{Summary}}\n"
-            latex += "\\vspace{0.06in}\n\n"
-            summary_text = " ".join([escape_latex(l) for l in bio_lines])
-            latex += f"\\noindent {summary_text}\n\n"
-    
-    # EXPERIENCE SECTION (moved before Education)
-    if 'EXPERIENCE' in sections:
-        latex += "\\cvsection{Professional Experience}\n"
-        content = sections['EXPERIENCE']
-        lines = [l for l in content.split('\n')]
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            if not line:
-                i += 1
-                continue
-            
-            # Skip "Skills:" lines - they're metadata not job entries
-            if line.startswith('Skills:'):
-                i += 1
+                yield project.line, 'project links', project.links_line, 'text'
+        for bullet in project.highlights:
+            yield project.line, 'project bullet', bullet, 'text'
+
+def _source_line(source_lines, start, text):
+    """Line (1-based) at or after start whose text contains the field, else start"""
+    needle = text.strip()[:40]
+    if source_lines and needle and start:
+        for lineno in range(start, len(source_lines) + 1):
+            if needle in source_lines[lineno - 1]:
+                return lineno
+    return start
+
+def lint_cv(cv):
+    """Lint every field of a parsed CVDocument; returns a list of LintIssue"""
+    issues = []
+    source_lines = None
+    for line, field_name, text, kind in _cv_fields(cv):
+        if not text:
+            continue
+        if kind == 'url':
+            problem = lint_url(text)
+            problems = [problem] if problem else []
+        else:
+            problems = lint_latex_text(text if kind == 'raw' else escape_latex(text))
+        if not problems:
+            continue
+        if source_lines is None:
+            try:
+                with open(cv.source, 'r', encoding='utf-8', errors='replace') as f:
+                    source_lines = f.read().splitlines()
+            except OSError:
+                source_lines = []
+        line = _source_line(source_lines, line, text)
+        issues.extend(LintIssue(cv.source, line, field_name, problem) for problem in problems)
+    return issues
+
+def lint_latex(latex_code, name='cv.tex'):
+    """Brace balance of a whole generated document (catches layout template mistakes)"""
+    issues = []
+    open_lines = []
+    for lineno, line in enumerate(latex_code.splitlines(), 1):
+        i, n = 0, len(line)
+        while i < n:
+            ch = line[i]
+            if ch == '\\':
+                i += 2
                 continue
-            
-            if i < len(lines) and lines[i].strip():
-                position = lines[i].strip()
-                i += 1
-                
-                company = lines[i].strip() if i < len(lines) else ""
-                i += 1
-                
-                dates = ""
-                if i < len(lines):
-                    dates_line = lines[i].strip()
-                    if re.search(r'\d{4}|\d+\s*mos|Present', dates_line):
-                        dates = dates_line
-                        i += 1
-                
-                # Get intro paragraph and bullet points
-                intro = ""
-                bullet_points = []
-                
-                while i < len(lines):
-                    line = lines[i].strip()
-                    if not line:
-                        i += 1
-                        continue
-                    # Stop at next section or "Skills:" line
-                    if line.isupper() or line.startswith('Skills:'):
-                        break
-                    if line.startswith('•'):
-                        bullet_points.append(line.replace('•', '').strip())
-                    else:
-                        # Non-bullet text is intro paragraph
-                        if not bullet_points:
-                            intro = line
-                    i += 1
-                
-                # Format: Position, Company on left, dates on right
-                role_text = f"{escape_latex(position)}, {escape_latex(company)}" if company else escape_latex(position)
-                latex += f"\\noindent\\textbf{{{role_text}}} \\hfill {escape_latex(dates)}\\\\\n"
-                
-                if intro:
-                    latex += f"{escape_latex(intro)}\n"
-                
-                if bullet_points:
-                    latex += "\n\\begin{itemize}\n"
-                    for bp in bullet_points:
-                        latex += f"    \\item {escape_latex(bp)}\n"
-                    latex += "\\end{itemize}\n"
-                
-                latex += "\n"
-            else:
-                i += 1
+            if ch == '%':
+                break
+            if ch == '{':
+                open_lines.append(lineno)
+            elif ch == '}':
+                if open_lines:
+                    open_lines.pop()
+                else:
+                    issues.append(LintIssue(name, lineno, 'document', "unmatched '}'"))
+            i += 1
+    issues.extend(LintIssue(name, lineno, 'document', "unclosed '{'") for lineno in open_lines)
+    return issues
+
+def print_lint_issues(issues):
+    print(f"LaTeX lint found {len(issues)} problem(s) - not compiling:")
+    for issue in issues:
+        print(f"  {issue}")
+
+# ==============================================
+# SITE DATA EMITTER
+# ==============================================
+# Builds the objects exported by lib/data.ts (shaped by lib/types.ts) from the
+# same parsed CVDocument that generate_latex uses. Presentation-only fields the
+# CV text doesn't carry (images, categories, site-only projects...) come from
+# site_overrides.json.
+
+SKILL_CATEGORIES = ['languages', 'frontend', 'backend', 'tools', 'aiml', 'other']
+
+def _split_dates(dates):
+    """'Nov 2025 - Present' -> ('Nov 2025', 'Present')"""
+    parts = [p.strip() for p in re.split(r'\s+[-–]\s+|\s*-\s*(?=\d{4}$)', dates, maxsplit=1)]
+    return (parts[0], parts[1]) if len(parts) == 2 else (dates.strip(), "")
+
+def _as_sentence(text):
+    return text if text.endswith(('.', '!', '?')) else text + '.'
+
+def build_site_data(cv, overrides=None):
+    """Map a CVDocument onto the exports of lib/data.ts"""
+    overrides = overrides or {}
+    header = cv.header or Header("")
     
-    # EDUCATION SECTION
-    if 'EDUCATION' in sections:
-        latex += "\\cvsection{Education}\n"
-        content = sections['EDUCATION']
-        lines = [l.strip() for l in content.split('\n') if l.strip()]
-        
-        if lines:
-            institution = escape_latex(lines[0]) if len(lines) > 0 else ""
-            degree = escape_latex(lines[1]) if len(lines) > 1 else ""
-            location = escape_latex(lines[2]) if len(lines) > 2 else ""
-            
-            # Extract dates - look for line with year pattern
-            dates = ""
-            for line in lines:
-                if re.search(r'^\d{4}\s*-\s*\d{4}', line) or re.search(r'^\d{4}$', line):
-                    dates = escape_latex(line)
-                    break
-            
-            # Format: Degree on left, dates on right, institution below
-            latex += f"\\noindent\\textbf{{{degree}}} \\hfill {dates}\\\\\n"
-            latex += f"{institution}, {location}\n\n"
-    
-    # TECHNICAL SKILLS SECTION
-    if 'SKILLS' in sections:
-        latex += "\\cvsection{Technical Skills}\n"
-        latex += "\\begin{itemize}\n"
-        content = sections['SKILLS']
-        lines = [l.strip() for l in content.split('\n') if l.strip()]
-        
-        for line in lines:
-            if ':' in line:
-                parts = line.split(':', 1)
-                category = escape_latex(parts[0].strip())
-                items = [escape_latex(item.strip()) for item in parts[1].split(',') if item.strip()]
-                items_str = ", ".join(items)
-                latex += f"    \\item \\textbf{{{category}:}} {items_str}\n"
-        
-        latex += "\\end{itemize}\n\n"
+    email = ""
+    phone = ""
+    for token in header.contact.split():
+        if '@' in token:
+            email = token
+        elif token[:1].isdigit() or token.startswith('+'):
+            phone = token
     
-    # PROJECTS SECTION
-    if 'PROJECTS' in sections:
-        latex += "\\cvsection{Projects}\n"
-        content = sections['PROJECTS']
-        lines = [l for l in content.split('\n')]
-        
-        i = 0
-        while i < len(lines):
-            line = lines[i].strip()
-            if not line:
-                i += 1
-                continue
-            
-            if i < len(lines) and lines[i].strip() and not lines[i].strip().startswith('•'):
-                title = escape_latex(lines[i].strip())
-                i += 1
-                
-                description = ""
-                github_demo_line = ""
-                # Get description (skip empty lines)
-                while i < len(lines) and not lines[i].strip():
-                    i += 1
-                if i < len(lines) and not lines[i].strip().startswith('•') and 'Technologies' not in lines[i] and 'GitHub' not in lines[i] and 'Live' not in lines[i] and 'Status' not in lines[i]:
-                    description = lines[i].strip()
-                    i += 1
-                
-                # Get GitHub | Demo line (skip empty lines)
-                while i < len(lines) and not lines[i].strip():
-                    i += 1
-                if i < len(lines) and 'GitHub' in lines[i] and 'Demo available' in lines[i]:
-                    github_demo_line = lines[i].strip()
-                    i += 1
-                    
-                # Skip empty line after GitHub|Demo line
-                while i < len(lines) and not lines[i].strip():
-                    i += 1
-                
-                details = []
-                technologies = ""
-                
-                while i < len(lines):
-                    line = lines[i].strip()
-                    if not line:
-                        i += 1
-                        continue
-                    if line.startswith('•'):
-                        details.append(line.replace('•', '').strip())
-                        i += 1
-                    elif line.startswith('Technologies:'):
-                        technologies = line.replace('Technologies:', '').strip()
-                        i += 1
-                    else:
-                        break
-                
-                # Format project entry - title only
-                latex += f"\\noindent\\textbf{{{title}}}\\\\\n"
-                
-                # Description
-                if description:
-                    latex += f"{escape_latex(description)}\\\\\n"
-                
-                # GitHub | Demo line (on a new line after description)
-                if github_demo_line:
-                    # Extract GitHub URL and demo text
-                    github_match = re.search(r'GitHub:\s*(https?://[^\s|]+)', github_demo_line)
-                    demo_match = re.search(r'\|\s*(Demo available upon request)', github_demo_line)
-                    
-                    if github_match and demo_match:
-                        github_url = github_match.group(1)
-                        demo_text = demo_match.group(1)
-                        latex += f"\\href{{{github_url}}}{{GitHub}} $|$ {escape_latex(demo_text)}\n"
-                    else:
-                        # Fallback: just escape the whole line
-                        latex += f"{escape_latex(github_demo_line)}\n"
-                if details:
-                    latex += "\\vspace{0.5em}\\begin{itemize}[topsep=0pt, itemsep=3pt, parsep=0pt, partopsep=0pt]\n"
-                    for d in details:
-                        latex += f"    \\item {escape_latex(d)}\n"
-                    latex += "\\end{itemize}\n"
-                
-                # Full empty line between projects
-                latex += "\\vspace{1em}\n"
-            else:
-                i += 1
+    personal_info = {
+        'name': header.name,
+        'title': "",
+        'location': "",
+        'email': email,
+        'phone': phone,
+        'bio': " ".join(_as_sentence(line) for line in header.bio),
+        'profileImage': "",
+    }
+    personal_info.update(overrides.get('personalInfo', {}))
+    
+    links = dict(header.links)
+    social_links = {
+        'linkedin': links.get('LinkedIn', ""),
+        'github': links.get('GitHub', ""),
+    }
+    social_links.update(overrides.get('socialLinks', {}))
+    
+    experience = []
+    for index, entry in enumerate(cv.experience or [], 1):
+        company, _, company_url = entry.company.partition(' · ')
+        start_date, end_date = _split_dates(entry.dates)
+        item = {
+            'id': index,
+            'company': company.strip(),
+            'position': entry.position,
+            'location': "",
+            'startDate': start_date,
+            'endDate': end_date,
+            'description': ([entry.intro] if entry.intro else []) + list(entry.description),
+            'technologies': list(entry.technologies),
+        }
+        if company_url.strip():
+            item['companyUrl'] = company_url.strip()
+        item.update(overrides.get('experience', {}).get(item['company'], {}))
+        experience.append(item)
+    
+    education = []
+    for index, entry in enumerate(cv.education or [], 1):
+        start_date, end_date = _split_dates(entry.dates)
+        item = {
+            'id': index,
+            'institution': entry.institution,
+            'degree': entry.degree,
+            'location': entry.location,
+            'startDate': start_date,
+            'endDate': end_date,
+        }
+        item.update(overrides.get('education', {}).get(entry.institution, {}))
+        education.append(item)
     
-    latex += "\\end{document}\n"
-    return latex
+    skills = {category: [] for category in SKILL_CATEGORIES}
+    for skill in cv.skills or []:
+        key = re.sub(r'[^a-z]', '', skill.category.lower())
+        skills[key if key in skills else 'other'].extend(skill.items)
+    
+    projects = []
+    for index, project in enumerate(cv.projects or [], 1):
+        github_url, status = split_project_links(project.links_line)
+        item = {
+            'id': index,
+            'title': project.title,
+            'description': project.description,
+            'technologies': list(project.technologies),
+            'image': "",
+        }
+        if github_url:
+            item['githubUrl'] = github_url
+        if status:
+            item['status'] = status
+        item['highlights'] = list(project.highlights)
+        item['category'] = ""
+        item.update(overrides.get('projects', {}).get(project.title, {}))
+        projects.append(item)
+    for extra in overrides.get('extraProjects', []):
+        item = {k: v for k, v in extra.items() if k != 'insertAt'}
+        item = {'id': len(projects) + 1, **item}
+        projects.insert(extra.get('insertAt', len(projects)), item)
+    
+    return {
+        'personalInfo': personal_info,
+        'socialLinks': social_links,
+        'experience': experience,
+        'education': education,
+        'skills': skills,
+        'projects': projects,
+        'projectCategories': overrides.get('projectCategories', ["All"]),
+    }
 
-def find_pdflatex():
-    """Find pdflatex executable"""
+SITE_DATA_TYPES = {
+    'personalInfo': 'PersonalInfo',
+    'socialLinks': 'SocialLinks',
+    'experience': 'Experience[]',
+    'education': 'Education[]',
+    'skills': 'Skills',
+    'projects': 'Project[]',
+    'projectCategories': 'string[]',
+}
+
+_TS_IDENTIFIER_RE = re.compile(r'^[A-Za-z_$][A-Za-z0-9_$]*$')
+
+def _to_ts(value, indent=0):
+    """Format a JSON-compatible value as a TypeScript literal in the style of lib/data.ts"""
+    pad = '  ' * indent
+    if isinstance(value, dict):
+        if not value:
+            return '{}'
+        lines = []
+        for key, item in value.items():
+            name = key if _TS_IDENTIFIER_RE.match(key) else json.dumps(key)
+            lines.append(f"{pad}  {name}: {_to_ts(item, indent + 1)},")
+        return '{\n' + '\n'.join(lines) + f'\n{pad}}}'
+    if isinstance(value, list):
+        if not value:
+            return '[]'
+        if all(isinstance(v, str) for v in value) and sum(len(v) for v in value) < 100:
+            return '[' + ', '.join(json.dumps(v, ensure_ascii=False) for v in value) + ']'
+        return '[\n' + '\n'.join(f"{pad}  {_to_ts(v, indent + 1)}," for v in value) + f'\n{pad}]'
+    return json.dumps(value, ensure_ascii=False)
+
+SITE_DATA_MARKER = "CV DATA - GENERATED FILE, DO NOT EDIT"
+
+class SiteDataError(RuntimeError):
+    """lib/data.ts exists but was not written by emit_site_data"""
+
+def render_site_data_ts(site_data, source='CV_DATA.txt'):
+    """Render lib/data.ts from build_site_data output"""
+    out = [
+        "// ==============================================\n",
+        f"// {SITE_DATA_MARKER}\n",
+        "// ==============================================\n",
+        f"// Generated by generate_cv_pdf.py from {source} and site_overrides.json.\n",
+        "// Edit those files and re-run: python generate_cv_pdf.py --emit-site-data\n",
+        "\n",
+        "import type { PersonalInfo, SocialLinks, Experience, Education, Skills, Project } from './types';\n",
+    ]
+    for name, value in site_data.items():
+        out.append(f"\nexport const {name}: {SITE_DATA_TYPES[name]} = {_to_ts(value)};\n")
+    return ''.join(out)
+
+def load_site_overrides(path='site_overrides.json'):
+    """site_overrides.json as a dict ({} when absent)"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def emit_site_data(cv, ts_path='lib/data.ts', json_path='lib/cv-data.json',
+                   overrides_path='site_overrides.json', overwrite=False):
+    """Write lib/data.ts and a JSON copy for static imports; returns the paths that changed
+
+    Files are only rewritten when their content differs, so unchanged runs
+    don't invalidate the Next.js build caches. A hand-maintained lib/data.ts
+    (one without the generated-file header) is never replaced unless
+    overwrite is set: raises SiteDataError instead, before writing anything.
+    """
+    if ts_path and not overwrite and os.path.exists(ts_path):
+        with open(ts_path, 'r', encoding='utf-8', errors='replace') as f:
+            head = f.read(512)
+        if SITE_DATA_MARKER not in head:
+            raise SiteDataError(f"{ts_path} was not generated by --emit-site-data; "
+                                f"move its content into CV_DATA.txt / site_overrides.json, "
+                                f"then re-run with --overwrite-site-data to replace it")
+    site_data = build_site_data(cv, load_site_overrides(overrides_path))
+    changed = []
+    if ts_path and write_if_changed(ts_path, render_site_data_ts(site_data, os.path.basename(cv.source or 'CV_DATA.txt'))):
+        changed.append(ts_path)
+    if json_path and write_if_changed(json_path, json.dumps(site_data, indent=2, ensure_ascii=False) + '\n'):
+        changed.append(json_path)
+    return changed
+
+# ==============================================
+# BUILD INSTRUMENTATION
+# ==============================================
+# BuildProfiler, set_profiler and profile_stage live in cv_common, so the
+# companion modules record their stages on the same profiler.
+
+def _output_bytes(build_dir, base_name):
+    """Total size of the files a pdflatex pass writes"""
+    total = 0
+    for ext in AUX_EXTENSIONS + ['.log', '.pdf']:
+        path = os.path.join(build_dir, base_name + ext)
+        if os.path.exists(path):
+            total += os.path.getsize(path)
+    return total
+
+# TeX engines a locale can ask for
+TEX_ENGINES = ('pdflatex', 'xelatex')
+
+def find_tex_engine(engine='pdflatex'):
+    """Find a TeX engine executable (pdflatex or xelatex)"""
     import shutil
     
     # First try to find in PATH
-    pdflatex_path = shutil.which('pdflatex')
-    if pdflatex_path:
-        return pdflatex_path
+    engine_path = shutil.which(engine)
+    if engine_path:
+        return engine_path
     
     # Check common Windows MiKTeX installation paths
     if platform.system() == 'Windows':
         common_paths = [
-            os.path.expanduser(r'~\AppData\Local\Programs\MiKTeX\miktex\bin\x64\pdflatex.exe'),
-            r'C:\Program Files\MiKTeX\miktex\bin\x64\pdflatex.exe',
-            r'C:\Program Files (x86)\MiKTeX\miktex\bin\x64\pdflatex.exe',
+            os.path.expanduser(rf'~\AppData\Local\Programs\MiKTeX\miktex\bin\x64\{engine}.exe'),
+            rf'C:\Program Files\MiKTeX\miktex\bin\x64\{engine}.exe',
+            rf'C:\Program Files (x86)\MiKTeX\miktex\bin\x64\{engine}.exe',
         ]
         for path in common_paths:
             if os.path.exists(path):
@@ -408,102 +1109,1438 @@ def find_pdflatex():
     
     return None
 
-def compile_latex_to_pdf(tex_file, output_file):
-    """Compile LaTeX file to PDF"""
-    pdflatex_path = find_pdflatex()
+def find_pdflatex():
+    """Find pdflatex executable"""
+    return find_tex_engine('pdflatex')
+
+def get_pdflatex_version(pdflatex_path):
+    """Return the first line of `pdflatex --version` (used as part of the cache key)"""
+    try:
+        result = subprocess.run(
+            [pdflatex_path, '--version'],
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        lines = result.stdout.strip().splitlines()
+        return lines[0] if lines else ''
+    except Exception:
+        return ''
+
+# ==============================================
+# PDFLATEX OUTPUT PARSING
+# ==============================================
+# pdflatex's terminal output is read line by line while it runs and turned
+# into LogEvents: error, missing_package, warning, overfull, underfull, page
+# (a page shipped out) and output (the final "Output written on" line). A
+# pass is stopped at the first error instead of letting nonstopmode carry on
+# to the end or the timeout, and the events of the last pass come back to
+# the caller in a CompileReport, which is truthy when the PDF was built.
+
+@dataclass(frozen=True, slots=True)
+class LogEvent:
+    kind: str
+    message: str
+    line: int = 0          # .tex line pdflatex reported, 0 if none
+    value: float = None    # page number, points overfull, badness or page count
+    context: str = ""      # the source text pdflatex showed for an error
+
+    def __str__(self):
+        location = f"l.{self.line}: " if self.line else ""
+        context = f" [{self.context}]" if self.context else ""
+        return f"{location}{self.message}{context}"
+
+LOG_FATAL_KINDS = frozenset({'error', 'missing_package'})
+LOG_TAIL_LINES = 30
+
+LOG_ERROR_RE = re.compile(r'^! (.*)')
+LOG_ERROR_LINE_RE = re.compile(r'^l\.(\d+)\s?(.*)')
+LOG_MISSING_FILE_RE = re.compile(r"^! LaTeX Error: File `([^']+)\.(sty|cls)' not found")
+LOG_WARNING_RE = re.compile(r'^(?:(?:Package|Class) (\S+) |LaTeX (?:Font )?|pdfTeX )[Ww]arning[^:]*:\s*(.*)')
+LOG_INPUT_LINE_RE = re.compile(r'on input line (\d+)')
+LOG_BOX_RE = re.compile(r'^(Overfull|Underfull) \\[hv]box \((?:([\d.]+)pt too \w+|badness (\d+))\)'
+                        r'(?:.*?lines? (\d+)(?:--\d+)?)?')
+LOG_PAGE_RE = re.compile(r'(?:^|[\s\]])\[(\d+)(?=[\s\]{<]|$)')
+LOG_OUTPUT_RE = re.compile(r'^Output written on (.+) \((\d+) pages?, (\d+) bytes\)')
+LOG_FATAL_FOOTER_RE = re.compile(r'^!\s+==> Fatal error occurred')
+
+class PdflatexLogParser:
+    """Incremental parser for pdflatex terminal output
+
+    feed() takes one line and returns the events it completes. An error's
+    event is held back until its "l.<n>" context line (or the next message)
+    arrives, so it carries the .tex line number.
+    """
+    ERROR_CONTEXT_LINES = 6
+
+    def __init__(self):
+        self._pending = None   # [message, lines seen since]
+        self._last_page = 0
+
+    def _flush(self, line=0, context=""):
+        message = self._pending[0]
+        self._pending = None
+        return LogEvent('error', message, line, context=context)
+
+    def feed(self, text):
+        text = text.rstrip('\r\n')
+        events = []
+        if self._pending is not None:
+            match = LOG_ERROR_LINE_RE.match(text)
+            if match:
+                return [self._flush(int(match.group(1)), match.group(2).strip())]
+            self._pending[1] += 1
+            if text.startswith('!') or self._pending[1] >= self.ERROR_CONTEXT_LINES:
+                events.append(self._flush())
+        
+        if text.startswith('!'):
+            match = LOG_MISSING_FILE_RE.match(text)
+            if match:
+                events.append(LogEvent('missing_package', f"{match.group(1)}.{match.group(2)} not found",
+                                       context=match.group(1)))
+            elif not LOG_FATAL_FOOTER_RE.match(text):
+                self._pending = [LOG_ERROR_RE.match(text).group(1) if text.startswith('! ') else text[1:].strip(), 0]
+            return events
+        
+        match = LOG_OUTPUT_RE.match(text)
+        if match:
+            events.append(LogEvent('output', match.group(1), value=int(match.group(2))))
+            return events
+        
+        match = LOG_BOX_RE.match(text)
+        warning = LOG_WARNING_RE.match(text)
+        if match:
+            kind, points, badness, line = match.groups()
+            events.append(LogEvent(kind.lower(), match.group(0), int(line or 0),
+                                   float(points) if points else float(badness)))
+        elif warning:
+            package, message = warning.groups()
+            line = LOG_INPUT_LINE_RE.search(message)
+            events.append(LogEvent('warning', f"{package}: {message}" if package else message,
+                                   int(line.group(1)) if line else 0))
+        
+        # Page numbers are printed as pages ship out, often on the same line as other messages
+        for match in LOG_PAGE_RE.finditer(text):
+            page = int(match.group(1))
+            if page > self._last_page:
+                self._last_page = page
+                events.append(LogEvent('page', f"page {page} shipped", value=page))
+        return events
+
+    def close(self):
+        """Events still held back when the output ends"""
+        return [self._flush()] if self._pending is not None else []
+
+@dataclass(slots=True)
+class CompileReport:
+    """What a compile produced: the last pdflatex pass's events, plus the outcome
+
+    Truthy when the PDF was built, so callers that only need success can
+    keep treating the result as a bool.
+    """
+    ok: bool = False
+    returncode: int = None
+    events: list = field(default_factory=list)
+    passes: int = 0
+    aborted: bool = False   # stopped at the first error
+    tail: tuple = ()        # last lines of output, for failures without a parsed error
+    error: str = ""         # failure outside pdflatex (timeout, missing PDF...)
+
+    def __bool__(self):
+        return self.ok
+
+    def of_kind(self, kind):
+        return [event for event in self.events if event.kind == kind]
+
+    @property
+    def errors(self):
+        return [event for event in self.events if event.kind in LOG_FATAL_KINDS]
+
+    @property
+    def warnings(self):
+        return self.of_kind('warning')
+
+    @property
+    def missing_packages(self):
+        return [event.context for event in self.of_kind('missing_package')]
+
+    @property
+    def overfull_boxes(self):
+        return len(self.of_kind('overfull'))
+
+    @property
+    def underfull_boxes(self):
+        return len(self.of_kind('underfull'))
+
+    @property
+    def pages(self):
+        """Page count from "Output written on", else the last page shipped"""
+        for event in reversed(self.events):
+            if event.kind in ('output', 'page'):
+                return int(event.value)
+        return None
+
+    def summary(self):
+        """One-line description of the first problem, for batch reports"""
+        if self.errors:
+            return str(self.errors[0])
+        return self.error or (f"pdflatex exited with code {self.returncode}" if self.returncode else "pdflatex failed")
+
+def _pdflatex_env(env=None):
+    env = dict(os.environ if env is None else env)
+    # TeX Live wraps terminal output at 79 columns, which splits messages mid-line
+    env.setdefault('max_print_line', '10000')
+    return env
+
+def stream_pdflatex(proc, timeout, on_event=None, stop_on_error=True):
+    """Parse a running pdflatex's stdout as it arrives; returns a CompileReport
+
+    on_event is called with each LogEvent as soon as it is parsed. With
+    stop_on_error the process is killed at the first error. Raises
+    subprocess.TimeoutExpired (after killing pdflatex) on timeout.
+    """
+    parser = PdflatexLogParser()
+    report = CompileReport(passes=1)
+    tail = collections.deque(maxlen=LOG_TAIL_LINES)
+    timed_out = threading.Event()
+    
+    def on_timeout():
+        timed_out.set()
+        proc.kill()
+    
+    timer = threading.Timer(timeout, on_timeout)
+    timer.start()
+    try:
+        for text in proc.stdout:
+            tail.append(text.rstrip('\r\n'))
+            for event in parser.feed(text):
+                report.events.append(event)
+                if on_event:
+                    on_event(event)
+                if stop_on_error and event.kind in LOG_FATAL_KINDS and not report.aborted:
+                    report.aborted = True
+                    proc.kill()
+            if report.aborted:
+                break
+        for event in parser.close():
+            report.events.append(event)
+            if on_event:
+                on_event(event)
+    finally:
+        timer.cancel()
+        proc.stdout.close()
+        proc.wait()
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(proc.args, timeout)
+    report.returncode = proc.returncode
+    report.tail = tuple(tail)
+    report.ok = proc.returncode == 0 and not report.aborted
+    return report
+
+def run_pdflatex(args, timeout, on_event=None, stop_on_error=True, env=None):
+    """Run one pdflatex command with its output streamed through the log parser"""
+    proc = subprocess.Popen(
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        env=_pdflatex_env(env)
+    )
+    return stream_pdflatex(proc, timeout, on_event, stop_on_error)
+
+def print_log_event(event):
+    """Default on_event: show errors the moment pdflatex reports them"""
+    if event.kind in LOG_FATAL_KINDS:
+        print(f"  LaTeX {'error' if event.kind == 'error' else 'missing package'}: {event}")
+
+def print_compile_failure(report, tex_file, pdflatex_path):
+    """Explain a failed pass: parsed errors were already shown live, so add hints or the raw tail"""
+    if report.aborted:
+        print("Compilation stopped at the first error")
+    else:
+        print(f"Compilation had errors. Return code: {report.returncode}")
+    if report.missing_packages:
+        print(f"\n⚠️  Missing packages: {', '.join(report.missing_packages)}")
+        print("MiKTeX needs to install packages. Please run once interactively:")
+        print(f"  {pdflatex_path} {os.path.basename(tex_file)}")
+        print("This will prompt you to install missing packages.")
+        print("After packages are installed, this script will work automatically.")
+    elif not report.errors:
+        print("\nLast LaTeX output:")
+        print("=" * 60)
+        print('\n'.join(report.tail))
+        print("=" * 60)
+
+def print_box_summary(report):
+    """Mention overfull/underfull boxes, which mean text ran into the margin or spacing stretched"""
+    if report.overfull_boxes or report.underfull_boxes:
+        worst = max((event.value for event in report.of_kind('overfull')), default=0)
+        detail = f" (worst {worst:g}pt too wide)" if worst else ""
+        print(f"Layout: {report.overfull_boxes} overfull{detail}, {report.underfull_boxes} underfull box(es)")
+
+# ==============================================
+# WEB OPTIMIZATION
+# ==============================================
+# Optional qpdf pass for PDFs served from the site: linearized ("fast web
+# view") so the first page shows before the download finishes, with streams
+# recompressed into object streams and unused resources dropped.
+
+def find_qpdf():
+    """Find the qpdf executable (None if not installed)"""
+    return shutil.which('qpdf')
+
+def optimize_pdf_for_web(pdf_file, qpdf_path=None):
+    """Linearize and recompress pdf_file in place; returns (bytes_before, bytes_after)
+
+    Without qpdf (or if it fails) the file is left as is and both sizes
+    are equal. The rewritten file replaces the original atomically.
+    """
+    before = os.path.getsize(pdf_file)
+    qpdf_path = qpdf_path or find_qpdf()
+    if not qpdf_path:
+        return before, before
+    
+    fd, tmp_path = scratch_file(prefix='web-', suffix='.pdf')
+    os.close(fd)
+    try:
+        with profile_stage('web optimize') as stage:
+            result = subprocess.run(
+                [qpdf_path, '--linearize', '--object-streams=generate', '--compress-streams=y',
+                 '--recompress-flate', '--compression-level=9', '--remove-unreferenced-resources=yes',
+                 '--deterministic-id', pdf_file, tmp_path],
+                capture_output=True,
+                text=True,
+                timeout=60
+            )
+            # Exit code 3 means success with warnings
+            if result.returncode not in (0, 3):
+                print(f"qpdf failed (return code {result.returncode}), keeping unoptimized PDF:")
+                print(result.stderr[-1000:])
+                return before, before
+            after = os.path.getsize(tmp_path)
+            stage['bytes_written'] = after
+        publish_pdf(tmp_path, pdf_file)
+        return before, after
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def report_web_optimization(pdf_file, qpdf_path=None):
+    """Run optimize_pdf_for_web and print the before/after sizes"""
+    qpdf_path = qpdf_path or find_qpdf()
+    if not qpdf_path:
+        print(f"qpdf not found - PDF compressed but not linearized ({os.path.getsize(pdf_file) / 1024:.1f} KB)")
+        return
+    before, after = optimize_pdf_for_web(pdf_file, qpdf_path)
+    change = (after / before - 1) * 100 if before else 0.0
+    print(f"Web-optimized PDF: {before / 1024:.1f} KB -> {after / 1024:.1f} KB ({change:+.1f}%)")
+
+def content_key(latex_code, engine=''):
+    """sha256 of the LaTeX source and the engine identity"""
+    h = hashlib.sha256()
+    h.update(latex_code.encode('utf-8'))
+    h.update(b'\0')
+    h.update(engine.encode('utf-8'))
+    return h.hexdigest()
+
+class BuildCache:
+    """Persistent content-addressed cache of compiled PDFs.
+
+    Entries are keyed by a hash of the generated LaTeX source (which already
+    covers both the parsed CV data and the generate_latex template) plus the
+    pdflatex version. The least recently used entries are evicted once the
+    cache grows past max_bytes.
+    """
+
+    INDEX_FILE = 'index.json'
+
+    def __init__(self, cache_dir='.cv_cache', max_bytes=50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.index_path = os.path.join(self.cache_dir, self.INDEX_FILE)
+        self._load_index()
+
+    def _load_index(self):
+        self.entries = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self.engines = {}
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.entries = data.get('entries', {})
+                self.stats.update(data.get('stats', {}))
+                self.engines = data.get('engines', {})
+            except (OSError, ValueError):
+                # Corrupt index - start over, the PDFs are still content-addressed
+                self.entries = {}
+
+    def _save_index(self):
+        data = {'entries': self.entries, 'stats': self.stats, 'engines': self.engines}
+        tmp_path = self.index_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+
+    def engine_id(self, pdflatex_path):
+        """Identify the pdflatex build, re-running --version only when the binary changes"""
+        try:
+            st = os.stat(pdflatex_path)
+            stamp = f"{st.st_size}:{int(st.st_mtime)}"
+        except OSError:
+            stamp = ''
+        known = self.engines.get(pdflatex_path)
+        if known and known.get('stamp') == stamp:
+            return known['version']
+        version = get_pdflatex_version(pdflatex_path)
+        self.engines[pdflatex_path] = {'stamp': stamp, 'version': version}
+        self._save_index()
+        return version
+
+    def make_key(self, latex_code, engine=''):
+        """Hash the LaTeX source together with the engine identity"""
+        return content_key(latex_code, engine)
+
+    def _entry_path(self, key):
+        return os.path.join(self.cache_dir, key + '.pdf')
+
+    def lookup(self, key, output_file):
+        """Place the cached PDF for key at output_file. Returns True on a hit."""
+        path = self._entry_path(key)
+        if key not in self.entries or not os.path.exists(path):
+            self.entries.pop(key, None)
+            self.stats['misses'] += 1
+            self._save_index()
+            return False
+        # Hardlinked when possible; skipped entirely if already identical
+        publish_pdf(path, output_file, keep_source=True)
+        self.entries[key]['last_used'] = time.time()
+        self.stats['hits'] += 1
+        self._save_index()
+        return True
+
+    def store(self, key, pdf_file):
+        """Copy a freshly compiled PDF into the cache and evict if over budget"""
+        path = self._entry_path(key)
+        tmp_path = path + '.tmp'
+        shutil.copy2(pdf_file, tmp_path)
+        os.replace(tmp_path, path)
+        self.entries[key] = {'size': os.path.getsize(path), 'last_used': time.time()}
+        self._evict()
+        self._save_index()
+
+    def _evict(self):
+        total = sum(e['size'] for e in self.entries.values())
+        for key in sorted(self.entries, key=lambda k: self.entries[k]['last_used']):
+            if total <= self.max_bytes:
+                break
+            total -= self.entries[key]['size']
+            del self.entries[key]
+            self.stats['evictions'] += 1
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+
+    def clear(self):
+        """Remove every cached PDF and reset the stats"""
+        for key in list(self.entries):
+            try:
+                os.remove(self._entry_path(key))
+            except OSError:
+                pass
+        self.entries = {}
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._save_index()
+
+    def summary(self):
+        """Human-readable hit/miss stats"""
+        total_size = sum(e['size'] for e in self.entries.values())
+        lookups = self.stats['hits'] + self.stats['misses']
+        rate = (100.0 * self.stats['hits'] / lookups) if lookups else 0.0
+        return (f"Cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+                f"({rate:.0f}% hit rate), {self.stats['evictions']} evictions, "
+                f"{len(self.entries)} entries, {total_size / 1024:.1f} KB")
+
+AUX_EXTENSIONS = ['.aux', '.out', '.toc']
+
+def hash_aux_files(build_dir, base_name):
+    """Hash the auxiliary files pdflatex reads back on the next pass"""
+    h = hashlib.sha256()
+    for ext in AUX_EXTENSIONS:
+        path = os.path.join(build_dir, base_name + ext)
+        h.update(ext.encode('ascii'))
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                h.update(f.read())
+        else:
+            h.update(b'<missing>')
+    return h.hexdigest()
+
+def compile_latex_to_pdf(tex_file, output_file, build_dir=None, max_passes=4, on_event=print_log_event,
+                         engine='pdflatex'):
+    """Compile LaTeX file to PDF; returns a CompileReport (truthy on success)
+
+    By default pdflatex runs twice in the current directory and the
+    auxiliary files are deleted. When build_dir is given, the auxiliary
+    files are kept there between builds and passes stop as soon as the
+    .aux/.out/.toc files stop changing (at most max_passes runs).
+    on_event receives every LogEvent as pdflatex produces it. engine is
+    any of TEX_ENGINES; both print the same log format.
+    """
+    pdflatex_path = find_tex_engine(engine)
     
     if not pdflatex_path:
-        print("Searching for pdflatex...")
+        print(f"Searching for {engine}...")
         # Try one more time with explicit path
-        explicit_path = os.path.expanduser(r'~\AppData\Local\Programs\MiKTeX\miktex\bin\x64\pdflatex.exe')
+        explicit_path = os.path.expanduser(rf'~\AppData\Local\Programs\MiKTeX\miktex\bin\x64\{engine}.exe')
         if os.path.exists(explicit_path):
             pdflatex_path = explicit_path
-            print(f"Found pdflatex at: {pdflatex_path}")
+            print(f"Found {engine} at: {pdflatex_path}")
         else:
-            raise FileNotFoundError("pdflatex not found")
+            raise FileNotFoundError(f"{engine} not found")
     else:
-        print(f"Using pdflatex at: {pdflatex_path}")
+        print(f"Using {engine} at: {pdflatex_path}")
+    
+    if build_dir:
+        return _compile_until_converged(pdflatex_path, tex_file, output_file, build_dir, max_passes, on_event)
     
+    # Compile in a scratch directory outside the (served) output directory;
+    # it is on the same filesystem, so publishing the result is a rename
+    work_dir = None
     try:
-        # Compile in current directory first, then move to desired location
+        work_dir = scratch_dir('cv-build-')
         # First run: allow package installation
         print("Compiling LaTeX (first pass - may install packages)...")
-        result = subprocess.run(
-            [pdflatex_path, '-interaction=nonstopmode', '-output-directory', '.', tex_file],
-            capture_output=True,
-            text=True,
-            timeout=120  # 2 minute timeout for package installation
-        )
+        base_name = os.path.join(work_dir, os.path.splitext(os.path.basename(tex_file))[0])
+        command = [pdflatex_path, '-interaction=nonstopmode', '-output-directory', work_dir, tex_file]
+        with profile_stage('pdflatex pass 1') as stage:
+            # 2 minute timeout for package installation
+            report = run_pdflatex(command, timeout=120, on_event=on_event)
+            stage['bytes_written'] = _output_bytes(work_dir, os.path.basename(base_name))
         
-        # Check output for missing packages
-        output_text = result.stdout + result.stderr
-        if result.returncode != 0:
-            print("First compilation had errors. Checking output...")
-            print(f"Return code: {result.returncode}")
-            print("\nFull LaTeX output:")
-            print("=" * 60)
-            print(output_text)
-            print("=" * 60)
-            
-            if 'package' in output_text.lower() or 'not found' in output_text.lower() or 'missing' in output_text.lower():
-                print("\nÔÜá´©Å  Missing packages detected!")
-                print("MiKTeX needs to install packages. Please run once interactively:")
-                print(f"  {pdflatex_path} cv.tex")
-                print("This will prompt you to install missing packages.")
-                print("After packages are installed, this script will work automatically.")
-                return False
+        if not report:
+            print_compile_failure(report, tex_file, pdflatex_path)
+            if report.aborted or report.missing_packages:
+                return report
         
         # Second run: resolve references
         print("Compiling LaTeX (second pass - resolving references)...")
-        result2 = subprocess.run(
-            [pdflatex_path, '-interaction=nonstopmode', '-output-directory', '.', tex_file],
-            capture_output=True,
-            text=True,
-            timeout=60
-        )
-        
-        # Show any warnings but continue
-        if result2.stderr:
-            print("LaTeX warnings (non-critical):")
-            print(result2.stderr[:500])  # Show first 500 chars
-        
-        # Clean up auxiliary files
-        base_name = os.path.splitext(tex_file)[0]
-        for ext in ['.aux', '.log', '.out']:
-            aux_file = base_name + ext
-            if os.path.exists(aux_file):
-                try:
-                    os.remove(aux_file)
-                except:
-                    pass
+        with profile_stage('pdflatex pass 2') as stage:
+            report = run_pdflatex(command, timeout=60, on_event=on_event)
+            stage['bytes_written'] = _output_bytes(work_dir, os.path.basename(base_name))
+        report.passes = 2
+        if report.aborted:
+            print_compile_failure(report, tex_file, pdflatex_path)
+            return report
+        print_box_summary(report)
         
-        # PDF is created in current directory
-        pdf_file = base_name + '.pdf'
-        if os.path.exists(pdf_file):
-            # Move to desired output location
-            output_dir = os.path.dirname(output_file) if os.path.dirname(output_file) else '.'
-            if output_dir and not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-            if os.path.abspath(pdf_file).lower() != os.path.abspath(output_file).lower():
-                if os.path.exists(output_file):
-                    os.remove(output_file)
-                shutil.move(pdf_file, output_file)
-            print(f"PDF successfully created: {output_file}")
-            return True
-        return False
+        # PDF is created in the scratch directory
+        report.ok = _move_pdf_to_output(base_name + '.pdf', output_file)
+        return report
     except FileNotFoundError as e:
         print("Error: pdflatex not found. Please install a LaTeX distribution:")
         print("  Windows: https://miktex.org/download")
         print("  macOS: https://www.tug.org/mactex/")
         print("  Linux: sudo apt-get install texlive-full")
         print(f"Details: {e}")
-        return False
+        return CompileReport(error=f"pdflatex not found: {e}")
     except Exception as e:
         print(f"Error compiling LaTeX: {e}")
         print(f"Error type: {type(e).__name__}")
         import traceback
         traceback.print_exc()
-        return False
+        return CompileReport(error=f"{type(e).__name__}: {e}")
+    finally:
+        # Clean up auxiliary files
+        if work_dir:
+            with profile_stage('cleanup'):
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+def _move_pdf_to_output(pdf_file, output_file):
+    """Publish the compiled PDF to its final location"""
+    if os.path.exists(pdf_file):
+        with profile_stage('publish pdf') as stage:
+            if publish_pdf(pdf_file, output_file):
+                stage['bytes_written'] = os.path.getsize(output_file)
+                print(f"PDF successfully created: {output_file}")
+            else:
+                print(f"PDF unchanged, kept existing file: {output_file}")
+        return True
+    return False
+
+def _compile_until_converged(pdflatex_path, tex_file, output_file, build_dir, max_passes, on_event=print_log_event):
+    """Run pdflatex in build_dir until the auxiliary files reach a fixed point"""
+    os.makedirs(build_dir, exist_ok=True)
+    base_name = os.path.splitext(os.path.basename(tex_file))[0]
+    previous_hash = hash_aux_files(build_dir, base_name)
+    command = [pdflatex_path, '-interaction=nonstopmode', '-output-directory', build_dir, tex_file]
+    
+    try:
+        for pass_number in range(1, max(1, max_passes) + 1):
+            print(f"Compiling LaTeX (pass {pass_number}, build dir {build_dir})...")
+            with profile_stage(f'pdflatex pass {pass_number}') as stage:
+                report = run_pdflatex(command, timeout=120 if pass_number == 1 else 60, on_event=on_event)
+                stage['bytes_written'] = _output_bytes(build_dir, base_name)
+            report.passes = pass_number
+            if not report:
+                print_compile_failure(report, tex_file, pdflatex_path)
+                return report
+            
+            current_hash = hash_aux_files(build_dir, base_name)
+            if current_hash == previous_hash:
+                print(f"Auxiliary files converged after {pass_number} pass(es)")
+                break
+            previous_hash = current_hash
+        else:
+            print(f"Auxiliary files still changing after {max_passes} passes - using last result")
+        
+        print_box_summary(report)
+        report.ok = _move_pdf_to_output(os.path.join(build_dir, base_name + '.pdf'), output_file)
+        return report
+    except Exception as e:
+        print(f"Error compiling LaTeX: {e}")
+        print(f"Error type: {type(e).__name__}")
+        return CompileReport(error=f"{type(e).__name__}: {e}")
+
+# ==============================================
+# PAGE FIT
+# ==============================================
+# fit_to_pages searches the PageFit knobs for the loosest layout that stays
+# within a target page count. Every measured page count is memoized by
+# content hash (LaTeX source + engine), so re-fitting an unchanged CV, or
+# one whose probes were seen before, needs no compiles at all.
+
+FIT_FONT_SIZES = (9.5, 9.0)   # tried in turn when even the tightest spacing overflows
+FIT_SEARCH_STEPS = 3          # tightness bisections after bracketing (1/8 resolution)
+PAGE_COUNT_FILE = 'page_counts.json'
+PAGE_COUNT_LIMIT = 2000       # memoized counts kept, least recently used dropped first
+PAGE_COUNT_RE = re.compile(r'Output written on .*?\((\d+) pages?,', re.S)
+
+class FitError(RuntimeError):
+    """A fit probe did not compile; report is its CompileReport (already printed live)"""
+
+    def __init__(self, message, report=None):
+        self.report = report
+        super().__init__(f"{message}: {report.summary()}" if report is not None else message)
+
+def read_page_count(log_file):
+    """Page count from a pdflatex log ("Output written on cv.pdf (2 pages, ...)")"""
+    try:
+        with open(log_file, 'r', encoding='utf-8', errors='replace') as f:
+            match = PAGE_COUNT_RE.search(f.read())
+    except OSError:
+        return None
+    return int(match.group(1)) if match else None
+
+def load_page_counts(path):
+    """Memoized {content key: page count}, least recently used first; empty if path is None or unreadable"""
+    if not path or not os.path.exists(path):
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_page_counts(path, page_counts):
+    """Write the PAGE_COUNT_LIMIT most recently used counts, so entries for old engines and layouts age out"""
+    if path:
+        recent = dict(list(page_counts.items())[-PAGE_COUNT_LIMIT:])
+        write_if_changed(path, json.dumps(recent, indent=1))
+
+def fit_to_pages(cv, target_pages, pdflatex_path, engine, page_counts, build_dir='.cv_build/fit',
+                 layout=DEFAULT_LAYOUT, web=False, max_passes=4, steps=FIT_SEARCH_STEPS, compile=True, photo=None):
+    """Find the loosest PageFit that keeps cv within target_pages
+
+    Measures the layout's own spacing first (one compile when it already
+    fits), then the tightest spacing at the class font and each of
+    FIT_FONT_SIZES until one fits, then bisects tightness between the last
+    overflowing and the first fitting setting. Page count is assumed to be
+    monotonic in tightness. page_counts is read before compiling and updated
+    after; with compile=False a missing count returns None instead. Raises
+    FitError when a probe fails to compile.
+
+    Returns a dict with fit, latex, pages, fits, compiles and pdf (the
+    compiled PDF for the chosen fit, None if its count came from the memo).
+    """
+    os.makedirs(build_dir, exist_ok=True)
+    tex_file = os.path.join(build_dir, 'cv.tex')
+    base_name = 'cv'
+    probes = {}
+    compiles = 0
+    
+    def measure(fit):
+        nonlocal compiles
+        latex_code = generate_latex(cv, web=web, layout=layout, fit=fit, photo=photo)
+        key = content_key(latex_code, engine)
+        if key in page_counts:
+            # Move to the end: save_page_counts keeps the most recently used
+            page_counts[key] = page_counts.pop(key)
+        else:
+            if not compile:
+                raise LookupError(key)
+            with open(tex_file, 'w', encoding='utf-8') as f:
+                f.write(latex_code)
+            probe_pdf = os.path.join(build_dir, f'fit-{key[:16]}.pdf')
+            with profile_stage('fit probe') as stage:
+                ok = _compile_until_converged(pdflatex_path, tex_file, probe_pdf, build_dir, max_passes)
+                stage['tightness'] = fit.tightness
+            compiles += 1
+            if not ok:
+                raise FitError(f"fit probe failed to compile ({fit.describe()})", ok)
+            pages = ok.pages or read_page_count(os.path.join(build_dir, base_name + '.log'))
+            if pages is None:
+                raise FitError(f"could not measure the page count ({fit.describe()})")
+            page_counts[key] = pages
+            probes[key] = probe_pdf
+            print(f"Fit probe ({fit.describe()}): {pages} page(s)")
+        return {'fit': fit, 'latex': latex_code, 'key': key, 'pages': page_counts[key]}
+    
+    try:
+        best = measure(DEFAULT_FIT)
+        if best['pages'] > target_pages:
+            for font_size in (0.0,) + FIT_FONT_SIZES:
+                best = measure(PageFit(1.0, font_size))
+                if best['pages'] <= target_pages:
+                    break
+            if best['pages'] <= target_pages:
+                # Bisect: lo overflows (or is untested), hi fits
+                lo, hi = 0.0, 1.0
+                for _ in range(steps):
+                    mid = (lo + hi) / 2
+                    probe = measure(PageFit(mid, font_size))
+                    if probe['pages'] <= target_pages:
+                        hi, best = mid, probe
+                    else:
+                        lo = mid
+    except LookupError:
+        return None
+    
+    chosen_pdf = probes.pop(best['key'], None)
+    for pdf_file in probes.values():
+        if os.path.exists(pdf_file):
+            os.remove(pdf_file)
+    return {'fit': best['fit'], 'latex': best['latex'], 'pages': best['pages'],
+            'fits': best['pages'] <= target_pages, 'compiles': compiles, 'pdf': chosen_pdf}
+
+def print_fit_result(fitted, target_pages, label=''):
+    prefix = f"{label}: " if label else ""
+    if fitted['fits']:
+        print(f"{prefix}Fits in {fitted['pages']}/{target_pages} page(s) with {fitted['fit'].describe()} "
+              f"({fitted['compiles']} compile(s))")
+    else:
+        print(f"{prefix}Warning: still {fitted['pages']} page(s) at the tightest setting "
+              f"({fitted['fit'].describe()}); target was {target_pages}")
+
+def split_preamble(latex_code):
+    """Return the part of the document before \\begin{document}"""
+    marker = '\\begin{document}'
+    index = latex_code.find(marker)
+    return latex_code[:index] if index >= 0 else latex_code
+
+def ensure_preamble_format(pdflatex_path, latex_code, fmt_dir='.cv_cache/fmt', engine=''):
+    """Dump the document preamble into a custom .fmt file (once per preamble)
+
+    The format name is derived from a hash of the preamble text, the
+    engine's path and its version line (`engine`, as returned by
+    BuildCache.engine_id), so editing the preamble or upgrading TeX
+    produces a new format. Uses mylatexformat, which also makes documents
+    compiled with the format skip their own (already loaded) preamble.
+    The format is dumped under a private jobname and renamed into place,
+    so concurrent batch workers never load a half-written file. Returns
+    the format name, or None if the dump failed.
+    """
+    preamble = split_preamble(latex_code)
+    h = hashlib.sha256()
+    h.update(preamble.encode('utf-8'))
+    h.update(b'\0')
+    h.update(pdflatex_path.encode('utf-8'))
+    h.update(b'\0')
+    h.update(engine.encode('utf-8'))
+    fmt_name = 'cvfmt-' + h.hexdigest()[:16]
+    fmt_file = os.path.join(fmt_dir, fmt_name + '.fmt')
+    os.makedirs(fmt_dir, exist_ok=True)
+    if os.path.exists(fmt_file):
+        return fmt_name
+    
+    job_name = f"{fmt_name}-tmp{os.getpid()}-{threading.get_ident()}"
+    preamble_tex = os.path.join(fmt_dir, job_name + '.tex')
+    with open(preamble_tex, 'w', encoding='utf-8') as f:
+        f.write(preamble)
+        f.write('\\begin{document}\n\\end{document}\n')
+    
+    print(f"Dumping preamble format {fmt_name}.fmt (one-time cost)...")
+    try:
+        result = subprocess.run(
+            [pdflatex_path, '-ini', '-interaction=nonstopmode', f'-jobname={job_name}',
+             '-output-directory', fmt_dir, '&pdflatex', 'mylatexformat.ltx', os.path.abspath(preamble_tex)],
+            capture_output=True,
+            text=True,
+            timeout=120
+        )
+        dumped = os.path.join(fmt_dir, job_name + '.fmt')
+        if result.returncode != 0 or not os.path.exists(dumped):
+            print("Could not dump preamble format - falling back to plain pdflatex")
+            print((result.stdout + result.stderr)[-500:])
+            return None
+        os.replace(dumped, fmt_file)
+    finally:
+        for ext in ('.tex', '.log', '.fmt'):
+            path = os.path.join(fmt_dir, job_name + ext)
+            if os.path.exists(path):
+                os.remove(path)
+    return fmt_name
+
+class WarmCompiler:
+    """Long-lived pdflatex front end that reuses a precompiled preamble format
+
+    A pdflatex process is always kept on standby with the format already
+    loaded, waiting on stdin for the file to typeset, so the cost of
+    starting TeX and loading the format overlaps with our own work instead
+    of being paid on every pass. Create one per process and reuse it for
+    every document with the same preamble.
+    """
+
+    def __init__(self, pdflatex_path, fmt_dir='.cv_cache/fmt', engine=None):
+        self.pdflatex_path = pdflatex_path
+        self.engine = engine if engine is not None else get_pdflatex_version(pdflatex_path)
+        self.fmt_dir = os.path.abspath(fmt_dir)
+        self.work_dir = tempfile.mkdtemp(prefix='cv-warm-')
+        self.fmt_name = None
+        self._standby = None
+        self._counter = 0
+
+    def _env(self):
+        env = dict(os.environ)
+        # Trailing separator keeps the default format search path as well
+        env['TEXFORMATS'] = self.fmt_dir + os.pathsep + env.get('TEXFORMATS', '')
+        return env
+
+    def _spawn(self):
+        self._counter += 1
+        jobname = f'job{self._counter}'
+        proc = subprocess.Popen(
+            [self.pdflatex_path, f'-fmt={self.fmt_name}', f'-jobname={jobname}',
+             '-output-directory', self.work_dir],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            env=_pdflatex_env(self._env())
+        )
+        self._standby = (proc, jobname)
+
+    def _take_standby(self):
+        if self._standby is None or self._standby[0].poll() is not None:
+            self._spawn()
+        standby = self._standby
+        self._standby = None
+        return standby
+
+    def prepare(self, latex_code):
+        """Make sure a format for this preamble exists. Returns False if unavailable."""
+        fmt_name = ensure_preamble_format(self.pdflatex_path, latex_code, self.fmt_dir, self.engine)
+        if fmt_name is None:
+            return False
+        if fmt_name != self.fmt_name:
+            self.close_standby()
+            self.fmt_name = fmt_name
+        return True
+
+    def discard_format(self):
+        """Forget (and delete) the current format, e.g. after it produced a failed compile"""
+        self.close_standby()
+        if self.fmt_name:
+            fmt_file = os.path.join(self.fmt_dir, self.fmt_name + '.fmt')
+            if os.path.exists(fmt_file):
+                os.remove(fmt_file)
+        self.fmt_name = None
+
+    def run_pass(self, tex_file, build_dir, timeout=60, on_event=print_log_event):
+        """Typeset tex_file once, with auxiliary files read from and written to build_dir
+
+        Returns the pass's CompileReport; raises subprocess.TimeoutExpired.
+        """
+        base_name = os.path.splitext(os.path.basename(tex_file))[0]
+        proc, jobname = self._take_standby()
+        for ext in AUX_EXTENSIONS:
+            src = os.path.join(build_dir, base_name + ext)
+            if os.path.exists(src):
+                shutil.copy2(src, os.path.join(self.work_dir, jobname + ext))
+        
+        tex_path = os.path.abspath(tex_file).replace('\\', '/')
+        proc.stdin.write(f'\\nonstopmode\\input{{{tex_path}}}\n')
+        proc.stdin.close()
+        try:
+            report = stream_pdflatex(proc, timeout, on_event)
+        finally:
+            # Warm up the next process while the caller inspects this result
+            self._spawn()
+        
+        for ext in AUX_EXTENSIONS + ['.log', '.pdf']:
+            src = os.path.join(self.work_dir, jobname + ext)
+            if os.path.exists(src):
+                os.replace(src, os.path.join(build_dir, base_name + ext))
+        return report
+
+    def compile(self, tex_file, output_file, build_dir, max_passes=4, on_event=print_log_event):
+        """Compile tex_file to output_file, stopping once auxiliary files converge
+
+        Returns the last pass's CompileReport (truthy on success).
+        """
+        os.makedirs(build_dir, exist_ok=True)
+        base_name = os.path.splitext(os.path.basename(tex_file))[0]
+        previous_hash = hash_aux_files(build_dir, base_name)
+        
+        for pass_number in range(1, max(1, max_passes) + 1):
+            print(f"Compiling LaTeX (warm pass {pass_number}, format {self.fmt_name})...")
+            with profile_stage(f'pdflatex pass {pass_number}', warm=True) as stage:
+                report = self.run_pass(tex_file, build_dir, on_event=on_event)
+                stage['bytes_written'] = _output_bytes(build_dir, base_name)
+            report.passes = pass_number
+            if not report:
+                print_compile_failure(report, tex_file, self.pdflatex_path)
+                return report
+            current_hash = hash_aux_files(build_dir, base_name)
+            if current_hash == previous_hash:
+                print(f"Auxiliary files converged after {pass_number} pass(es)")
+                break
+            previous_hash = current_hash
+        
+        print_box_summary(report)
+        report.ok = _move_pdf_to_output(os.path.join(build_dir, base_name + '.pdf'), output_file)
+        return report
+
+    def close_standby(self):
+        if self._standby is not None:
+            proc = self._standby[0]
+            if proc.poll() is None:
+                proc.kill()
+                proc.communicate()
+            self._standby = None
+
+    def close(self):
+        """Stop the standby process and remove the scratch directory"""
+        self.close_standby()
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+_warm_compiler = None
+
+def close_warm_compiler():
+    """Stop this process's WarmCompiler, if one was started"""
+    global _warm_compiler
+    if _warm_compiler is not None:
+        _warm_compiler.close()
+        _warm_compiler = None
+
+def _init_warm_worker():
+    # Pool workers leave through os._exit, so atexit never runs there;
+    # multiprocessing finalizers do run as the worker shuts down
+    multiprocessing.util.Finalize(None, close_warm_compiler, exitpriority=10)
+
+def compile_warm(tex_file, output_file, build_dir, max_passes=4, fmt_dir='.cv_cache/fmt', engine=None):
+    """Compile through this process's WarmCompiler, falling back to plain pdflatex
+
+    A failed warm compile is retried cold; if the cold compile succeeds the
+    format was at fault and is discarded, so the next compile dumps a new one.
+    engine is the version line from BuildCache.engine_id, when a cache has it.
+    """
+    global _warm_compiler
+    pdflatex_path = find_pdflatex()
+    if not pdflatex_path:
+        raise FileNotFoundError("pdflatex not found")
+    if _warm_compiler is None:
+        _warm_compiler = WarmCompiler(pdflatex_path, fmt_dir, engine)
+        atexit.register(close_warm_compiler)
+    with open(tex_file, 'r', encoding='utf-8') as f:
+        latex_code = f.read()
+    warm_failed = False
+    try:
+        if _warm_compiler.prepare(latex_code):
+            report = _warm_compiler.compile(tex_file, output_file, build_dir, max_passes)
+            if report:
+                return report
+            warm_failed = True
+            print("Warm compile failed - retrying with plain pdflatex")
+    except Exception as e:
+        warm_failed = True
+        print(f"Warm compile failed ({type(e).__name__}: {e}) - retrying with plain pdflatex")
+    report = compile_latex_to_pdf(tex_file, output_file, build_dir=build_dir, max_passes=max_passes)
+    if report and warm_failed:
+        _warm_compiler.discard_format()
+    return report
+
+def find_data_files(source):
+    """Resolve a directory, glob pattern or single file into a sorted list of CV data files"""
+    if os.path.isdir(source):
+        return sorted(glob.glob(os.path.join(source, '*.txt')))
+    return sorted(f for f in glob.glob(source) if os.path.isfile(f))
+
+def _compile_batch_item(tex_file, output_file, build_dir, max_passes, warm=False, engine=None):
+    """Worker: compile one document in its own build directory and time it"""
+    start = time.perf_counter()
+    try:
+        if warm:
+            report = compile_warm(tex_file, output_file, build_dir, max_passes=max_passes, engine=engine)
+        else:
+            report = compile_latex_to_pdf(tex_file, output_file, build_dir=build_dir, max_passes=max_passes)
+        ok = bool(report)
+        error = None if ok else report.summary()
+    except Exception as e:
+        ok = False
+        error = f"{type(e).__name__}: {e}"
+    return ok, time.perf_counter() - start, error
+
+def _fit_batch_item(data_file, output_file, build_dir, target_pages, engine, page_counts, layout, web, max_passes):
+    """Worker: fit one document to target_pages, then publish (or compile) the chosen layout
+
+    Returns (ok, seconds, error, latex_code, page_counts) so the parent can
+    cache the PDF and merge the new page-count measurements.
+    """
+    start = time.perf_counter()
+    latex_code = None
+    try:
+        fitted = fit_to_pages(parse_cv_data(data_file), target_pages, find_pdflatex(), engine, page_counts,
+                              build_dir=build_dir, layout=layout, web=web, max_passes=max_passes)
+        print_fit_result(fitted, target_pages, label=data_file)
+        latex_code = fitted['latex']
+        if fitted['pdf']:
+            ok = _move_pdf_to_output(fitted['pdf'], output_file)
+            error = None if ok else 'could not publish the fitted PDF'
+        else:
+            tex_file = os.path.join(build_dir, 'cv.tex')
+            with open(tex_file, 'w', encoding='utf-8') as f:
+                f.write(latex_code)
+            report = compile_latex_to_pdf(tex_file, output_file, build_dir=build_dir, max_passes=max_passes)
+            ok = bool(report)
+            error = None if ok else report.summary()
+    except FitError as e:
+        ok = False
+        error = str(e)
+    except Exception as e:
+        ok = False
+        error = f"{type(e).__name__}: {e}"
+    return ok, time.perf_counter() - start, error, latex_code, page_counts
+
+def _render_python_batch_item(data_file, output_file, web=False):
+    """Render one batch document with the in-process PDF writer"""
+    from cv_pdf_writer import render_cv_pdf
+    start = time.perf_counter()
+    try:
+        render_cv_pdf(parse_cv_data(data_file), output_file)
+        if web:
+            optimize_pdf_for_web(output_file)
+        ok, error = True, None
+    except Exception as e:
+        ok, error = False, f"{type(e).__name__}: {e}"
+    return {'source': data_file, 'output': output_file, 'ok': ok, 'cached': False,
+            'generate_seconds': time.perf_counter() - start, 'compile_seconds': 0.0, 'error': error}
+
+def build_batch(source, output_dir, jobs=None, cache=None, max_passes=4, keep_build_dirs=False, warm=False,
+                backend='pdflatex', web=False, layout=DEFAULT_LAYOUT, fit_pages=None, lint=True):
+    """Render every CV data file matched by source into output_dir/<name>.pdf
+
+    Parsing and LaTeX generation run in this process; only the pdflatex
+    compiles are fanned out to a process pool. Each document is compiled in
+    its own temporary build directory so concurrent runs never share
+    cv.tex/.aux files. With warm=True each pool process keeps a
+    WarmCompiler, so the preamble format is loaded once per process. With
+    backend='python' every PDF is rendered in-process by cv_pdf_writer.
+    web=True builds web-optimized PDFs (see optimize_pdf_for_web). The
+    layout's templates are compiled once and shared by every document.
+    fit_pages fits each document to that many pages: documents whose fit is
+    fully memoized go through the normal path, the rest run fit_to_pages in
+    the pool. With lint=True documents failing lint_cv are reported without
+    being compiled. Returns a list of per-document result dicts.
+    """
+    data_files = find_data_files(source)
+    if not data_files:
+        print(f"No CV data files matched: {source}")
+        return []
+    
+    os.makedirs(output_dir, exist_ok=True)
+    pdflatex_path = find_pdflatex()
+    engine = cache.engine_id(pdflatex_path) if (cache and pdflatex_path) else None
+    fit_engine = None
+    page_count_file = os.path.join(cache.cache_dir, PAGE_COUNT_FILE) if cache else None
+    page_counts = load_page_counts(page_count_file)
+    if fit_pages and pdflatex_path:
+        fit_engine = engine or get_pdflatex_version(pdflatex_path)
+    qpdf_path = find_qpdf() if web else None
+    if engine and qpdf_path:
+        engine += ' +qpdf'
+    
+    results = []
+    pending = []
+    for data_file in data_files:
+        name = os.path.splitext(os.path.basename(data_file))[0]
+        output_file = os.path.join(output_dir, name + '.pdf')
+        start = time.perf_counter()
+        if backend == 'python':
+            results.append(_render_python_batch_item(data_file, output_file, web=web))
+            continue
+        try:
+            cv = parse_cv_data(data_file)
+            issues = lint_cv(cv) if lint else []
+            if issues:
+                results.append({'source': data_file, 'output': output_file, 'ok': False, 'cached': False,
+                                'generate_seconds': time.perf_counter() - start, 'compile_seconds': 0.0,
+                                'error': '\n           '.join(str(issue) for issue in issues)})
+                continue
+            if fit_engine:
+                fitted = fit_to_pages(cv, fit_pages, pdflatex_path, fit_engine, page_counts,
+                                      layout=layout, web=web, compile=False)
+                latex_code = fitted['latex'] if fitted else None
+            else:
+                latex_code = generate_latex(cv, web=web, layout=layout)
+        except Exception as e:
+            results.append({'source': data_file, 'output': output_file, 'ok': False, 'cached': False,
+                            'generate_seconds': time.perf_counter() - start, 'compile_seconds': 0.0,
+                            'error': f"{type(e).__name__}: {e}"})
+            continue
+        generate_seconds = time.perf_counter() - start
+        
+        # Build in scratch directories beside the outputs' tree so publishing is a rename, not a copy
+        if latex_code is None:
+            # Page counts not memoized yet - fit in the pool
+            pending.append({'source': data_file, 'output': output_file, 'fit': True, 'key': None,
+                            'build_dir': scratch_dir(f'cv-{name}-'),
+                            'generate_seconds': generate_seconds})
+            continue
+        
+        key = cache.make_key(latex_code, engine) if engine is not None else None
+        if key and cache.lookup(key, output_file):
+            results.append({'source': data_file, 'output': output_file, 'ok': True, 'cached': True,
+                            'generate_seconds': generate_seconds, 'compile_seconds': 0.0, 'error': None})
+            continue
+        
+        build_dir = scratch_dir(f'cv-{name}-')
+        tex_file = os.path.join(build_dir, 'cv.tex')
+        with open(tex_file, 'w', encoding='utf-8') as f:
+            f.write(latex_code)
+        pending.append({'source': data_file, 'output': output_file, 'build_dir': build_dir, 'fit': False,
+                        'tex_file': tex_file, 'key': key, 'generate_seconds': generate_seconds})
+    
+    if pending:
+        if not pdflatex_path:
+            for item in pending:
+                results.append({'source': item['source'], 'output': item['output'], 'ok': False,
+                                'cached': False, 'generate_seconds': item['generate_seconds'],
+                                'compile_seconds': 0.0, 'error': 'pdflatex not found'})
+        else:
+            workers = jobs or os.cpu_count() or 1
+            workers = max(1, min(workers, len(pending)))
+            print(f"Compiling {len(pending)} document(s) with {workers} worker(s)...")
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_warm_worker if warm else None) as pool:
+                futures = {}
+                for item in pending:
+                    if item['fit']:
+                        future = pool.submit(_fit_batch_item, item['source'], item['output'], item['build_dir'],
+                                             fit_pages, fit_engine, page_counts, layout, web, max_passes)
+                    else:
+                        future = pool.submit(_compile_batch_item, item['tex_file'], item['output'],
+                                             item['build_dir'], max_passes, warm, engine)
+                    futures[future] = item
+                for future in as_completed(futures):
+                    item = futures[future]
+                    if item['fit']:
+                        ok, compile_seconds, error, latex_code, measured = future.result()
+                        page_counts.update(measured)
+                        if ok and engine is not None:
+                            item['key'] = cache.make_key(latex_code, engine)
+                    else:
+                        ok, compile_seconds, error = future.result()
+                    if ok and qpdf_path:
+                        optimize_pdf_for_web(item['output'], qpdf_path)
+                    if ok and item['key']:
+                        cache.store(item['key'], item['output'])
+                    results.append({'source': item['source'], 'output': item['output'], 'ok': ok,
+                                    'cached': False, 'generate_seconds': item['generate_seconds'],
+                                    'compile_seconds': compile_seconds, 'error': error})
+        if not keep_build_dirs:
+            for item in pending:
+                shutil.rmtree(item['build_dir'], ignore_errors=True)
+    if fit_engine:
+        save_page_counts(page_count_file, page_counts)
+    
+    results.sort(key=lambda r: r['source'])
+    return results
+
+def print_batch_report(results, title='Batch results'):
+    """Print per-document timing and a failure summary for build_batch (or build_locales)"""
+    print(f"\n{title}:")
+    print(f"  {'status':<8} {'generate':>10} {'compile':>10}  source")
+    for r in results:
+        status = 'cached' if r['cached'] else ('ok' if r['ok'] else 'FAILED')
+        print(f"  {status:<8} {r['generate_seconds'] * 1000:>8.1f}ms {r['compile_seconds']:>9.2f}s  {r['source']}")
+        if r['error']:
+            print(f"           {r['error']}")
+    failed = [r for r in results if not r['ok']]
+    print(f"{len(results) - len(failed)} succeeded, {len(failed)} failed")
+
+async def _run_pdflatex_async(pdflatex_path, tex_file, build_dir, timeout, on_event=print_log_event):
+    """Run one pdflatex pass as an asyncio subprocess, parsing its output as it arrives
+
+    Stops at the first error; killed if the task is cancelled or times out.
+    Returns the pass's CompileReport.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        pdflatex_path, '-interaction=nonstopmode', '-output-directory', build_dir, tex_file,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        env=_pdflatex_env()
+    )
+    parser = PdflatexLogParser()
+    report = CompileReport(passes=1)
+    tail = collections.deque(maxlen=LOG_TAIL_LINES)
+    
+    async def read_output():
+        while True:
+            raw = await proc.stdout.readline()
+            if not raw:
+                break
+            text = raw.decode('utf-8', errors='replace')
+            tail.append(text.rstrip('\r\n'))
+            for event in parser.feed(text):
+                report.events.append(event)
+                if on_event:
+                    on_event(event)
+                if event.kind in LOG_FATAL_KINDS:
+                    report.aborted = True
+            if report.aborted:
+                proc.kill()
+                break
+        for event in parser.close():
+            report.events.append(event)
+            if on_event:
+                on_event(event)
+        await proc.wait()
+    
+    try:
+        await asyncio.wait_for(read_output(), timeout)
+    except BaseException:
+        # Cancelled by a newer edit (or timed out) - don't leave pdflatex running
+        if proc.returncode is None:
+            proc.kill()
+            await proc.wait()
+        raise
+    report.returncode = proc.returncode
+    report.tail = tuple(tail)
+    report.ok = proc.returncode == 0 and not report.aborted
+    return report
+
+async def compile_latex_async(pdflatex_path, tex_file, build_dir, max_passes=4, on_event=print_log_event):
+    """Async counterpart of the converging compile. Returns the built PDF path or None."""
+    os.makedirs(build_dir, exist_ok=True)
+    base_name = os.path.splitext(os.path.basename(tex_file))[0]
+    previous_hash = hash_aux_files(build_dir, base_name)
+    for pass_number in range(1, max(1, max_passes) + 1):
+        report = await _run_pdflatex_async(pdflatex_path, tex_file, build_dir,
+                                           120 if pass_number == 1 else 60, on_event)
+        if not report:
+            print(f"Compilation pass {pass_number} failed:")
+            print_compile_failure(report, tex_file, pdflatex_path)
+            return None
+        current_hash = hash_aux_files(build_dir, base_name)
+        if current_hash == previous_hash:
+            break
+        previous_hash = current_hash
+    print_box_summary(report)
+    pdf_file = os.path.join(build_dir, base_name + '.pdf')
+    return pdf_file if os.path.exists(pdf_file) else None
+
+def build_locales(cv, codes, output_file='public/CV.pdf', cache=None, max_passes=4, warm=False, web=False,
+                  layout=DEFAULT_LAYOUT, lint=True, build_root='.cv_build'):
+    """Build one PDF per locale from a single parsed CVDocument, compiling concurrently
+
+    Each locale gets its own output (see locale_output_path), build
+    directory under build_root and cache entry, keyed on its LaTeX and its
+    engine. Misses compile at the same time as asyncio subprocesses, each
+    with the engine the locale asks for. With warm=True pdflatex locales
+    share this process's WarmCompiler, one at a time, while xelatex ones
+    run alongside. layout applies to locales that don't name their own.
+    Returns per-locale result dicts like build_batch.
+    """
+    qpdf_path = find_qpdf() if web else None
+    results = []
+    pending = []
+    for code in codes:
+        start = time.perf_counter()
+        output = locale_output_path(output_file, code)
+        result = {'source': code, 'output': output, 'ok': False, 'cached': False,
+                  'generate_seconds': 0.0, 'compile_seconds': 0.0, 'error': None}
+        results.append(result)
+        try:
+            locale = load_locale(code)
+            result['source'] = f"{code} ({locale.engine})"
+            localized, unmatched = apply_overlay(cv, locale)
+            for key in unmatched:
+                print(f"{code}: translation for {key} matches nothing in {cv.source}")
+            issues = lint_cv(localized) if lint else []
+            latex_code = generate_latex(localized, web=web and locale.supports_web,
+                                        layout=locale.layout or layout, labels=locale.labels)
+            issues += lint_latex(latex_code) if lint else []
+        except Exception as e:
+            result['error'] = f"{type(e).__name__}: {e}"
+            continue
+        result['generate_seconds'] = time.perf_counter() - start
+        if issues:
+            result['error'] = '\n           '.join(str(issue) for issue in issues)
+            continue
+        
+        engine_path = find_tex_engine(locale.engine)
+        if not engine_path:
+            result['error'] = f"{locale.engine} not found"
+            continue
+        key = None
+        if cache:
+            key = cache.make_key(latex_code, cache.engine_id(engine_path) + (' +qpdf' if qpdf_path else ''))
+            if cache.lookup(key, output):
+                result.update(ok=True, cached=True)
+                continue
+        build_dir = os.path.join(build_root, f'locale-{code}')
+        os.makedirs(build_dir, exist_ok=True)
+        tex_file = os.path.join(build_dir, 'cv.tex')
+        write_if_changed(tex_file, latex_code)
+        pending.append((result, locale, engine_path, tex_file, build_dir, key))
+    
+    if pending:
+        print(f"Compiling {len(pending)} locale(s): {', '.join(item[1].code for item in pending)}")
+        asyncio.run(_compile_locales(pending, max_passes, warm))
+        for result, _, _, _, _, key in pending:
+            if result['ok'] and qpdf_path:
+                optimize_pdf_for_web(result['output'], qpdf_path)
+            if result['ok'] and key:
+                cache.store(key, result['output'])
+    return results
+
+async def _compile_locales(pending, max_passes, warm):
+    """Compile every pending locale at once; fills in each result dict"""
+    warm_lock = asyncio.Lock()
+    
+    async def compile_one(result, locale, engine_path, tex_file, build_dir):
+        start = time.perf_counter()
+        def on_event(event):
+            if event.kind in LOG_FATAL_KINDS:
+                print(f"  [{locale.code}] LaTeX {event.kind.replace('_', ' ')}: {event}")
+        try:
+            if warm and locale.engine == 'pdflatex':
+                # One WarmCompiler per process, and it runs one document at a time
+                async with warm_lock:
+                    report = await asyncio.to_thread(compile_warm, tex_file, result['output'], build_dir,
+                                                     max_passes)
+                ok = bool(report)
+                error = None if ok else report.summary()
+            else:
+                pdf_file = await compile_latex_async(engine_path, tex_file, build_dir, max_passes,
+                                                     on_event=on_event)
+                ok = bool(pdf_file) and _move_pdf_to_output(pdf_file, result['output'])
+                error = None if ok else f"{locale.engine} failed"
+        except Exception as e:
+            ok, error = False, f"{type(e).__name__}: {e}"
+        result.update(ok=ok, error=error, compile_seconds=time.perf_counter() - start)
+    
+    await asyncio.gather(*(compile_one(result, locale, engine_path, tex_file, build_dir)
+                           for result, locale, engine_path, tex_file, build_dir, _ in pending))
+
+def _snapshot(paths):
+    """(mtime, size) for each watched path; missing files map to None"""
+    stamps = {}
+    for path in paths:
+        try:
+            st = os.stat(path)
+            stamps[path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamps[path] = None
+    return stamps
+
+async def watch_and_rebuild(data_file, output_file, watch_paths=(), build_dir='.cv_build/watch',
+                            cache=None, max_passes=4, debounce=0.3, poll_interval=0.2, layout=DEFAULT_LAYOUT):
+    """Rebuild output_file whenever the CV data, a layout template or another watched path changes
+
+    Changes are detected by polling mtimes. A burst of saves is debounced
+    into one rebuild, a newer edit cancels an in-flight compile (killing
+    pdflatex), and output_file is only replaced - atomically - after a
+    successful compile.
+    """
+    pdflatex_path = find_pdflatex()
+    if not pdflatex_path:
+        raise FileNotFoundError("pdflatex not found")
+    engine = cache.engine_id(pdflatex_path) if cache else None
+    paths = [data_file] + [p for p in watch_paths if p != data_file]
+    paths += sorted({os.path.relpath(layout_part_path(layout, part)) for part in LAYOUT_PARTS})
+    tex_file = os.path.join(build_dir, 'cv.tex')
+    os.makedirs(build_dir, exist_ok=True)
+    
+    async def build_once():
+        start = time.perf_counter()
+        try:
+            cv = parse_cv_data(data_file)
+            latex_code = generate_latex(cv, layout=layout)
+        except (OSError, CVDataError, TemplateError) as e:
+            print(f"Skipping rebuild: {e}")
+            return
+        issues = lint_cv(cv) + lint_latex(latex_code)
+        if issues:
+            print_lint_issues(issues)
+            return
+        key = cache.make_key(latex_code, engine) if cache else None
+        if key and cache.lookup(key, output_file):
+            print(f"[{time.strftime('%H:%M:%S')}] Up to date (cache hit) in {(time.perf_counter() - start) * 1000:.0f}ms")
+            return
+        write_if_changed(tex_file, latex_code)
+        pdf_file = await compile_latex_async(pdflatex_path, tex_file, build_dir, max_passes)
+        if pdf_file is None:
+            print(f"[{time.strftime('%H:%M:%S')}] Build failed - keeping the previous {output_file}")
+            return
+        changed = publish_pdf(pdf_file, output_file)
+        if key:
+            cache.store(key, output_file)
+        if not changed:
+            print(f"[{time.strftime('%H:%M:%S')}] PDF bytes unchanged - {output_file} left as is")
+            return
+        print(f"[{time.strftime('%H:%M:%S')}] Rebuilt {output_file} in {time.perf_counter() - start:.2f}s")
+    
+    async def rebuild():
+        # One failed rebuild must not end the watch: log it and wait for the next change
+        try:
+            await build_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"[{time.strftime('%H:%M:%S')}] Rebuild failed ({type(e).__name__}: {e}) - still watching")
+    
+    print(f"Watching {', '.join(paths)} (Ctrl+C to stop)")
+    stamps = _snapshot(paths)
+    task = asyncio.ensure_future(rebuild())
+    while True:
+        await asyncio.sleep(poll_interval)
+        current = _snapshot(paths)
+        if current == stamps:
+            continue
+        # Debounce: wait until the files stop changing
+        while True:
+            stamps = current
+            await asyncio.sleep(debounce)
+            current = _snapshot(paths)
+            if current == stamps:
+                break
+        if not task.done():
+            print("Change detected - cancelling in-flight build")
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        task = asyncio.ensure_future(rebuild())
 
 def open_pdf_in_chrome(pdf_path):
     """Open PDF in Chrome"""
@@ -533,30 +2570,278 @@ def open_pdf_in_chrome(pdf_path):
         return False
 
 if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Generate CV PDF from CV_DATA.txt')
+    parser.add_argument('--no-cache', action='store_true', help='Always run pdflatex, ignoring the build cache')
+    parser.add_argument('--clear-cache', action='store_true', help='Empty the build cache before building')
+    parser.add_argument('--cache-dir', default='.cv_cache', help='Build cache directory (default: .cv_cache)')
+    parser.add_argument('--cache-max-mb', type=float, default=50, help='Build cache size limit in MB (default: 50)')
+    parser.add_argument('--no-open', action='store_true', help='Do not open the PDF in Chrome')
+    parser.add_argument('--build-dir', default=None,
+                        help='Keep auxiliary files in this directory and stop passes once they converge')
+    parser.add_argument('--max-passes', type=int, default=4, help='Maximum pdflatex passes with --build-dir (default: 4)')
+    parser.add_argument('--batch', metavar='DIR_OR_GLOB',
+                        help='Render every CV data file in a directory (or matching a glob) instead of CV_DATA.txt')
+    parser.add_argument('--out-dir', default='build/cvs', help='Output directory for --batch (default: build/cvs)')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Parallel pdflatex processes for --batch, image workers for --assets (default: CPU count)')
+    parser.add_argument('--warm', action='store_true',
+                        help='Compile with a precompiled preamble format and a standby pdflatex process')
+    parser.add_argument('--watch', action='store_true',
+                        help='Keep running and rebuild public/CV.pdf whenever CV_DATA.txt changes')
+    parser.add_argument('--watch-path', action='append', default=[],
+                        help='Additional file to watch in --watch mode (repeatable)')
+    parser.add_argument('--debounce', type=float, default=0.3,
+                        help='Seconds of quiet before a --watch rebuild starts (default: 0.3)')
+    parser.add_argument('--backend', choices=['pdflatex', 'python'], default='pdflatex',
+                        help='pdflatex (high fidelity, default) or python (in-process, no TeX needed)')
+    parser.add_argument('--profile', action='store_true', help='Print a per-stage timing breakdown')
+    parser.add_argument('--trace', metavar='FILE', help='Write a Chrome trace-event JSON of the build stages')
+    parser.add_argument('--emit-site-data', action='store_true',
+                        help='Also regenerate lib/data.ts and lib/cv-data.json from CV_DATA.txt')
+    parser.add_argument('--overwrite-site-data', action='store_true',
+                        help='Let --emit-site-data replace a hand-maintained lib/data.ts')
+    parser.add_argument('--web', action='store_true',
+                        help='Web-optimized output: max compression, no metadata, linearized with qpdf if installed')
+    parser.add_argument('--export', nargs='+', choices=['html', 'md', 'txt'], metavar='FORMAT',
+                        help='Also export the CV as html, md and/or txt (no LaTeX needed)')
+    parser.add_argument('--export-dir', default='public', help='Directory for --export files (default: public)')
+    parser.add_argument('--export-only', action='store_true', help='Write the --export files and skip the PDF')
+    parser.add_argument('--layout', default=DEFAULT_LAYOUT, choices=list_layouts(),
+                        help=f'LaTeX layout from templates/latex (default: {DEFAULT_LAYOUT})')
+    parser.add_argument('--fit-pages', type=int, metavar='N',
+                        help='Tighten spacing (and if needed the font size) until the CV fits in N pages')
+    parser.add_argument('--no-lint', action='store_true', help='Skip the pre-compile LaTeX lint')
+    parser.add_argument('--assets', action='store_true',
+                        help='Build resized WebP/AVIF variants of public/images and public/assets/manifest.json')
+    parser.add_argument('--locales', nargs='+', choices=list_locales(), metavar='LOCALE',
+                        help=f'Build these languages concurrently into public/CV.<locale>.pdf '
+                             f'(available: {", ".join(list_locales())}; {DEFAULT_LOCALE} is public/CV.pdf)')
+    parser.add_argument('--photo', nargs='?', const='', metavar='IMAGE_URL',
+                        help='Put a photo in the CV header (default: personalInfo.profileImage from site_overrides.json)')
+    args = parser.parse_args()
+    if args.fit_pages and args.backend == 'python':
+        parser.error('--fit-pages needs the pdflatex backend')
+
+    if args.watch:
+        cache = None
+        if not args.no_cache:
+            cache = BuildCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+        try:
+            asyncio.run(watch_and_rebuild('CV_DATA.txt', 'public/CV.pdf', watch_paths=args.watch_path,
+                                          build_dir=args.build_dir or '.cv_build/watch', cache=cache,
+                                          max_passes=args.max_passes, debounce=args.debounce,
+                                          layout=args.layout))
+        except KeyboardInterrupt:
+            print("Stopped watching")
+        raise SystemExit(0)
+
+    if args.batch:
+        cache = None
+        if not args.no_cache:
+            cache = BuildCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+            if args.clear_cache:
+                cache.clear()
+        results = build_batch(args.batch, args.out_dir, jobs=args.jobs, cache=cache,
+                              max_passes=args.max_passes, warm=args.warm, backend=args.backend, web=args.web,
+                              layout=args.layout, fit_pages=args.fit_pages, lint=not args.no_lint)
+        print_batch_report(results)
+        if cache:
+            print(cache.summary())
+        raise SystemExit(0 if results and all(r['ok'] for r in results) else 1)
+    
+    if args.locales:
+        cache = None
+        if not args.no_cache:
+            cache = BuildCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+            if args.clear_cache:
+                cache.clear()
+        results = build_locales(parse_cv_data('CV_DATA.txt'), args.locales, 'public/CV.pdf', cache=cache,
+                                max_passes=args.max_passes, warm=args.warm, web=args.web, layout=args.layout,
+                                lint=not args.no_lint)
+        print_batch_report(results, title='Locale results')
+        if cache:
+            print(cache.summary())
+        raise SystemExit(0 if all(r['ok'] for r in results) else 1)
+
+    profiler = None
+    if args.profile or args.trace:
+        profiler = BuildProfiler()
+        set_profiler(profiler)
+    
+    photo = None
+    if args.assets or args.photo is not None:
+        import cv_assets
+        photo_url = args.photo or load_site_overrides().get('personalInfo', {}).get('profileImage', '')
+        if not cv_assets.pillow_available():
+            print("Pillow not installed (pip install Pillow) - skipping image assets")
+        else:
+            # The site photo always gets its PDF variant, so --assets runs don't drop it
+            with profile_stage('assets'):
+                manifest, asset_stats = cv_assets.build_assets(
+                    jobs=args.jobs, pdf_photos=[photo_url] if photo_url else [],
+                    only=None if args.assets else [photo_url])
+            cv_assets.print_asset_report(asset_stats)
+            if args.photo is not None:
+                photo = cv_assets.pdf_photo_path(manifest, photo_url)
+                if not photo:
+                    print(f"No usable image for --photo {photo_url!r} - building without a photo")
+    
     # Parse CV data
-    header, sections = parse_cv_data('CV_DATA.txt')
+    with profile_stage('parse'):
+        cv = parse_cv_data('CV_DATA.txt')
     
     # Generate LaTeX
-    latex_code = generate_latex(header, sections)
+    with profile_stage('generate') as stage:
+        latex_code = generate_latex(cv, web=args.web, layout=args.layout, photo=photo)
+        stage['output_chars'] = len(latex_code)
     
-    # Write LaTeX file
-    tex_file = 'cv.tex'
-    with open(tex_file, 'w', encoding='utf-8') as f:
-        f.write(latex_code)
+    if args.emit_site_data:
+        try:
+            changed = emit_site_data(cv, overwrite=args.overwrite_site_data)
+        except SiteDataError as e:
+            print(f"Site data not written: {e}")
+            raise SystemExit(1)
+        print(f"Site data updated: {', '.join(changed)}" if changed else "Site data unchanged")
     
-    print(f"LaTeX file generated: {tex_file}")
+    if args.export:
+        from cv_exporters import export_cv
+        with profile_stage('export'):
+            written = export_cv(cv, args.export, args.export_dir)
+        for path, changed in written.values():
+            print(f"Exported: {path}" if changed else f"Export unchanged: {path}")
+    if args.export_only:
+        if not args.export:
+            parser.error('--export-only requires --export')
+        raise SystemExit(0)
+    
+    if args.backend == 'python':
+        from cv_pdf_writer import render_cv_pdf
+        if photo:
+            print("The python backend does not embed images - building without the photo")
+        os.makedirs('public', exist_ok=True)
+        with profile_stage('render pdf (python)') as stage:
+            fd, tmp_pdf = scratch_file(prefix='cv-', suffix='.pdf')
+            os.close(fd)
+            try:
+                pages = render_cv_pdf(cv, tmp_pdf)
+                if args.web:
+                    report_web_optimization(tmp_pdf)
+                if publish_pdf(tmp_pdf, 'public/CV.pdf'):
+                    stage['bytes_written'] = os.path.getsize('public/CV.pdf')
+            finally:
+                if os.path.exists(tmp_pdf):
+                    os.remove(tmp_pdf)
+        print(f"PDF generated without LaTeX ({pages} page(s)): public/CV.pdf")
+        if profiler:
+            set_profiler(None)
+            if args.profile:
+                print("\nBuild profile:")
+                print(profiler.report())
+            if args.trace:
+                profiler.write_chrome_trace(args.trace)
+        if not args.no_open:
+            open_pdf_in_chrome(os.path.abspath('public/CV.pdf'))
+        raise SystemExit(0)
+    
+    if not args.no_lint:
+        with profile_stage('lint') as stage:
+            issues = lint_cv(cv) + lint_latex(latex_code)
+            stage['issues'] = len(issues)
+        if issues:
+            print_lint_issues(issues)
+            raise SystemExit(1)
     
     # Compile to PDF directly in public folder
     public_pdf = 'public/CV.pdf'
     # Ensure public directory exists
     os.makedirs('public', exist_ok=True)
-    if compile_latex_to_pdf(tex_file, public_pdf):
+
+    cache = None
+    cache_key = None
+    pdflatex_path = find_pdflatex()
+    qpdf_path = find_qpdf() if args.web else None
+    if not args.no_cache:
+        cache = BuildCache(args.cache_dir, max_bytes=int(args.cache_max_mb * 1024 * 1024))
+        if args.clear_cache:
+            cache.clear()
+    
+    fit_pdf = None
+    if args.fit_pages and not pdflatex_path:
+        print("pdflatex not found - skipping --fit-pages")
+    elif args.fit_pages:
+        page_count_file = os.path.join(args.cache_dir, PAGE_COUNT_FILE) if cache else None
+        page_counts = load_page_counts(page_count_file)
+        engine = cache.engine_id(pdflatex_path) if cache else get_pdflatex_version(pdflatex_path)
+        try:
+            with profile_stage('fit pages') as stage:
+                fitted = fit_to_pages(cv, args.fit_pages, pdflatex_path, engine, page_counts,
+                                      build_dir=args.build_dir or '.cv_build/fit', layout=args.layout,
+                                      web=args.web, max_passes=args.max_passes, photo=photo)
+                stage['compiles'] = fitted['compiles']
+        except FitError as e:
+            save_page_counts(page_count_file, page_counts)
+            print(f"Could not fit to {args.fit_pages} page(s): {e}")
+            raise SystemExit(1)
+        save_page_counts(page_count_file, page_counts)
+        print_fit_result(fitted, args.fit_pages)
+        latex_code, fit_pdf = fitted['latex'], fitted['pdf']
+    
+    # Write LaTeX file (skipped when unchanged)
+    tex_file = 'cv.tex'
+    with profile_stage('write tex') as stage:
+        if write_if_changed(tex_file, latex_code):
+            stage['bytes_written'] = len(latex_code.encode('utf-8'))
+    
+    print(f"LaTeX file generated: {tex_file}")
+    
+    if cache:
+        if pdflatex_path:
+            # Cached PDFs built with and without the qpdf pass are different files
+            engine = cache.engine_id(pdflatex_path) + (' +qpdf' if qpdf_path else '')
+            cache_key = cache.make_key(latex_code, engine)
+
+    with profile_stage('cache lookup') as stage:
+        cache_hit = bool(cache_key) and cache.lookup(cache_key, public_pdf)
+        stage['hit'] = cache_hit
+    if cache_hit:
+        print(f"PDF up to date (cache hit): {public_pdf}")
+        print(cache.summary())
+        built = True
+    else:
+        with profile_stage('compile'):
+            if fit_pdf:
+                # The chosen fit was compiled while searching
+                built = _move_pdf_to_output(fit_pdf, public_pdf)
+            elif args.warm and pdflatex_path:
+                built = compile_warm(tex_file, public_pdf, args.build_dir or '.cv_build/cv', max_passes=args.max_passes,
+                                     engine=cache.engine_id(pdflatex_path) if cache else None)
+            else:
+                built = compile_latex_to_pdf(tex_file, public_pdf, build_dir=args.build_dir, max_passes=args.max_passes)
+        if built and args.web:
+            report_web_optimization(public_pdf, qpdf_path)
+        if built and cache_key:
+            cache.store(cache_key, public_pdf)
+            print(cache.summary())
+    
+    if profiler:
+        set_profiler(None)
+        if args.profile:
+            print("\nBuild profile:")
+            print(profiler.report())
+        if args.trace:
+            profiler.write_chrome_trace(args.trace)
+            print(f"Chrome trace written to {args.trace}")
+
+    if built:
         print(f"PDF generated successfully: {public_pdf}")
         
-        # Open in Chrome
-        pdf_path = os.path.abspath(public_pdf)
-        print(f"Opening PDF in Chrome: {pdf_path}")
-        open_pdf_in_chrome(pdf_path)
+        if not args.no_open:
+            # Open in Chrome
+            pdf_path = os.path.abspath(public_pdf)
+            print(f"Opening PDF in Chrome: {pdf_path}")
+            open_pdf_in_chrome(pdf_path)
     else:
         print("\nNote: LaTeX is not installed. The LaTeX file (cv.tex) has been generated.")
         print("You can compile it manually with: pdflatex cv.tex")
@@ -0,0 +1,108 @@
+"""Streaming CV_DATA.txt parser: records, line numbers and a parse -> write -> parse round trip"""
+
+import os
+
+import pytest
+
+import generate_cv_pdf as cvgen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CV_DATA = os.path.join(ROOT, 'CV_DATA.txt')
+
+def _to_cv_data(cv):
+    """Write a CVDocument back out in the CV_DATA.txt format"""
+    out = [cv.header.name, cv.header.contact] + [url for _, url in cv.header.links] + ['']
+    out += [line for bio in cv.header.bio for line in (bio, '')]
+    rule = '-' * 80
+    if cv.experience is not None:
+        out += ['', 'EXPERIENCE', rule]
+        for entry in cv.experience:
+            out += [entry.position, entry.company] + ([entry.dates] if entry.dates else []) + ['']
+            if entry.intro:
+                out += [entry.intro, '']
+            out += ['• ' + bullet for bullet in entry.description]
+            if entry.technologies:
+                out += ['', 'Skills: ' + ', '.join(entry.technologies)]
+            out += ['']
+    if cv.education is not None:
+        out += ['', 'EDUCATION', rule]
+        for entry in cv.education:
+            out += [entry.institution, entry.degree, entry.location]
+            if entry.dates not in (entry.institution, entry.degree, entry.location):
+                out += [entry.dates]
+    if cv.skills is not None:
+        out += ['', 'SKILLS', rule]
+        out += [f"{skill.category}: {', '.join(skill.items)}" for skill in cv.skills]
+    if cv.projects is not None:
+        out += ['', 'PROJECTS', rule]
+        for project in cv.projects:
+            out += [project.title] + [line for line in (project.description, project.links_line) if line] + ['']
+            out += ['• ' + bullet for bullet in project.highlights]
+            if project.technologies:
+                out += ['', 'Technologies: ' + ', '.join(project.technologies)]
+            out += ['']
+    return '\n'.join(out) + '\n'
+
+@pytest.fixture(scope='module')
+def cv():
+    return cvgen.parse_cv_data(CV_DATA)
+
+def test_round_trip(cv):
+    again = cvgen.parse_cv_bytes(_to_cv_data(cv).encode('utf-8'))
+    for name in ('header', 'experience', 'education', 'skills', 'projects'):
+        assert getattr(again, name) == getattr(cv, name), name
+    assert cvgen.generate_latex(again) == cvgen.generate_latex(cv)
+
+def test_every_line_is_parsed(cv):
+    # Every content line of CV_DATA.txt ends up in some field of the document
+    texts = set()
+    header = cv.header
+    texts.update([header.name, header.contact, *header.bio, *(url for _, url in header.links)])
+    for entry in cv.experience:
+        texts.update([entry.position, entry.company, entry.dates, entry.intro, *entry.description])
+    for entry in cv.education:
+        texts.update([entry.institution, entry.degree, entry.location, entry.dates])
+    for project in cv.projects:
+        texts.update([project.title, project.description, project.links_line, *project.highlights])
+    lists = [', '.join(e.technologies) for e in cv.experience + cv.projects]
+    lists += [f"{s.category}: {', '.join(s.items)}" for s in cv.skills]
+    with open(CV_DATA, 'r', encoding='utf-8') as f:
+        for lineno, line in enumerate(f, 1):
+            stripped = line.strip().lstrip('•').strip()
+            if not stripped or stripped.startswith('---') or stripped in cvgen.SECTION_PARSERS:
+                continue
+            for prefix in ('Skills:', 'Technologies:'):
+                if stripped.startswith(prefix):
+                    stripped = stripped[len(prefix):].strip()
+            assert stripped in texts or stripped in lists, f"CV_DATA.txt:{lineno} not parsed: {stripped[:60]}"
+
+def test_bytes_and_file_parse_alike(cv):
+    with open(CV_DATA, 'rb') as f:
+        from_bytes = cvgen.parse_cv_bytes(f.read(), source=CV_DATA)
+    assert from_bytes == cv
+    assert [r.line for r in from_bytes.experience] == [r.line for r in cv.experience]
+
+def test_record_stream_order_and_lines():
+    with open(CV_DATA, 'r', encoding='utf-8') as f:
+        lines = f.read().splitlines()
+        records = list(cvgen.iter_cv_records(lines))
+    assert isinstance(records[0], cvgen.Header) and records[0].line == 1
+    headings = [r for r in records if isinstance(r, cvgen.SectionStart)]
+    assert [r.name for r in headings] == ['EXPERIENCE', 'EDUCATION', 'SKILLS', 'PROJECTS']
+    for record in records:
+        first_line = lines[record.line - 1].strip()
+        expected = record.name if isinstance(record, (cvgen.Header, cvgen.SectionStart)) else None
+        expected = expected or getattr(record, 'position', None) or getattr(record, 'institution', None) \
+            or getattr(record, 'title', None) or record.category
+        assert first_line.startswith(expected)
+
+def test_missing_and_empty_sections():
+    cv = cvgen.parse_cv_bytes(b'Jane Doe\njane@example.com\n\nSKILLS\n---\n')
+    assert cv.header.name == 'Jane Doe' and cv.header.contact == 'jane@example.com'
+    assert cv.skills == [] and cv.experience is None and cv.projects is None
+
+def test_invalid_utf8_reports_line():
+    with pytest.raises(cvgen.CVDataError) as info:
+        cvgen.parse_cv_bytes(b'Jane Doe\n\nEXPERIENCE\nCaf\xe9 owner\n', source='cv.txt')
+    assert (info.value.source, info.value.line) == ('cv.txt', 4)
+    assert str(info.value).startswith('cv.txt:4: not valid UTF-8')
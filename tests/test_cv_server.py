@@ -0,0 +1,85 @@
+"""RenderService request handling, without an HTTP server or a TeX engine"""
+
+import os
+import errno
+import threading
+
+import pytest
+
+import cv_server
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def body():
+    with open(os.path.join(ROOT, 'CV_DATA.txt'), 'rb') as f:
+        return f.read()
+
+@pytest.fixture
+def service():
+    service = cv_server.RenderService(workers=1, max_queue=1, timeout=5, backend='python')
+    yield service
+    service.close()
+
+def _render_in_thread(service, body, **kwargs):
+    """Render on another thread so a deadlock fails the test instead of hanging it"""
+    outcome = {}
+    def run():
+        try:
+            outcome['result'] = service.render(body, **kwargs)
+        except BaseException as e:
+            outcome['error'] = e
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive(), "render deadlocked"
+    return outcome
+
+def _health_in_thread(service):
+    outcome = {}
+    thread = threading.Thread(target=lambda: outcome.update(service.health()), daemon=True)
+    thread.start()
+    thread.join(5)
+    assert not thread.is_alive(), "health() blocked on the service lock"
+    return outcome
+
+def test_instant_compile_does_not_deadlock(service, body, monkeypatch):
+    monkeypatch.setattr(service, '_compile', lambda latex_code, cv, backend: b'%PDF-instant')
+    first = _render_in_thread(service, body)
+    pdf, key, how = first['result']
+    assert (pdf, how) == (b'%PDF-instant', 'miss')
+
+    second = _render_in_thread(service, body)
+    assert second['result'] == (b'%PDF-instant', key, 'hit')
+    health = _health_in_thread(service)
+    assert (health['compiles'], health['hits'], health['inflight']) == (1, 1, 0)
+
+def test_failing_compile_does_not_deadlock(service, body, monkeypatch):
+    def no_space(*args, **kwargs):
+        raise OSError(errno.ENOSPC, 'No space left on device')
+    monkeypatch.setattr(cv_server.tempfile, 'mkdtemp', no_space)
+    outcome = _render_in_thread(service, body)
+    assert isinstance(outcome['error'], OSError)
+    health = _health_in_thread(service)
+    assert (health['failures'], health['inflight'], health['cached']) == (1, 0, 0)
+
+@pytest.mark.parametrize('layout', ['../templates', '/tmp/x', '.', 'no-such-layout'])
+def test_unknown_layout_rejected(service, body, layout):
+    with pytest.raises(cv_server.RenderError) as info:
+        service.prepare(body, layout=layout)
+    assert info.value.status == 400
+
+def test_unknown_backend_rejected(service, body):
+    with pytest.raises(cv_server.RenderError) as info:
+        service.prepare(body, backend='wasm')
+    assert info.value.status == 400
+
+def test_lru_evicts_least_recently_used():
+    cache = cv_server.PdfLRU(max_entries=2, max_bytes=100)
+    cache.put('a', b'1')
+    cache.put('b', b'2')
+    cache.get('a')
+    cache.put('c', b'3')
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (b'1', None, b'3')
+    cache.put('big', b'x' * 101)
+    assert cache.get('big') is None and cache.bytes == 2
@@ -0,0 +1,95 @@
+"""Golden-output tests for generate_cv_pdf.escape_latex
+
+reference_escape_latex is the implementation escape_latex replaced (nine
+re.sub passes in careful mode, an unconditional replace chain otherwise);
+the rewrite must match it byte for byte. How the two compare in speed is
+measured by benchmark_cv_pdf.py (the escape / escape_reference stages).
+"""
+
+import random
+
+import pytest
+
+from benchmark_cv_pdf import reference_escape_latex
+from generate_cv_pdf import escape_latex
+
+GOLDEN = [
+    # plain text
+    ('', ''),
+    ('Python and JavaScript', 'Python and JavaScript'),
+    ('עברית', 'עברית'),
+    # every special character on its own
+    ('&', r'\&'),
+    ('%', r'\%'),
+    ('$', r'\$'),
+    ('#', r'\#'),
+    ('_', r'\_'),
+    ('{', r'\{'),
+    ('}', r'\}'),
+    # simple mode escapes the braces of \textasciicircum{} as well (kept from the original)
+    ('^', r'\textasciicircum\{\}'),
+    ('~', r'\textasciitilde{}'),
+    # in running text
+    ('R&D, 95% faster, $10k', r'R\&D, 95\% faster, \$10k'),
+    ('C# and F#', r'C\# and F\#'),
+    ('snake_case_name', r'snake\_case\_name'),
+    ('{a}', r'\{a\}'),
+    ('x^2 ~ y', r'x\textasciicircum\{\}2 \textasciitilde{} y'),
+    ('&%$#^_{}~', r'\&\%\$\#\textasciicircum\{\}\_\{\}\textasciitilde{}'),
+    ('^^', r'\textasciicircum\{\}\textasciicircum\{\}'),
+    # ... but not those of \textasciitilde{}, which is replaced after them
+    ('~{', r'\textasciitilde{}\{'),
+    # a backslash alone does not switch to careful mode
+    (r'C:\path_to', r'C:\path\_to'),
+    (r'\textbf{bold} & more', r'\textbf\{bold\} \& more'),
+    # careful mode: escaped characters stay, the rest are escaped once
+    (r'R\&D & QA', r'R\&D \& QA'),
+    (r'50\% off, 20% more', r'50\% off, 20\% more'),
+    (r'\$5 or $6', r'\$5 or \$6'),
+    (r'\#1 and #2', r'\#1 and \#2'),
+    (r'\& a_b {c} x^y ~z', r'\& a\_b \{c\} x\textasciicircum{}y \textasciitilde{}z'),
+    # careful mode leaves & and % alone before a word character
+    (r'\& a&b 5%off', r'\& a&b 5%off'),
+    (r'\& a& b 5% off', r'\& a\& b 5\% off'),
+    (r'\& end&', r'\& end\&'),
+    # \href contexts
+    (r'\href{https://github.com/user}{GitHub}', r'\href\{https://github.com/user\}\{GitHub\}'),
+    (r'See \href{https://x.io/a_b?q=1&r=2}{link}',
+     r'See \href\{https://x.io/a\_b?q=1&r=2\}\{link\}'),
+    (r'\href{https://x.io/~me#top}{home} 100%',
+     r'\href\{https://x.io/\textasciitilde{}me\#top\}\{home\} 100\%'),
+    # URLs without LaTeX are escaped like any other text
+    ('https://example.com/a_b?x=1&y=2#frag', r'https://example.com/a\_b?x=1\&y=2\#frag'),
+    ('https://example.com/~user/%20', r'https://example.com/\textasciitilde{}user/\%20'),
+    ('mailto:first_last@example.com', r'mailto:first\_last@example.com'),
+]
+
+@pytest.mark.parametrize('text, expected', GOLDEN)
+def test_golden(text, expected):
+    assert escape_latex(text) == expected
+
+@pytest.mark.parametrize('text, expected', GOLDEN)
+def test_golden_matches_reference(text, expected):
+    assert reference_escape_latex(text) == expected
+
+ALPHABET = list('&%$#_{}^~\\ ') + ['a', 'Z', '0', '\\href', '\\&', '\\%', '\\$', '\\#', 'é', '\n']
+
+def test_random_inputs_match_reference():
+    rng = random.Random(1234)
+    for _ in range(20000):
+        text = ''.join(rng.choice(ALPHABET) for _ in range(rng.randint(0, 24)))
+        assert escape_latex(text) == reference_escape_latex(text), repr(text)
+
+def _cv_like_corpus(rng, size):
+    words = ['model', 'R&D', '95%', '$10k', 'C#', 'snake_case', '{x}', 'x^2', '~5', 'Python', 'data']
+    return [' '.join(rng.choice(words) for _ in range(20)) for _ in range(size)]
+
+@pytest.mark.parametrize('careful', [False, True], ids=['simple', 'careful'])
+def test_large_input_matches_reference(careful):
+    rng = random.Random(42)
+    items = _cv_like_corpus(rng, 2000)
+    if careful:
+        items = [r'\& ' + item for item in items]
+    items.append(' '.join(items))  # one very large input as well
+    assert [escape_latex(item) for item in items] == [reference_escape_latex(item) for item in items]
+
@@ -0,0 +1,116 @@
+"""HTML / Markdown / plain-text exports: escaping, links and export_cv publishing"""
+
+import io
+import os
+from html.parser import HTMLParser
+
+import pytest
+
+import generate_cv_pdf as cvgen
+from cv_common import SCRATCH_DIR
+from cv_exporters import escape_markdown, export_cv, markdown_url, render_cv
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HOSTILE = '<script>alert("x")</script> & *bold* _it_ `code` [link](u) | a\\b'
+
+@pytest.fixture
+def hostile_cv():
+    return cvgen.CVDocument(
+        source='<test>',
+        header=cvgen.Header('Jane <Doe>', 'jane@example.com & 555', (('GitHub', 'https://github.com/j?a=1&b=<2>'),),
+                            (HOSTILE,)),
+        experience=[cvgen.Experience('Dev & Ops', 'ACME <Ltd>', '2019 - 2021', '# not a heading',
+                                     ('2019. Shipped v1', '- not a list', HOSTILE), ('C#', 'F*'))],
+        education=[cvgen.Education('Uni "A"', 'B.Sc. <CS>', 'Tel Aviv', '2015 - 2019')],
+        skills=[cvgen.Skill('Lang_uages', ('C++', '<Rust>'))],
+        projects=[cvgen.Project('Proj <1>', HOSTILE, 'GitHub: https://github.com/j/p_1 | Demo & <more>',
+                                ('> quoted',), ('Node.js',))],
+    )
+
+def _render(cv, fmt):
+    out = io.StringIO()
+    render_cv(cv, fmt, out)
+    return out.getvalue()
+
+@pytest.mark.parametrize('text, expected', [
+    ('plain text', 'plain text'),
+    ('*a* _b_ `c`', r'\*a\* \_b\_ \`c\`'),
+    ('[x](y) <z> a|b', r'\[x\](y) \<z\> a\|b'),
+    ('back\\slash', 'back\\\\slash'),
+    ('# heading', r'\# heading'),
+    ('> quote', r'\> quote'),
+    ('- item', r'\- item'),
+    ('+ item', r'\+ item'),
+    ('2019. Founded', r'2019\. Founded'),
+    ('3) Third', r'3\) Third'),
+    ('In 2019. Founded', 'In 2019. Founded'),
+    ('1234567890. Too long for a list', '1234567890. Too long for a list'),
+])
+def test_escape_markdown(text, expected):
+    assert escape_markdown(text) == expected
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://github.com/user/repo', 'https://github.com/user/repo'),
+    ('https://x.io/a b>c<d', 'https://x.io/a%20b%3Ec%3Cd'),
+    ('https://x.io/?q=1&r=%20#top', 'https://x.io/?q=1&r=%20#top'),
+    ('https://x.io/line\nbreak', 'https://x.io/line%0Abreak'),
+])
+def test_markdown_url(url, expected):
+    assert markdown_url(url) == expected
+
+class _TextCollector(HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.tags, self.text, self.hrefs = [], [], []
+
+    def handle_starttag(self, tag, attrs):
+        self.tags.append(tag)
+        self.hrefs += [value for name, value in attrs if name == 'href']
+
+    def handle_data(self, data):
+        self.text.append(data)
+
+def test_html_escapes_every_field(hostile_cv):
+    page = _render(hostile_cv, 'html')
+    assert '<script>' not in page and '<Doe>' not in page and '<Rust>' not in page
+    parsed = _TextCollector()
+    parsed.feed(page)
+    assert 'script' not in parsed.tags
+    text = ''.join(parsed.text)
+    for fragment in ('Jane <Doe>', HOSTILE, 'ACME <Ltd>', 'B.Sc. <CS>', 'Uni "A"', 'Demo & <more>', '<Rust>'):
+        assert fragment in text
+    assert parsed.hrefs == ['https://github.com/j?a=1&b=<2>', 'https://github.com/j/p_1']
+
+def test_markdown_escapes_every_field(hostile_cv):
+    md = _render(hostile_cv, 'md')
+    assert '# Jane \\<Doe\\>\n' in md
+    assert '[GitHub](<https://github.com/j?a=1&b=%3C2%3E>)' in md
+    assert '### Dev & Ops, ACME \\<Ltd\\> — 2019 - 2021\n\n\\# not a heading\n' in md
+    assert '- 2019\\. Shipped v1\n- \\- not a list\n' in md
+    assert '[GitHub](<https://github.com/j/p_1>) \\| Demo & \\<more\\>' in md
+    assert '- \\> quoted\n' in md
+    assert '<script>' not in md and '`code`' not in md
+
+def test_plain_text_keeps_text_as_is(hostile_cv):
+    txt = _render(hostile_cv, 'txt')
+    assert 'Jane <Doe>\n' in txt and f'- {HOSTILE}\n' in txt
+    assert 'GitHub: https://github.com/j/p_1\nDemo & <more>\n' in txt
+    assert '\nPROFESSIONAL EXPERIENCE\n' in txt
+
+def test_unknown_format():
+    with pytest.raises(ValueError, match="unknown export format 'pdf'"):
+        render_cv(cvgen.CVDocument(), 'pdf', io.StringIO())
+
+def test_export_cv_publishes_and_skips_unchanged(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cv = cvgen.parse_cv_data(os.path.join(ROOT, 'CV_DATA.txt'))
+    written = export_cv(cv, ['html', 'md', 'txt'], 'public')
+    assert {fmt: changed for fmt, (_, changed) in written.items()} == {'html': True, 'md': True, 'txt': True}
+    assert sorted(os.listdir('public')) == ['CV.html', 'CV.md', 'CV.txt']
+    with open('public/CV.md', encoding='utf-8') as f:
+        assert f.read() == _render(cv, 'md')
+    again = export_cv(cv, ['md'], 'public')
+    assert again == {'md': (os.path.join('public', 'CV.md'), False)}
+    # Scratch files live outside public/ and are cleaned up
+    assert os.listdir(SCRATCH_DIR) == []
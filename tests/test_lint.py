@@ -0,0 +1,91 @@
+"""Pre-compile lint: lint_cv on CV data, lint_latex_text warnings, lint_latex brace balance"""
+
+import os
+
+import pytest
+
+import generate_cv_pdf as cvgen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def _cv_data():
+    with open(os.path.join(ROOT, 'CV_DATA.txt'), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def _parse(tmp_path, text):
+    path = tmp_path / 'CV_DATA.txt'
+    path.write_text(text, encoding='utf-8')
+    return cvgen.parse_cv_data(str(path))
+
+def test_cv_data_is_clean():
+    assert cvgen.lint_cv(cvgen.parse_cv_data(os.path.join(ROOT, 'CV_DATA.txt'))) == []
+
+@pytest.mark.parametrize('text', [
+    'Plain text',
+    r'R\&D and 50\% more',
+    r'\textbf{bold} and \emph{this}',
+    r'\href{https://example.com/a_b}{link text}',
+    r'\href{mailto:me@example.com}{mail}',
+    r'\{literal braces\}',
+])
+def test_clean_text(text):
+    assert cvgen.lint_latex_text(text) == []
+
+@pytest.mark.parametrize('text, problem', [
+    ('a & b', cvgen.LINT_SPECIAL_MESSAGES['&']),
+    ('50% more', cvgen.LINT_SPECIAL_MESSAGES['%']),
+    ('$10k', cvgen.LINT_SPECIAL_MESSAGES['$']),
+    ('C#', cvgen.LINT_SPECIAL_MESSAGES['#']),
+    ('snake_case', cvgen.LINT_SPECIAL_MESSAGES['_']),
+    ('x^2', cvgen.LINT_SPECIAL_MESSAGES['^']),
+    (r'\foo bar', r"unknown control sequence \foo"),
+    ('ends with \\', "trailing backslash"),
+    ('a}', "unmatched '}'"),
+    ('{{a}', "1 unclosed '{'"),
+    (r'\href no args', r"malformed \href (expected \href{url}{text})"),
+    (r'\href{example.com}{x}', "malformed URL 'example.com'"),
+])
+def test_each_warning(text, problem):
+    assert cvgen.lint_latex_text(text) == [problem]
+
+@pytest.mark.parametrize('url, ok', [
+    ('https://github.com/user/repo', True),
+    ('http://example.com', True),
+    ('mailto:first.last@example.com', True),
+    ('github.com/user', False),
+    ('https://exa mple.com', False),
+    ('https://example.com/{x}', False),
+    ('mailto:nobody', False),
+])
+def test_lint_url(url, ok):
+    assert (cvgen.lint_url(url) is None) == ok
+
+def test_issue_points_at_cv_data_line(tmp_path):
+    text = _cv_data().replace('• Developed end-to-end ML evaluation workflows in Python',
+                              r'• Developed \& \foo workflows in Python')
+    issues = cvgen.lint_cv(_parse(tmp_path, text))
+    assert [(i.line, i.field, i.message) for i in issues] == [
+        (23, 'experience bullet', r"unknown control sequence \foo")]
+    assert str(issues[0]) == f"{tmp_path / 'CV_DATA.txt'}:23: unknown control sequence \\foo (in experience bullet)"
+
+def test_careful_mode_leaves_ampersand_before_a_word(tmp_path):
+    # escape_latex does not escape '&' directly followed by a letter once the text holds LaTeX
+    text = _cv_data().replace('• Developed end-to-end ML evaluation workflows in Python',
+                              r'• Developed \& R&D workflows')
+    issues = cvgen.lint_cv(_parse(tmp_path, text))
+    assert [(i.line, i.message) for i in issues] == [(23, cvgen.LINT_SPECIAL_MESSAGES['&'])]
+
+def test_bad_project_url(tmp_path):
+    text = _cv_data().replace('GitHub: https://github.com/NatanelRichey/therabot |',
+                              'GitHub: https://github.com/{therabot} |')
+    issues = cvgen.lint_cv(_parse(tmp_path, text))
+    assert [(i.line, i.field) for i in issues] == [(57, 'project link')]
+    assert issues[0].message.startswith('malformed URL')
+
+def test_lint_latex_balanced_document():
+    latex = cvgen.generate_latex(cvgen.parse_cv_data(os.path.join(ROOT, 'CV_DATA.txt')))
+    assert cvgen.lint_latex(latex) == []
+
+def test_lint_latex_reports_lines():
+    latex = '\\begin{document}\n\\textbf{a\n% } in a comment\n\\{ escaped\nb}}\n{\n\\end{document}\n'
+    assert [(i.line, i.message) for i in cvgen.lint_latex(latex)] == [(5, "unmatched '}'"), (6, "unclosed '{'")]
@@ -0,0 +1,113 @@
+"""PdflatexLogParser events and stream_pdflatex, fed from canned pdflatex output"""
+
+import sys
+import time
+import subprocess
+
+import pytest
+
+import generate_cv_pdf as cvgen
+
+def _parse(lines):
+    parser = cvgen.PdflatexLogParser()
+    events = []
+    for line in lines:
+        events.extend(parser.feed(line + '\n'))
+    return events + parser.close()
+
+CLEAN_RUN = [
+    'This is pdfTeX, Version 3.141592653-2.6-1.40.25 (TeX Live 2023) (preloaded format=pdflatex)',
+    '(./cv.tex',
+    'LaTeX2e <2022-11-01> patch level 1',
+    '(/usr/share/texlive/texmf-dist/tex/latex/base/article.cls',
+    'LaTeX Warning: Reference `sec:x\' on page 1 undefined on input line 42.',
+    'Package hyperref Warning: Token not allowed in a PDF string (Unicode):',
+    'Overfull \\hbox (12.5pt too wide) in paragraph at lines 88--90',
+    'Underfull \\hbox (badness 10000) in paragraph at lines 101--101',
+    '[1{/var/lib/texmf/fonts/map/pdftex/updmap/pdftex.map}] [2]',
+    ') )',
+    'Output written on cv.pdf (2 pages, 61234 bytes).',
+    'Transcript written on cv.log.',
+]
+
+def test_clean_run_events():
+    events = _parse(CLEAN_RUN)
+    assert [e.kind for e in events] == ['warning', 'warning', 'overfull', 'underfull', 'page', 'page', 'output']
+    undefined, hyperref, overfull, underfull = events[:4]
+    assert (undefined.line, undefined.message) == (42, "Reference `sec:x' on page 1 undefined on input line 42.")
+    assert hyperref.message.startswith('hyperref: Token not allowed')
+    assert (overfull.line, overfull.value) == (88, 12.5)
+    assert (underfull.line, underfull.value) == (101, 10000.0)
+    assert [e.value for e in events[4:6]] == [1, 2]
+    assert (events[-1].message, events[-1].value) == ('cv.pdf', 2)
+
+def test_report_properties():
+    report = cvgen.CompileReport(ok=True, events=_parse(CLEAN_RUN))
+    assert report and report.pages == 2
+    assert (report.overfull_boxes, report.underfull_boxes, len(report.warnings)) == (1, 1, 2)
+    assert report.errors == [] and report.missing_packages == []
+
+def test_error_carries_tex_line_and_context():
+    events = _parse([
+        '! Undefined control sequence.',
+        'l.42 \\foo',
+        '         bar',
+    ])
+    assert events == [cvgen.LogEvent('error', 'Undefined control sequence.', 42, context='\\foo')]
+    assert str(events[0]) == 'l.42: Undefined control sequence. [\\foo]'
+
+def test_error_without_line_is_flushed():
+    # The next message ends the first error; close() flushes the last one
+    events = _parse(['! Emergency stop.', '! Another one.'])
+    assert [(e.kind, e.message, e.line) for e in events] == [('error', 'Emergency stop.', 0),
+                                                              ('error', 'Another one.', 0)]
+
+def test_error_flushed_after_context_window():
+    parser = cvgen.PdflatexLogParser()
+    assert parser.feed('! Missing $ inserted.\n') == []
+    events = []
+    for _ in range(cvgen.PdflatexLogParser.ERROR_CONTEXT_LINES):
+        events += parser.feed('some other output\n')
+    assert [e.message for e in events] == ['Missing $ inserted.']
+    assert parser.close() == []
+
+def test_missing_package():
+    events = _parse([
+        "! LaTeX Error: File `fontawesome5.sty' not found.",
+        '!  ==> Fatal error occurred, no output PDF file produced!',
+    ])
+    assert [(e.kind, e.context) for e in events] == [('missing_package', 'fontawesome5')]
+    report = cvgen.CompileReport(events=events)
+    assert report.missing_packages == ['fontawesome5']
+    assert report.summary() == 'fontawesome5.sty not found [fontawesome5]'
+
+def test_page_numbers_only_increase():
+    events = _parse(['[1] [2]', '[1.2] [3{map}]'])
+    assert [e.value for e in events if e.kind == 'page'] == [1, 2, 3]
+
+def _fake_pdflatex(script):
+    return subprocess.Popen([sys.executable, '-u', '-c', script], stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True)
+
+def test_stream_stops_at_first_error():
+    proc = _fake_pdflatex("import time\nprint('[1]')\nprint('! Undefined control sequence.')\n"
+                          "print('l.7 \\\\bad')\ntime.sleep(30)\n")
+    seen = []
+    start = time.monotonic()
+    report = cvgen.stream_pdflatex(proc, timeout=20, on_event=seen.append)
+    assert time.monotonic() - start < 10
+    assert report.aborted and not report
+    assert [e.kind for e in seen] == ['page', 'error']
+    assert report.summary() == 'l.7: Undefined control sequence. [\\bad]'
+
+def test_stream_successful_run():
+    proc = _fake_pdflatex("print('[1] [2]')\nprint('Output written on cv.pdf (2 pages, 100 bytes).')\n")
+    report = cvgen.stream_pdflatex(proc, timeout=20)
+    assert report and report.returncode == 0 and report.pages == 2
+    assert report.tail[-1] == 'Output written on cv.pdf (2 pages, 100 bytes).'
+
+def test_stream_timeout_kills_process():
+    proc = _fake_pdflatex("import time\ntime.sleep(30)\n")
+    with pytest.raises(subprocess.TimeoutExpired):
+        cvgen.stream_pdflatex(proc, timeout=0.5)
+    assert proc.returncode is not None
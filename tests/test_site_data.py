@@ -0,0 +1,37 @@
+"""emit_site_data: generated lib/data.ts and the hand-maintained-file guard"""
+
+import os
+
+import pytest
+
+import generate_cv_pdf as cvgen
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def cv():
+    return cvgen.parse_cv_data(os.path.join(ROOT, 'CV_DATA.txt'))
+
+def _emit(cv, tmp_path, **kwargs):
+    return cvgen.emit_site_data(cv, ts_path=str(tmp_path / 'data.ts'), json_path=str(tmp_path / 'cv-data.json'),
+                                overrides_path=os.path.join(ROOT, 'site_overrides.json'), **kwargs)
+
+def test_hand_maintained_file_is_not_replaced(cv, tmp_path):
+    (tmp_path / 'data.ts').write_text('export const personalInfo = {};\n', encoding='utf-8')
+    with pytest.raises(cvgen.SiteDataError):
+        _emit(cv, tmp_path)
+    assert (tmp_path / 'data.ts').read_text(encoding='utf-8') == 'export const personalInfo = {};\n'
+    assert not (tmp_path / 'cv-data.json').exists()
+
+def test_overwrite_then_regenerate(cv, tmp_path):
+    (tmp_path / 'data.ts').write_text('export const personalInfo = {};\n', encoding='utf-8')
+    assert len(_emit(cv, tmp_path, overwrite=True)) == 2
+    assert cvgen.SITE_DATA_MARKER in (tmp_path / 'data.ts').read_text(encoding='utf-8')
+    # A generated file may be regenerated freely, and unchanged output is not rewritten
+    assert _emit(cv, tmp_path) == []
+
+def test_site_data_from_cv(cv):
+    data = cvgen.build_site_data(cv, cvgen.load_site_overrides(os.path.join(ROOT, 'site_overrides.json')))
+    assert data['personalInfo']['name'] == cv.header.name
+    therabot = next(p for p in data['projects'] if p['title'].startswith('TheraBot'))
+    assert therabot['category'] == 'AI/ML' and therabot['githubUrl'].startswith('https://github.com/')
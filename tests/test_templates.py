@@ -0,0 +1,104 @@
+"""cv_templates: every tag, autoescaping, compile/render errors and the file cache"""
+
+import io
+import os
+
+import pytest
+
+from cv_common import escape_latex
+from cv_templates import Markup, Template, TemplateError, clear_template_cache, escape_for, load_template
+
+def render(source, escape=escape_latex, **context):
+    return Template(source, name='t.tex', escape=escape).render(**context)
+
+def test_variables_are_escaped():
+    assert render('<< name >> & co', name='R&D_1') == r'R\&D\_1 & co'
+
+def test_raw_markup_and_none():
+    assert render('<< url|raw >>', url='https://x.io/a_b') == 'https://x.io/a_b'
+    assert render('<< text >>', text=Markup(r'\textbf{x}')) == r'\textbf{x}'
+    assert render('[<< missing >>]', missing=None) == '[]'
+    assert render('<< n + 1 >>', n=41) == '42'
+
+def test_filters():
+    assert render("<< items|join(', ') >>", items=['C#', 'F#']) == r'C\#, F\#'
+    assert render('<< s|upper >>/<< s|lower >>', s='Mixed_Case') == r'MIXED\_CASE/mixed\_case'
+
+def test_if_elif_else():
+    source = '<% if n > 1 %>many<% elif n == 1 %>one<% else %>none<% endif %>'
+    assert [render(source, n=n) for n in (2, 1, 0)] == ['many', 'one', 'none']
+
+def test_for_loop_info_and_nesting():
+    source = ('<% for row in rows %><% for cell in row %><< cell >><% if not loop.last %>,<% endif %>'
+              '<% endfor %><% if not loop.last %>;<% endif %><% endfor %>')
+    assert render(source, rows=[[1, 2], [3]]) == '1,2;3'
+    assert render('<% for k, v in pairs %><< loop.index0 >>=<< k >><< v >> <% endfor %>',
+                  pairs=[('a', 1), ('b', 2)]) == '0=a1 1=b2 '
+
+def test_set_and_globals():
+    template = Template('<% set a, b = split(s) %><< a >>|<< b >>', name='t.tex', escape=escape_latex,
+                        globals={'split': lambda s: s.split(':', 1)})
+    assert template.render(s='x:y_z') == r'x|y\_z'
+
+def test_block_only_lines_leave_no_blank_lines():
+    source = 'start\n<% for x in xs %>\n<< x >>\n<% endfor %>\nend\n'
+    assert render(source, xs=['a', 'b']) == 'start\na\nb\nend\n'
+
+def test_stream_matches_render():
+    template = Template('<% for x in xs %><< x >>\n<% endfor %>', name='t.tex', escape=escape_latex)
+    out = io.StringIO()
+    template.stream(out, xs=['50%', '$5'])
+    assert out.getvalue() == template.render(xs=['50%', '$5']) == '50\\%\n\\$5\n'
+
+def test_html_escape_by_extension(tmp_path):
+    assert escape_for('a.tex') is escape_latex
+    assert escape_for('a.txt') is None
+    path = tmp_path / 'page.html'
+    path.write_text('<p><< text >></p>', encoding='utf-8')
+    assert load_template(str(path)).render(text='<b>"x" & y</b>') == '<p>&lt;b&gt;&quot;x&quot; &amp; y&lt;/b&gt;</p>'
+
+@pytest.mark.parametrize('source, message, line', [
+    ('a\n<< 1 + >>', "invalid expression", 2),
+    ('<< x|nope >>', "unknown filter 'nope'", 1),
+    ('<< x|join(, ) >>', "invalid expression", 1),
+    ('<% while x %>', "unknown tag 'while'", 1),
+    ('<% endif %>', "'endif' without 'if'", 1),
+    ('<% else %>', "'else' without 'if'", 1),
+    ('<% for x in xs %><% endif %>', "'endif' without 'if'", 1),
+    ('<% endfor %>', "'endfor' without 'for'", 1),
+    ('<% for x xs %>', "expected 'for <name> in <expr>'", 1),
+    ('<% set x %>', "expected 'set <name> = <expr>'", 1),
+    ('<% set 1 = x %>', "invalid assignment target", 1),
+    ('one\n<% if x %>\ntwo\n', "unclosed 'if'", 2),
+    ('<% for x in xs %>\n<% if x %>\n<% endfor %>', "'endfor' without 'for'", 3),
+])
+def test_compile_errors(source, message, line):
+    with pytest.raises(TemplateError) as info:
+        Template(source, name='bad.tex')
+    assert message in str(info.value)
+    assert (info.value.name, info.value.line) == ('bad.tex', line)
+    assert str(info.value).startswith(f'bad.tex:{line}: ')
+
+def test_undefined_variable():
+    with pytest.raises(TemplateError) as info:
+        render('<< nothing_here >>')
+    assert str(info.value) == "t.tex: undefined variable 'nothing_here'"
+
+def test_builtins_available():
+    assert render('<< len(xs) >>', xs=[1, 2, 3]) == '3'
+
+def test_missing_file(tmp_path):
+    with pytest.raises(TemplateError) as info:
+        load_template(str(tmp_path / 'absent.tex'))
+    assert 'template not found' in str(info.value)
+
+def test_cache_recompiles_on_change(tmp_path):
+    clear_template_cache()
+    path = tmp_path / 'part.tex'
+    path.write_text('v1 << x >>', encoding='utf-8')
+    first = load_template(str(path))
+    assert load_template(str(path)) is first
+    path.write_text('v2 << x >>', encoding='utf-8')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert load_template(str(path)).render(x='_') == r'v2 \_'